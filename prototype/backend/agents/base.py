@@ -1,28 +1,32 @@
 """Base agent with agentic tool-use loop.
 
 Handles the core pattern: send message -> Claude responds -> execute tools -> repeat.
-Uses the Anthropic API directly (ANTHROPIC_API_KEY env var).
+Model calls go through the shared client in backend.llm.client (ANTHROPIC_API_KEY env var).
 """
 from __future__ import annotations
-import json
 import time
 import logging
+import threading
 from typing import Any
-import anthropic
 
-from backend.config import SPECIALIST_MODEL, MAX_TOKENS, TEMPERATURE, MAX_AGENT_STEPS
-from backend.models import AgentResponse, ToolCall, RAGSource, TraceStep, Intent
+from backend.config import (
+    SPECIALIST_MODEL, MAX_TOKENS, TEMPERATURE, MAX_AGENT_STEPS,
+    AGENT_LATENCY_BUDGET_MS, AGENT_STEP_ESTIMATE_MS, AGENT_MIN_TOKENS,
+)
+from backend.models import AgentResponse, ToolCall, RAGSource, Intent
+from backend.llm.client import client
+from backend.observability.tracing import tracer
+from backend.agents.projection import ToolResultCompactor
+from backend.singleflight import tool_flight, request_key
 
 logger = logging.getLogger(__name__)
 
-client = anthropic.Anthropic()
-
 
 # Tool definitions shared across agents
 TOOL_DEFINITIONS = {
     "lookup_policy": {
         "name": "lookup_policy",
-        "description": "Look up a policy by number or ID. Returns full policy details including coverage, carrier, status, effective dates, and client info.",
+        "description": "Look up a policy by number or ID. Returns full policy details including coverage, carrier, status, effective dates, and client info. Tolerates formatting and OCR noise in the number; when there is no confident match the error lists the closest policy numbers as candidates.",
         "input_schema": {
             "type": "object",
             "properties": {
@@ -104,9 +108,54 @@ TOOL_DEFINITIONS = {
 }
 
 
+class AgentCancelled(Exception):
+    """Raised inside run_agent_loop when its cancel event is set (e.g. a rerouted speculation)."""
+
+
+class StepLatencyEstimator:
+    """EWMA of recent model-call and tool latency, shared across requests.
+
+    Used to predict whether another tool step still fits in a request's budget.
+    """
+
+    def __init__(self, initial_ms: int, alpha: float = 0.3):
+        self._lock = threading.Lock()
+        self._alpha = alpha
+        self._llm_ms = float(initial_ms)
+        self._tool_ms = 0.0
+
+    def observe(self, llm_ms: int, tool_ms: int | None = None) -> None:
+        with self._lock:
+            self._llm_ms += self._alpha * (llm_ms - self._llm_ms)
+            if tool_ms is not None:
+                self._tool_ms += self._alpha * (tool_ms - self._tool_ms)
+
+    def predict_final_ms(self) -> int:
+        """Cost of one more model call that answers without tools."""
+        return int(self._llm_ms)
+
+    def predict_step_ms(self) -> int:
+        """Cost of one more model call that uses tools."""
+        return int(self._llm_ms + self._tool_ms)
+
+
+step_latency = StepLatencyEstimator(AGENT_STEP_ESTIMATE_MS)
+
+
+# Tools without side effects; identical concurrent calls share one execution
+COALESCED_TOOLS = frozenset(("lookup_policy", "lookup_client", "verify_coverage", "get_carrier_requirements",
+                             "get_claim_status", "search_knowledge_base"))
+
+
 # Tool executors
 def _execute_tool(tool_name: str, tool_input: dict) -> dict:
     """Execute a tool and return the result."""
+    if tool_name in COALESCED_TOOLS:
+        return tool_flight.do(request_key(tool_name, tool_input), _run_tool, tool_name, tool_input)
+    return _run_tool(tool_name, tool_input)
+
+
+def _run_tool(tool_name: str, tool_input: dict) -> dict:
     from backend.tools.ams_api import lookup_policy, lookup_client, verify_coverage
     from backend.tools.carrier_api import get_carrier_requirements
     from backend.tools.claims_api import get_claim_status, escalate_to_human
@@ -139,55 +188,99 @@ def run_agent_loop(
     tools: list[dict],
     agent_name: str = "agent",
     intent: Intent | None = None,
+    cancel_event: threading.Event | None = None,
+    deadline: float | None = None,
 ) -> AgentResponse:
     """Run the agentic tool-use loop.
 
     Sends messages to Claude, executes any tool calls, feeds results back,
-    and repeats until Claude produces a final text response or max steps reached.
+    and repeats until Claude produces a final text response. The loop works
+    against a latency budget: max_tokens shrinks with the time left, and once
+    another tool step (or MAX_AGENT_STEPS) would not leave room for an answer,
+    the next call is made with tool_choice "none" to force a final response.
+
+    deadline is a time.time() timestamp; defaults to now + AGENT_LATENCY_BUDGET_MS.
+    If cancel_event is set, raises AgentCancelled before the next model call or tool.
+
+    The run is traced as a span (nested under the caller's active span, if any);
+    the response's trace_steps are derived from that span's subtree.
     """
+    with tracer.span(agent_name, "specialist", model=SPECIALIST_MODEL,
+                     tools_available=[t["name"] for t in tools]) as agent_span:
+        try:
+            response = _agent_loop(system_prompt, messages, tools, agent_name, intent, cancel_event, deadline)
+        except AgentCancelled:
+            agent_span.status = "cancelled"
+            raise
+        if response.escalated:
+            agent_span.set(escalated=True, escalation_reason=response.escalation_reason)
+    response.trace_steps = agent_span.trace_steps()
+    return response
+
+
+def _agent_loop(
+    system_prompt: str,
+    messages: list[dict],
+    tools: list[dict],
+    agent_name: str,
+    intent: Intent | None,
+    cancel_event: threading.Event | None,
+    deadline: float | None,
+) -> AgentResponse:
     start_time = time.time()
+    if deadline is None:
+        deadline = start_time + AGENT_LATENCY_BUDGET_MS / 1000
+    budget_ms = max(1, int((deadline - start_time) * 1000))
     working_messages = [_normalize_message(m) for m in messages]
     tools_called: list[ToolCall] = []
     rag_sources: list[RAGSource] = []
-    trace_steps: list[TraceStep] = []
     escalated = False
     escalation_reason = ""
-
-    # Trace: specialist started
-    trace_steps.append(TraceStep(
-        name=f"{agent_name} started",
-        step_type="specialist",
-        details={"model": SPECIALIST_MODEL, "tools_available": [t["name"] for t in tools]},
-    ))
+    compactor = ToolResultCompactor(agent_name)
 
     for step in range(MAX_AGENT_STEPS):
         logger.info(f"[{agent_name}] Step {step + 1}/{MAX_AGENT_STEPS}")
-        llm_start = time.time()
+        _check_cancelled(cancel_event, agent_name)
+        remaining_ms = int((deadline - time.time()) * 1000)
+        max_tokens = _token_budget(remaining_ms, budget_ms)
 
-        response = client.messages.create(
+        request = dict(
             model=SPECIALIST_MODEL,
-            max_tokens=MAX_TOKENS,
+            max_tokens=max_tokens,
             temperature=TEMPERATURE,
             system=system_prompt,
             messages=working_messages,
             tools=tools,
         )
-        llm_ms = int((time.time() - llm_start) * 1000)
+        predicted_ms = step_latency.predict_step_ms() + step_latency.predict_final_ms()
+        if step == MAX_AGENT_STEPS - 1 or remaining_ms < predicted_ms:
+            request["tool_choice"] = {"type": "none"}
+            tracer.event(
+                "Forcing final answer", "deadline", status="warning",
+                step=step + 1,
+                reason="max_steps" if step == MAX_AGENT_STEPS - 1 else "latency_budget",
+                remaining_ms=remaining_ms,
+                predicted_step_ms=predicted_ms,
+                max_tokens=max_tokens,
+            )
+
+        with tracer.span("Model call", "llm", step=step + 1, max_tokens=max_tokens) as llm_span:
+            response = client.messages.create(**request)
+        llm_ms = llm_span.duration_ms
 
         # Check for tool use
         tool_use_blocks = [b for b in response.content if b.type == "tool_use"]
 
         if not tool_use_blocks:
             # Final text response
+            step_latency.observe(llm_ms)
             text = "".join(b.text for b in response.content if b.type == "text")
             latency = int((time.time() - start_time) * 1000)
 
-            trace_steps.append(TraceStep(
-                name="Response generated",
-                step_type="specialist",
-                duration_ms=llm_ms,
-                details={"step": step + 1, "response_length": len(text)},
-            ))
+            llm_span.name = "Response generated"
+            llm_span.step_type = "specialist"
+            llm_span.set(response_length=len(text), budget_ms=budget_ms,
+                         remaining_ms=int((deadline - time.time()) * 1000))
 
             return AgentResponse(
                 text=text,
@@ -195,12 +288,13 @@ def run_agent_loop(
                 agent_name=agent_name,
                 tools_called=tools_called,
                 rag_sources=rag_sources,
-                trace_steps=trace_steps,
                 escalated=escalated,
                 escalation_reason=escalation_reason,
                 latency_ms=latency,
             )
 
+        llm_span.set(tool_uses=[b.name for b in tool_use_blocks])
+
         # Execute tools and collect results
         assistant_content = []
         for block in response.content:
@@ -216,36 +310,33 @@ def run_agent_loop(
 
         working_messages.append({"role": "assistant", "content": assistant_content})
 
+        tools_start = time.time()
         tool_results = []
         for tool_block in tool_use_blocks:
+            _check_cancelled(cancel_event, agent_name)
             logger.info(f"[{agent_name}] Calling tool: {tool_block.name}")
-            tool_start = time.time()
-            result = _execute_tool(tool_block.name, tool_block.input)
-            tool_ms = int((time.time() - tool_start) * 1000)
 
             # Determine tool type for trace
             is_read = tool_block.name in ("lookup_policy", "lookup_client", "verify_coverage", "get_claim_status", "search_knowledge_base")
             tool_type = "rag_search" if tool_block.name == "search_knowledge_base" else "tool_call"
 
+            with tracer.span(f"Tool: {tool_block.name}", tool_type,
+                             input={k: str(v)[:80] for k, v in tool_block.input.items()},
+                             access="read" if is_read else "write") as tool_span:
+                result = _execute_tool(tool_block.name, tool_block.input)
+                if "error" in result:
+                    tool_span.status = "error"
+            content, compaction = compactor.encode(tool_block.name, tool_block.id, result)
+            tool_span.set(**compaction)
+
             tool_call = ToolCall(
                 tool_name=tool_block.name,
                 tool_input=tool_block.input,
                 tool_output=result,
-                duration_ms=tool_ms,
+                duration_ms=tool_span.duration_ms,
             )
             tools_called.append(tool_call)
 
-            trace_steps.append(TraceStep(
-                name=f"Tool: {tool_block.name}",
-                step_type=tool_type,
-                duration_ms=tool_ms,
-                status="error" if "error" in result else "success",
-                details={
-                    "input": {k: str(v)[:80] for k, v in tool_block.input.items()},
-                    "access": "read" if is_read else "write",
-                },
-            ))
-
             # Track RAG sources
             if tool_block.name == "search_knowledge_base" and "results" in result:
                 for r in result["results"]:
@@ -264,32 +355,39 @@ def run_agent_loop(
             tool_results.append({
                 "type": "tool_result",
                 "tool_use_id": tool_block.id,
-                "content": json.dumps(result),
+                "content": content,
             })
 
         working_messages.append({"role": "user", "content": tool_results})
+        step_latency.observe(llm_ms, int((time.time() - tools_start) * 1000))
 
     # Max steps exceeded
     latency = int((time.time() - start_time) * 1000)
-    trace_steps.append(TraceStep(
-        name="Max steps exceeded",
-        step_type="escalation",
-        status="error",
-        details={"max_steps": MAX_AGENT_STEPS},
-    ))
+    tracer.event("Max steps exceeded", "escalation", status="error", max_steps=MAX_AGENT_STEPS)
     return AgentResponse(
         text="I apologize, but I'm having difficulty processing your request. Let me connect you with a specialist who can help.",
         intent=intent,
         agent_name=agent_name,
         tools_called=tools_called,
         rag_sources=rag_sources,
-        trace_steps=trace_steps,
         escalated=True,
         escalation_reason="max_steps_exceeded",
         latency_ms=latency,
     )
 
 
+def _token_budget(remaining_ms: int, budget_ms: int) -> int:
+    """Scale max_tokens down linearly with the share of the latency budget left."""
+    scaled = int(MAX_TOKENS * remaining_ms / budget_ms)
+    return max(min(AGENT_MIN_TOKENS, MAX_TOKENS), min(MAX_TOKENS, scaled))
+
+
+def _check_cancelled(cancel_event: threading.Event | None, agent_name: str) -> None:
+    if cancel_event is not None and cancel_event.is_set():
+        logger.info(f"[{agent_name}] Cancelled")
+        raise AgentCancelled(agent_name)
+
+
 def _normalize_message(msg: dict) -> dict:
     """Ensure message has the right format for the API."""
     if isinstance(msg.get("content"), str):
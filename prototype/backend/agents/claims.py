@@ -1,5 +1,6 @@
 """Claims status specialist agent for ClaimFlow AI."""
 from __future__ import annotations
+import threading
 
 from backend.models import AgentResponse, Intent
 from backend.agents.base import run_agent_loop, TOOL_DEFINITIONS
@@ -20,7 +21,7 @@ When presenting claim information:
 - Be transparent about status — don't sugarcoat delays
 - If a claim is under review, give realistic timeline expectations
 
-Always use the get_claim_status tool to fetch actual data before answering.
+Always use the get_claim_status tool to fetch actual data before answering, unless the member context below already has what you need.
 """
 
 
@@ -30,6 +31,9 @@ def run_claims_agent(
     member_name: str = "",
     policy_number: str = "",
     policy_type: str = "",
+    member_context: str = "",
+    cancel_event: threading.Event | None = None,
+    deadline: float | None = None,
 ) -> AgentResponse:
     """Run the claims status specialist agent."""
     tools = [
@@ -39,9 +43,11 @@ def run_claims_agent(
     ]
 
     return run_agent_loop(
-        system_prompt=CLAIMS_SYSTEM_PROMPT,
+        system_prompt=CLAIMS_SYSTEM_PROMPT + member_context,
         messages=messages,
         tools=tools,
         agent_name="claims_agent",
         intent=Intent.CLAIM_STATUS,
+        cancel_event=cancel_event,
+        deadline=deadline,
     )
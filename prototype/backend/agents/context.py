@@ -0,0 +1,100 @@
+"""Member context prefetch for specialist agents.
+
+The session already knows which client is chatting, so instead of letting the
+model spend a round-trip on lookup_client / get_claim_status for that member,
+their policies, open claims and carriers are loaded up front and injected into
+the specialist's system prompt as a compact summary.
+"""
+from __future__ import annotations
+import time
+
+from backend.tools.ams_api import get_client
+from backend.tools.carrier_api import get_carrier_requirements
+from backend.tools.claims_api import get_claim_status
+
+CLOSED_CLAIM_STATUSES = {"closed", "paid", "denied", "withdrawn"}
+
+# Tool each specialist would otherwise call first to learn about the member
+MEMBER_LOOKUP_TOOL = {
+    "fnol_specialist": "lookup_client",
+    "policy_lookup_agent": "lookup_client",
+    "general_agent": "lookup_client",
+    "claims_agent": "get_claim_status",
+}
+
+
+def prefetch_member_context(client_id: str) -> dict:
+    """Load the member's client record, policies, open claims and carriers."""
+    start = time.time()
+    client = get_client(client_id)
+    if "error" in client:
+        return {}
+
+    claims = get_claim_status(client_id).get("claims", [])
+    open_claims = [c for c in claims if c.get("status", "") not in CLOSED_CLAIM_STATUSES]
+
+    carriers = {}
+    for pol in client.get("active_policies", []):
+        name = pol.get("carrier", "")
+        if name and name not in carriers:
+            req = get_carrier_requirements(name)
+            if "error" not in req:
+                carriers[name] = req
+
+    return {
+        "client": client,
+        "policies": client.get("active_policies", []),
+        "open_claims": open_claims,
+        "carriers": list(carriers.values()),
+        "prefetch_ms": int((time.time() - start) * 1000),
+    }
+
+
+def member_context_prompt(context: dict) -> str:
+    """Compact system-prompt section summarizing the prefetched member context."""
+    if not context:
+        return ""
+    client = context["client"]
+    lines = [
+        "",
+        "## Member Context (prefetched for this session)",
+        "This is current AMS data for the member you are helping. Do not call lookup_client or "
+        "get_claim_status just to retrieve it; use those tools only for other clients or full claim timelines.",
+        f"Client: {client.get('name', '')} ({client.get('id', '')}), {client.get('type', 'personal')}, "
+        f"{client.get('email', '')}, {client.get('phone', '')}, {client.get('address', '')}",
+    ]
+    if client.get("contact_person"):
+        lines.append(f"Contact person: {client['contact_person']}")
+
+    lines.append("Policies:")
+    for p in context["policies"]:
+        lines.append(f"- {p['id']} #{p['policy_number']} {p['type']}, {p['carrier']}, {p['status']} "
+                     f"{p['effective_date']} to {p['expiration_date']}")
+
+    lines.append("Open claims:" if context["open_claims"] else "Open claims: none")
+    for c in context["open_claims"]:
+        adjuster = c.get("adjuster") or {}
+        last_event = (c.get("timeline") or [{}])[-1]
+        line = (f"- {c['claim_id']} {c.get('peril') or c.get('type', '')}, {c['status']}, "
+                f"DOL {c.get('date_of_loss', '')}, policy {c.get('policy_id', '')}")
+        if adjuster:
+            line += f", adjuster {adjuster.get('name', '')} {adjuster.get('phone', '')}"
+        if last_event:
+            line += f", latest: {last_event.get('date', '')} {last_event.get('event', '')}"
+        lines.append(line)
+
+    lines.append("Carriers:")
+    for c in context["carriers"]:
+        contact = c.get("fnol_phone") or c.get("claims_email") or c.get("fnol_portal_url", "")
+        lines.append(f"- {c['carrier_id']} {c['carrier_name']}: FNOL via {c['fnol_method']} {contact}, "
+                     f"~{c['avg_response_time_hours']}h response")
+
+    return "\n".join(lines) + "\n"
+
+
+def tool_steps_avoided(context: dict, agent_name: str, tools_called: list[str]) -> int:
+    """Member-lookup round-trips the specialist skipped because the context was prefetched."""
+    tool = MEMBER_LOOKUP_TOOL.get(agent_name)
+    if not context or not tool or tool in tools_called:
+        return 0
+    return 1
@@ -3,13 +3,13 @@ from __future__ import annotations
 import json
 import time
 import logging
-import anthropic
 
 from backend.config import SPECIALIST_MODEL, MAX_TOKENS
 from backend.models import FNOLExtraction, TraceStep
+from backend.llm.client import client
+from backend.observability.tracing import tracer
 
 logger = logging.getLogger(__name__)
-client = anthropic.Anthropic()
 
 EMAIL_PARSER_SYSTEM = """You are an insurance claims intake specialist at Prairie Shield Insurance Group in Omaha, Nebraska. Your job is to parse incoming emails that report insurance claims (First Notice of Loss) and extract structured data.
 
@@ -94,11 +94,8 @@ EXTRACT_TOOL = {
 def parse_email(email_text: str, from_address: str = "", subject: str = "") -> tuple[FNOLExtraction, list[TraceStep]]:
     """Parse an incoming claim email and extract structured FNOL data.
 
-    Returns (extraction, trace_steps).
+    Returns (extraction, trace_steps); the steps are derived from the parser's span.
     """
-    trace_steps = []
-    start = time.time()
-
     full_email = ""
     if from_address:
         full_email += f"From: {from_address}\n"
@@ -106,24 +103,25 @@ def parse_email(email_text: str, from_address: str = "", subject: str = "") -> t
         full_email += f"Subject: {subject}\n"
     full_email += f"\n{email_text}"
 
-    trace_steps.append(TraceStep(
-        name="Email Parser Started",
-        step_type="specialist",
-        details={"email_length": len(email_text), "has_from": bool(from_address), "has_subject": bool(subject)},
-    ))
+    with tracer.span("Email Parser", "specialist", email_length=len(email_text),
+                     has_from=bool(from_address), has_subject=bool(subject)) as parser_span:
+        extraction = _extract(full_email, email_text, from_address)
+    return extraction, parser_span.trace_steps()
+
 
+def _extract(full_email: str, email_text: str, from_address: str) -> FNOLExtraction:
+    start = time.time()
     try:
-        response = client.messages.create(
-            model=SPECIALIST_MODEL,
-            max_tokens=MAX_TOKENS,
-            temperature=0.0,
-            system=EMAIL_PARSER_SYSTEM,
-            messages=[{"role": "user", "content": f"Parse this incoming claim email:\n\n{full_email}"}],
-            tools=[EXTRACT_TOOL],
-            tool_choice={"type": "tool", "name": "extract_fnol_data"},
-        )
-
-        parse_ms = int((time.time() - start) * 1000)
+        with tracer.span("Email Parsed", "specialist") as parse_span:
+            response = client.messages.create(
+                model=SPECIALIST_MODEL,
+                max_tokens=MAX_TOKENS,
+                temperature=0.0,
+                system=EMAIL_PARSER_SYSTEM,
+                messages=[{"role": "user", "content": f"Parse this incoming claim email:\n\n{full_email}"}],
+                tools=[EXTRACT_TOOL],
+                tool_choice={"type": "tool", "name": "extract_fnol_data"},
+            )
 
         for block in response.content:
             if block.type == "tool_use" and block.name == "extract_fnol_data":
@@ -151,32 +149,20 @@ def parse_email(email_text: str, from_address: str = "", subject: str = "") -> t
                     raw_email_text=email_text,
                 )
 
-                trace_steps.append(TraceStep(
-                    name="Email Parsed",
-                    step_type="specialist",
-                    duration_ms=parse_ms,
-                    details={
-                        "loss_type": extraction.loss_type,
-                        "urgency": extraction.urgency,
-                        "confidence": extraction.confidence_score,
-                        "missing_fields": extraction.missing_fields,
-                        "has_policy_number": bool(extraction.policy_number),
-                        "has_injuries": extraction.injuries,
-                    },
-                ))
-
-                return extraction, trace_steps
+                parse_span.set(
+                    loss_type=extraction.loss_type,
+                    urgency=extraction.urgency,
+                    confidence=extraction.confidence_score,
+                    missing_fields=extraction.missing_fields,
+                    has_policy_number=bool(extraction.policy_number),
+                    has_injuries=extraction.injuries,
+                )
+                return extraction
 
     except Exception as e:
         logger.error(f"Email parsing failed: {e}")
-        parse_ms = int((time.time() - start) * 1000)
-        trace_steps.append(TraceStep(
-            name="Email Parse Error",
-            step_type="specialist",
-            duration_ms=parse_ms,
-            status="error",
-            details={"error": str(e)},
-        ))
+        tracer.event("Email Parse Error", "specialist", duration_ms=int((time.time() - start) * 1000),
+                     status="error", error=str(e))
 
     # Fallback extraction
     return FNOLExtraction(
@@ -185,4 +171,4 @@ def parse_email(email_text: str, from_address: str = "", subject: str = "") -> t
         missing_fields=["reporter_name", "policy_number", "date_of_loss", "loss_type"],
         confidence_score=0.1,
         raw_email_text=email_text,
-    ), trace_steps
+    )
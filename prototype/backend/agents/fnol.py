@@ -1,5 +1,6 @@
 """FNOL specialist agent — processes claims and generates carrier submissions."""
 from __future__ import annotations
+import threading
 
 from backend.models import AgentResponse, Intent, FNOL_INTENTS
 from backend.agents.base import run_agent_loop, TOOL_DEFINITIONS
@@ -49,7 +50,10 @@ def run_fnol_agent(
     member_name: str = "",
     policy_number: str = "",
     policy_type: str = "",
+    member_context: str = "",
     intent: Intent = Intent.FNOL_AUTO,
+    cancel_event: threading.Event | None = None,
+    deadline: float | None = None,
 ) -> AgentResponse:
     """Run the FNOL specialist agent."""
     tools = [
@@ -62,9 +66,11 @@ def run_fnol_agent(
     ]
 
     return run_agent_loop(
-        system_prompt=FNOL_SYSTEM_PROMPT,
+        system_prompt=FNOL_SYSTEM_PROMPT + member_context,
         messages=messages,
         tools=tools,
         agent_name="fnol_specialist",
         intent=intent,
+        cancel_event=cancel_event,
+        deadline=deadline,
     )
@@ -1,5 +1,6 @@
 """Policy lookup agent — verifies policies and coverage."""
 from __future__ import annotations
+import threading
 
 from backend.models import AgentResponse, Intent
 from backend.agents.base import run_agent_loop, TOOL_DEFINITIONS
@@ -26,6 +27,9 @@ def run_policy_lookup_agent(
     member_name: str = "",
     policy_number: str = "",
     policy_type: str = "",
+    member_context: str = "",
+    cancel_event: threading.Event | None = None,
+    deadline: float | None = None,
 ) -> AgentResponse:
     """Run the policy lookup agent."""
     tools = [
@@ -36,9 +40,11 @@ def run_policy_lookup_agent(
     ]
 
     return run_agent_loop(
-        system_prompt=POLICY_LOOKUP_SYSTEM,
+        system_prompt=POLICY_LOOKUP_SYSTEM + member_context,
         messages=messages,
         tools=tools,
         agent_name="policy_lookup_agent",
         intent=Intent.POLICY_QUESTION,
+        cancel_event=cancel_event,
+        deadline=deadline,
     )
@@ -0,0 +1,166 @@
+"""Projection and compaction of tool results before they enter the prompt.
+
+Tools return whole records (a policy with every vehicle, driver and coverage
+tree). The model only needs the fields relevant to the calling agent, so each
+tool result is projected through a per-tool, per-agent schema, long lists are
+truncated, and the JSON is encoded with compact separators. A result identical
+to one already sent earlier in the same loop is replaced by a back-reference.
+
+Schemas map field name -> True (keep as is) or a nested schema (applied to a
+dict, or to every element of a list of dicts). Fields not listed are dropped.
+"""
+from __future__ import annotations
+from typing import Any
+
+from backend.config import TOOL_RESULT_MAX_LIST_ITEMS
+from backend.serialization import dumps_str
+
+_POLICY_CORE = {
+    "id": True, "client_id": True, "client_name": True, "type": True, "status": True,
+    "policy_number": True, "carrier": True, "carrier_id": True,
+    "effective_date": True, "expiration_date": True, "policy_match": True,
+}
+
+_POLICY_SUMMARY = {
+    "id": True, "type": True, "carrier": True, "policy_number": True, "status": True,
+    "effective_date": True, "expiration_date": True,
+}
+
+_CLIENT = {
+    "id": True, "name": True, "type": True, "contact_person": True, "address": True,
+    "phone": True, "email": True, "preferred_contact": True, "agent": True,
+    "active_policies": _POLICY_SUMMARY,
+}
+
+_CLAIM = {
+    "claim_id": True, "policy_id": True, "carrier": True, "status": True, "type": True, "peril": True,
+    "date_of_loss": True, "date_reported": True, "description": True, "estimated_damage": True,
+    "approved_amount": True, "adjuster": True, "timeline": True, "injuries": True,
+    "police_report_number": True,
+}
+
+TOOL_OUTPUT_SCHEMAS: dict[str, dict[str, dict]] = {
+    "lookup_policy": {
+        "default": {
+            **_POLICY_CORE,
+            "client_email": True, "client_phone": True, "client_address": True,
+            "coverage": True, "endorsements": True, "vehicles_count": True,
+            "vehicles": {"year": True, "make": True, "model": True, "vin": True, "coverage": True},
+            "drivers": {"name": True, "relation": True},
+            "property": True,
+        },
+        "policy_lookup_agent": {
+            **_POLICY_CORE,
+            "coverage": True, "endorsements": True, "vehicles_count": True,
+            "vehicles": {"year": True, "make": True, "model": True, "coverage": True},
+            "drivers": {"name": True, "relation": True},
+            "property": True, "premium_annual": True, "payment_plan": True,
+        },
+        "claims_agent": {**_POLICY_CORE, "coverage": True},
+    },
+    "lookup_client": {
+        "default": {**_CLIENT, "matches": {**_CLIENT, "match_score": True}, "message": True},
+    },
+    "verify_coverage": {
+        "default": {
+            "covered": True, "potentially_covered": True, "reason": True, "policy_id": True,
+            "policy_type": True, "policy_number": True, "carrier": True, "carrier_id": True,
+            "date_of_loss": True, "loss_type": True, "applicable_deductible": True,
+            "deductible_note": True, "note": True,
+        },
+        "policy_lookup_agent": {
+            "covered": True, "potentially_covered": True, "reason": True, "policy_id": True,
+            "policy_type": True, "policy_number": True, "carrier": True, "coverage_details": True,
+            "date_of_loss": True, "loss_type": True, "applicable_deductible": True,
+            "deductible_note": True, "note": True,
+        },
+    },
+    "get_claim_status": {
+        "default": {**_CLAIM, "client_id": True, "claims": _CLAIM, "message": True},
+    },
+    "search_knowledge_base": {
+        "default": {
+            "results": {"chunk_text": True, "source_doc": True, "heading": True, "relevance_score": True},
+            "total_results": True, "message": True,
+        },
+    },
+}
+
+
+def project_tool_result(tool_name: str, result: dict, agent_name: str = "") -> dict:
+    """Keep only the fields of a tool result the calling agent needs."""
+    if "error" in result:
+        return _truncate(result)
+    schemas = TOOL_OUTPUT_SCHEMAS.get(tool_name)
+    if not schemas:
+        return _truncate(result)
+    return _project(result, schemas.get(agent_name, schemas["default"]))
+
+
+def _project(value: Any, schema: dict | bool) -> Any:
+    if schema is True:
+        return _truncate(value)
+    if isinstance(value, list):
+        out = [_project(v, schema) for v in value[:TOOL_RESULT_MAX_LIST_ITEMS]]
+        return out
+    if not isinstance(value, dict):
+        return value
+    out = {}
+    for key, sub_schema in schema.items():
+        if key not in value or value[key] in (None, "", [], {}):
+            continue
+        out[key] = _project(value[key], sub_schema)
+        if isinstance(value[key], list) and len(value[key]) > TOOL_RESULT_MAX_LIST_ITEMS:
+            out[f"{key}_total"] = len(value[key])
+    return out
+
+
+def _truncate(value: Any) -> Any:
+    """Cap every list in a structure at TOOL_RESULT_MAX_LIST_ITEMS (timelines keep the latest entries)."""
+    if isinstance(value, list):
+        items = value[-TOOL_RESULT_MAX_LIST_ITEMS:] if _is_timeline(value) else value[:TOOL_RESULT_MAX_LIST_ITEMS]
+        return [_truncate(v) for v in items]
+    if isinstance(value, dict):
+        out = {}
+        for k, v in value.items():
+            out[k] = _truncate(v)
+            if isinstance(v, list) and len(v) > TOOL_RESULT_MAX_LIST_ITEMS:
+                out[f"{k}_total"] = len(v)
+        return out
+    return value
+
+
+def _is_timeline(items: list) -> bool:
+    return bool(items) and isinstance(items[0], dict) and "date" in items[0] and "event" in items[0]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for savings reporting."""
+    return (len(text) + 3) // 4
+
+
+class ToolResultCompactor:
+    """Encodes tool results for one agent loop, de-duplicating repeats."""
+
+    def __init__(self, agent_name: str = ""):
+        self.agent_name = agent_name
+        self._sent: dict[str, str] = {}
+
+    def encode(self, tool_name: str, tool_use_id: str, result: dict) -> tuple[str, dict]:
+        """Returns (tool_result content, stats for the trace)."""
+        baseline_tokens = estimate_tokens(dumps_str(result))
+        content = dumps_str(project_tool_result(tool_name, result, self.agent_name))
+
+        duplicate_of = self._sent.get(content)
+        if duplicate_of:
+            content = dumps_str({"duplicate_of": duplicate_of,
+                                 "note": "Identical to an earlier tool result in this conversation turn."})
+        else:
+            self._sent[content] = tool_use_id
+
+        result_tokens = estimate_tokens(content)
+        return content, {
+            "result_tokens": result_tokens,
+            "tokens_saved": max(0, baseline_tokens - result_tokens),
+            "deduplicated": bool(duplicate_of),
+        }
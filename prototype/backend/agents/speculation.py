@@ -0,0 +1,81 @@
+"""Speculative specialist execution for follow-up turns.
+
+On a follow-up turn the supervisor almost always keeps the current intent,
+so chat starts its specialist while classification is still running. The
+result is kept only if the classified intent is the same one: the FNOL
+specialist is given the intent, so fnol_auto and fnol_property runs are not
+interchangeable. Otherwise the speculation is cancelled and the turn is
+rerouted.
+
+Cancellation is cooperative: the run checks its cancel event before each
+model call and before each tool, so a cancelled run keeps its executor
+thread until the model call or tool in flight returns. Escalation is never speculated (it acts at once).
+"""
+from __future__ import annotations
+import threading
+
+from backend.models import Intent, FNOL_INTENTS
+
+
+def agent_for_intent(intent: Intent) -> str:
+    """Name of the specialist that handles an intent (matches AgentResponse.agent_name)."""
+    if intent == Intent.ESCALATE:
+        return "escalation_handler"
+    if intent in FNOL_INTENTS:
+        return "fnol_specialist"
+    if intent == Intent.CLAIM_STATUS:
+        return "claims_agent"
+    if intent == Intent.POLICY_QUESTION:
+        return "policy_lookup_agent"
+    return "general_agent"
+
+
+def speculative_intent(current_intent: str, current_agent: str, escalated: bool = False) -> Intent | None:
+    """The intent to speculate on for this session, or None if speculation doesn't apply
+    (no current intent, an escalated session, or ESCALATE, which has side effects)."""
+    if escalated or not current_intent or not current_agent:
+        return None
+    try:
+        intent = Intent(current_intent)
+    except ValueError:
+        return None
+    if intent == Intent.ESCALATE or agent_for_intent(intent) != current_agent:
+        return None
+    return intent
+
+
+class SpeculationStats:
+    """Hit rate and latency saved by speculative routing."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0
+
+    def record_hit(self, saved_ms: int) -> None:
+        with self._lock:
+            self.attempts += 1
+            self.hits += 1
+            self.saved_ms += saved_ms
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.attempts += 1
+            self.misses += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / self.attempts, 3) if self.attempts else 0.0,
+                "saved_ms_total": self.saved_ms,
+                "saved_ms_avg": int(self.saved_ms / self.hits) if self.hits else 0,
+            }
+
+
+# Singleton
+speculation_stats = SpeculationStats()
@@ -2,13 +2,12 @@
 from __future__ import annotations
 import json
 import logging
-import anthropic
 
 from backend.config import SUPERVISOR_MODEL, TEMPERATURE
 from backend.models import Intent, Priority
+from backend.llm.client import client
 
 logger = logging.getLogger(__name__)
-client = anthropic.Anthropic()
 
 SUPERVISOR_SYSTEM_PROMPT = """You are the supervisor agent for ClaimFlow AI at Prairie Shield Insurance Group in Omaha, Nebraska. Your job is to classify the intent and priority of incoming messages.
 
@@ -0,0 +1 @@
+# ClaimFlow AI — AMS storage
@@ -0,0 +1,317 @@
+"""Columnar policy exposure table for catastrophe queries.
+
+verify_coverage answers for one policy at a time. After a hail or wind event
+the agency needs the whole book at once: which active policies covered the
+peril on the event date inside the affected area, and what is at stake. The
+table keeps one numpy column per attribute — status, type, carrier and
+city/state/ZIP as integer codes, effective and expiration dates as
+days (datetime64[D] stored as int32), a bitmask of covered perils, deductibles
+and property limits — so a query is a few vectorized comparisons ANDed into
+one mask, followed by bincounts for the breakdowns.
+
+Coverage follows verify_coverage: property lines cover weather, fire, theft
+and vandalism under the policy deductible (for hail and wind, the wind/hail
+percentage of the dwelling or building limit); auto policies cover them under
+comprehensive and collision under collision. A policy is located at its
+insured property's address, else at its client's address.
+"""
+from __future__ import annotations
+import re
+import threading
+import time
+from typing import Iterable
+
+import numpy as np
+
+from backend.ams.store import get_ams_store
+
+PROPERTY_TYPES = frozenset({"homeowners", "renters", "farm_ranch", "commercial_property"})
+PERILS = ("hail", "wind", "fire", "theft", "vandalism", "collision")
+# Loss types as extracted from FNOL emails, mapped onto PERILS
+PERIL_ALIASES = {"wind_hail": "hail", "windstorm": "wind", "tornado": "wind", "auto_collision": "collision",
+                 "burglary": "theft"}
+
+_BIT = {peril: 1 << i for i, peril in enumerate(PERILS)}
+_COMPREHENSIVE = _BIT["hail"] | _BIT["wind"] | _BIT["fire"] | _BIT["theft"] | _BIT["vandalism"]
+# First-party property limits summed into property_limit
+_LIMIT_KEYS = ("dwelling", "other_structures", "personal_property", "building", "business_personal_property",
+               "farm_structures", "farm_personal_property", "livestock")
+_ADDRESS = re.compile(r"([^,]+),\s*([A-Za-z]{2})\s*(\d{5})?\s*$")
+
+
+def parse_location(address: str) -> tuple[str, str, int]:
+    """(city, state, ZIP) from "street, city, ST 12345"; blanks and 0 when absent."""
+    m = _ADDRESS.search(address or "")
+    if not m:
+        return "", "", 0
+    return m.group(1).strip(), m.group(2).upper(), int(m.group(3) or 0)
+
+
+def normalize_peril(peril: str) -> str:
+    key = peril.strip().lower()
+    key = PERIL_ALIASES.get(key, key)
+    if key not in _BIT:
+        raise ValueError(f"Unknown peril '{peril}'. Expected one of: {', '.join(PERILS)}")
+    return key
+
+
+class _Codes:
+    """Categorical column encoding: value -> int code, case-insensitive."""
+
+    def __init__(self):
+        self.values: list[str] = []
+        self._index: dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        key = value.lower()
+        code = self._index.get(key)
+        if code is None:
+            code = self._index[key] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, values: Iterable[str]) -> list[int]:
+        return [self._index[v.lower()] for v in values if v.lower() in self._index]
+
+
+def _deductible(coverage) -> float:
+    value = coverage.get("deductible") if isinstance(coverage, dict) else None
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+
+def _percent(value) -> float:
+    if isinstance(value, str) and value.endswith("_percent"):
+        try:
+            return float(value[:-len("_percent")])
+        except ValueError:
+            return np.nan
+    return np.nan
+
+
+class ExposureTable:
+    """Build once from the policy documents; queries never touch them again."""
+
+    def __init__(self, policies: Iterable[dict], client_addresses: dict[str, str]):
+        self.policy_ids: list[str] = []
+        self.policy_numbers: list[str] = []
+        self.client_ids: list[str] = []
+        self.statuses, self.types, self.carriers = _Codes(), _Codes(), _Codes()
+        self.cities, self.states = _Codes(), _Codes()
+        self.carrier_names: dict[str, int] = {}
+        cols: dict[str, list] = {name: [] for name in (
+            "status", "type", "carrier", "city", "state", "zip", "effective", "expiration", "perils",
+            "property", "deductible", "wind_hail_pct", "comprehensive", "collision", "base_limit",
+            "property_limit")}
+        locations: dict[str, tuple[str, str, int]] = {}
+
+        for pol in policies:
+            coverage = pol.get("coverage") or {}
+            vehicles = pol.get("vehicles") or []
+            comprehensive = [_deductible(coverage.get("comprehensive"))]
+            comprehensive += [_deductible((v.get("coverage") or {}).get("comprehensive")) for v in vehicles]
+            collision = [_deductible(coverage.get("collision"))]
+            collision += [_deductible((v.get("coverage") or {}).get("collision")) for v in vehicles]
+            # Lowest deductible across vehicles: the most that could be paid
+            comp_ded = min((d for d in comprehensive if d == d), default=np.nan)
+            coll_ded = min((d for d in collision if d == d), default=np.nan)
+            is_property = pol.get("type", "") in PROPERTY_TYPES
+            perils = _COMPREHENSIVE if is_property else 0
+            if "comprehensive" in coverage or comp_ded == comp_ded:
+                perils |= _COMPREHENSIVE
+            if "collision" in coverage or coll_ded == coll_ded:
+                perils |= _BIT["collision"]
+            address = (pol.get("property") or {}).get("address") or client_addresses.get(pol.get("client_id", ""), "")
+            location = locations.get(address)
+            if location is None:
+                # A client's policies share the client's address
+                location = locations[address] = parse_location(address)
+            city, state, zip_code = location
+
+            self.policy_ids.append(pol.get("id", ""))
+            self.policy_numbers.append(pol.get("policy_number", ""))
+            self.client_ids.append(pol.get("client_id", ""))
+            carrier_code = self.carriers.code(pol.get("carrier_id", ""))
+            if pol.get("carrier"):
+                self.carrier_names.setdefault(pol["carrier"].lower(), carrier_code)
+            cols["status"].append(self.statuses.code(pol.get("status", "")))
+            cols["type"].append(self.types.code(pol.get("type", "")))
+            cols["carrier"].append(carrier_code)
+            cols["city"].append(self.cities.code(city))
+            cols["state"].append(self.states.code(state))
+            cols["zip"].append(zip_code)
+            cols["effective"].append(pol.get("effective_date") or "NaT")
+            cols["expiration"].append(pol.get("expiration_date") or "NaT")
+            cols["perils"].append(perils)
+            cols["property"].append(is_property)
+            cols["deductible"].append(_deductible(coverage))
+            cols["wind_hail_pct"].append(_percent(coverage.get("wind_hail_deductible")))
+            cols["comprehensive"].append(comp_ded)
+            cols["collision"].append(coll_ded)
+            cols["base_limit"].append(float(coverage.get("dwelling") or coverage.get("building") or 0))
+            cols["property_limit"].append(float(sum(coverage[k] for k in _LIMIT_KEYS
+                                                    if isinstance(coverage.get(k), (int, float)))))
+
+        self.status = np.asarray(cols["status"], dtype=np.int16)
+        self.type = np.asarray(cols["type"], dtype=np.int16)
+        self.carrier = np.asarray(cols["carrier"], dtype=np.int32)
+        self.city = np.asarray(cols["city"], dtype=np.int32)
+        self.state = np.asarray(cols["state"], dtype=np.int16)
+        self.zip = np.asarray(cols["zip"], dtype=np.int32)
+        self.zip3 = (self.zip // 100).astype(np.int16)
+        # Days since the epoch; int32 compares several times faster than datetime64. A missing
+        # date leaves that end of the period open, as verify_coverage skips the check
+        self.effective = _days(cols["effective"], _OPEN_START)
+        self.expiration = _days(cols["expiration"], _OPEN_END)
+        self.perils = np.asarray(cols["perils"], dtype=np.uint8)
+        self.active = _isin(self.status, self.statuses.lookup(["active"]))
+        # carrier x type in one code, so both breakdowns come from a single bincount
+        self.carrier_type = self.carrier * len(self.types.values) + self.type
+        self.property = np.asarray(cols["property"], dtype=bool)
+        self.deductible = np.asarray(cols["deductible"], dtype=np.float64)
+        self.wind_hail_pct = np.asarray(cols["wind_hail_pct"], dtype=np.float64)
+        self.comprehensive = np.asarray(cols["comprehensive"], dtype=np.float64)
+        self.collision = np.asarray(cols["collision"], dtype=np.float64)
+        self.base_limit = np.asarray(cols["base_limit"], dtype=np.float64)
+        self.property_limit = np.asarray(cols["property_limit"], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.policy_ids)
+
+    def applicable_deductible(self, rows: np.ndarray, peril: str | None) -> np.ndarray:
+        """Deductible each selected policy would apply to a loss from the peril (NaN when unknown)."""
+        if peril is None:
+            return np.where(self.property[rows], self.deductible[rows], self.comprehensive[rows])
+        if peril == "collision":
+            return self.collision[rows]
+        property_ded = self.deductible[rows]
+        if peril in ("hail", "wind"):
+            pct_ded = self.wind_hail_pct[rows] * self.base_limit[rows] / 100
+            property_ded = np.where(np.isnan(pct_ded) | (pct_ded == 0), property_ded, pct_ded)
+        return np.where(self.property[rows], property_ded, self.comprehensive[rows])
+
+    def mask(self, as_of: str, peril: str | None = None, cities: list[str] | None = None,
+             states: list[str] | None = None, zips: list[str] | None = None, carriers: list[str] | None = None,
+             types: list[str] | None = None, include_inactive: bool = False) -> np.ndarray:
+        """Boolean row mask for policies in force on as_of (inclusive, as in verify_coverage).
+
+        zips takes 5-digit ZIP codes or 3-digit prefixes; carriers takes ids or names."""
+        day = int(np.datetime64(as_of, "D").astype(np.int64))
+        mask = self.effective <= day
+        mask &= self.expiration >= day
+        if not include_inactive:
+            mask &= self.active
+        if peril is not None:
+            mask &= (self.perils & _BIT[peril]) != 0
+        if cities:
+            mask &= _isin(self.city, self.cities.lookup(cities))
+        if states:
+            mask &= _isin(self.state, self.states.lookup(states))
+        if zips:
+            full = [int(z) for z in zips if len(z) == 5 and z.isdigit()]
+            prefixes = [int(z) for z in zips if len(z) == 3 and z.isdigit()]
+            mask &= _isin(self.zip, full) | _isin(self.zip3, prefixes)
+        if carriers:
+            codes = self.carriers.lookup(carriers)
+            codes += [self.carrier_names[c.lower()] for c in carriers if c.lower() in self.carrier_names]
+            mask &= _isin(self.carrier, codes)
+        if types:
+            mask &= _isin(self.type, self.types.lookup(types))
+        return mask
+
+    def query(self, as_of: str, peril: str | None = None, limit: int = 100, **filters) -> dict:
+        """Policies exposed to a peril on a date, with totals and breakdowns by carrier, type and
+        city. Lists the `limit` largest property limits first. Raises ValueError on a bad date or peril."""
+        start = time.perf_counter()
+        peril = normalize_peril(peril) if peril else None
+        try:
+            mask = self.mask(as_of, peril, **filters)
+        except ValueError:
+            raise ValueError(f"Invalid date '{as_of}'. Expected YYYY-MM-DD") from None
+        rows = np.flatnonzero(mask)
+        limits = self.property_limit[rows]
+        if len(rows) > limit:
+            top = np.argpartition(-limits, limit)[:limit] if limit else np.empty(0, dtype=np.intp)
+        else:
+            top = np.arange(len(rows))
+        top_rows = rows[top][np.lexsort((rows[top], -limits[top]))]
+        # Deductibles only for the policies listed
+        deductibles = self.applicable_deductible(top_rows, peril)
+        carrier_type = np.bincount(self.carrier_type[rows], minlength=len(self.carriers.values) * len(self.types.values))
+        carrier_type = carrier_type.reshape(len(self.carriers.values), len(self.types.values))
+
+        return {
+            "as_of": str(np.datetime64(as_of, "D")),
+            "peril": peril,
+            "matched": int(len(rows)),
+            "policies_in_book": len(self),
+            "total_property_limit": float(limits.sum()),
+            "by_carrier": _breakdown(carrier_type.sum(axis=1), self.carriers.values),
+            "by_type": _breakdown(carrier_type.sum(axis=0), self.types.values),
+            "by_city": _breakdown(np.bincount(self.city[rows], minlength=len(self.cities.values)),
+                                  self.cities.values),
+            "policies": [self._row(row, deductible) for row, deductible in zip(top_rows.tolist(), deductibles.tolist())],
+            "truncated": bool(len(rows) > limit),
+            "query_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    def _row(self, row: int, deductible: float) -> dict:
+        return {
+            "policy_id": self.policy_ids[row],
+            "policy_number": self.policy_numbers[row],
+            "client_id": self.client_ids[row],
+            "type": self.types.values[self.type[row]],
+            "carrier_id": self.carriers.values[self.carrier[row]],
+            "status": self.statuses.values[self.status[row]],
+            "city": self.cities.values[self.city[row]],
+            "state": self.states.values[self.state[row]],
+            "zip": f"{self.zip[row]:05d}" if self.zip[row] else "",
+            "effective_date": _date(self.effective[row]),
+            "expiration_date": _date(self.expiration[row]),
+            "property_limit": float(self.property_limit[row]),
+            "applicable_deductible": None if np.isnan(deductible) else float(deductible),
+        }
+
+
+_OPEN_START, _OPEN_END = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+
+def _days(values: list[str], missing: int) -> np.ndarray:
+    days = np.asarray(values, dtype="datetime64[D]")
+    return np.where(np.isnat(days), missing, days.astype(np.int64)).astype(np.int32)
+
+
+def _date(day: int) -> str:
+    return "" if day in (_OPEN_START, _OPEN_END) else str(np.datetime64(int(day), "D"))
+
+
+def _isin(column: np.ndarray, codes: list[int]) -> np.ndarray:
+    """np.isin for a handful of codes: == per code beats isin's sort on large columns."""
+    if len(codes) > 8:
+        return np.isin(column, codes)
+    mask = np.zeros(len(column), dtype=bool)
+    for code in codes:
+        mask |= column == code
+    return mask
+
+
+def _breakdown(counts: np.ndarray, values: list[str]) -> dict[str, int]:
+    return {values[code] or "unknown": int(counts[code]) for code in np.flatnonzero(counts).tolist()}
+
+
+_table: ExposureTable | None = None
+_table_generation = -1
+_table_lock = threading.Lock()
+
+
+def get_exposure_table() -> ExposureTable:
+    """Exposure table over the AMS book, rebuilt when the data is reloaded."""
+    global _table, _table_generation
+    store = get_ams_store()
+    if _table is None or store.generation != _table_generation:
+        with _table_lock:
+            if _table is None or store.generation != _table_generation:
+                generation = store.generation
+                addresses = {c.get("id", ""): c.get("address", "") for c in store.iter_clients()}
+                _table = ExposureTable(store.iter_policies(), addresses)
+                _table_generation = generation
+    return _table
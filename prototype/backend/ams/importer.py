@@ -0,0 +1,49 @@
+"""Import the AMS JSON documents into the SQLite store.
+
+    python -m backend.ams.importer                      # data/*.json -> AMS_DB_PATH
+    python -m backend.ams.importer --data-dir exports/ --db var/ams.sqlite3
+
+Replaces the store's contents in one transaction and bumps the store
+generation. A running server reads the new rows as soon as the transaction
+commits, and rebuilds its policy index, client index and exposure table on
+their next use.
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from backend.config import AMS_DB_PATH, DATA_DIR
+from backend.ams.store import SQLiteAMSStore
+
+
+def import_json(store: SQLiteAMSStore, data_dir: Path | str = DATA_DIR) -> dict[str, int]:
+    data_dir = Path(data_dir)
+    docs = {}
+    for name in ("clients", "policies", "carriers", "claims"):
+        with open(data_dir / f"{name}.json") as f:
+            docs[name] = json.load(f)[name]
+    return store.bulk_load(
+        clients=({"id": cid, **c} for cid, c in docs["clients"].items()),
+        policies=({"id": pid, **p} for pid, p in docs["policies"].items()),
+        carriers=({"id": cid, **c} for cid, c in docs["carriers"].items()),
+        claims=({"id": cid, **c} for cid, c in docs["claims"].items()),
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--db", default=AMS_DB_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = import_json(SQLiteAMSStore(args.db), args.data_dir)
+    print(f"Imported {counts} into {args.db} in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,394 @@
+"""AMS storage adapters behind the ams_api, carrier_api, claims_api tools and the carrier router.
+
+Records are the same JSON documents as ``data/*.json``; every adapter returns
+them unchanged, so tool outputs keep their shape whichever one is in use.
+
+- ``SQLiteAMSStore`` (AMS_BACKEND=sqlite, the default) keeps each document
+  as JSON next to the columns it is looked up by, with an index per lookup
+  path. Statements are fixed strings, so sqlite3's per-connection statement
+  cache prepares each one once; every thread gets its own connection (tools
+  run on executor threads). An empty database is filled from ``data/*.json``
+  on first use; ``python -m backend.ams.importer`` re-imports.
+- ``JsonAMSStore`` (AMS_BACKEND=json) loads the JSON files once into dicts,
+  for small demo books.
+
+``generation`` changes whenever clients or policies are reloaded, so derived
+indexes (policy numbers, client names, the exposure table) know when to
+rebuild. The SQLite store keeps it in its ``meta`` table, so an import by
+another process (``backend.ams.importer``) is seen by a running server. New
+claims do not change it.
+"""
+from __future__ import annotations
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from backend.config import AMS_BACKEND, AMS_DB_PATH, DATA_DIR
+from backend.serialization import dumps_str, loads
+
+
+class AMSStore(ABC):
+    """Interface shared by the adapters.
+
+    get_policy / get_policy_by_number match exactly; find_policy matches the
+    policy number, then the id, case-insensitively. search_policies returns
+    (policy, client name) pairs whose number, id or client name contains the
+    query, all of them unless a limit is given. find_carrier returns the first carrier whose name contains the
+    text. client_names yields (id, name, contact person); policy_numbers
+    yields (id, policy number). Claims come back in insertion order.
+    """
+    generation = 0
+
+    @abstractmethod
+    def get_policy(self, policy_id: str) -> dict | None: ...
+
+    @abstractmethod
+    def get_policy_by_number(self, policy_number: str) -> dict | None: ...
+
+    @abstractmethod
+    def find_policy(self, value: str) -> dict | None: ...
+
+    @abstractmethod
+    def get_policies(self, policy_ids: list[str]) -> dict[str, dict]: ...
+
+    @abstractmethod
+    def policy_numbers(self) -> Iterator[tuple[str, str]]: ...
+
+    def list_policies(self) -> list[dict]:
+        return list(self.iter_policies())
+
+    @abstractmethod
+    def iter_policies(self) -> Iterator[dict]: ...
+
+    @abstractmethod
+    def search_policies(self, query: str, limit: int | None = None) -> list[tuple[dict, str]]: ...
+
+    @abstractmethod
+    def get_client(self, client_id: str) -> dict | None: ...
+
+    @abstractmethod
+    def client_names(self) -> Iterator[tuple[str, str, str]]: ...
+
+    def list_clients(self) -> list[dict]:
+        return list(self.iter_clients())
+
+    @abstractmethod
+    def iter_clients(self) -> Iterator[dict]: ...
+
+    @abstractmethod
+    def get_carrier(self, carrier_id: str) -> dict | None: ...
+
+    @abstractmethod
+    def find_carrier(self, name: str) -> dict | None: ...
+
+    @abstractmethod
+    def list_carriers(self) -> list[dict]: ...
+
+    @abstractmethod
+    def get_claim(self, claim_id: str) -> dict | None: ...
+
+    @abstractmethod
+    def claims_for_client(self, client_id: str) -> list[dict]: ...
+
+    @abstractmethod
+    def add_claim(self, claim: dict) -> None: ...
+
+    @abstractmethod
+    def counts(self) -> dict[str, int]: ...
+
+
+class JsonAMSStore(AMSStore):
+    def __init__(self, data_dir: Path | str = DATA_DIR):
+        data_dir = Path(data_dir)
+        self._clients = _read(data_dir / "clients.json")["clients"]
+        self._policies = _read(data_dir / "policies.json")["policies"]
+        self._carriers = _read(data_dir / "carriers.json")["carriers"]
+        self._claims = _read(data_dir / "claims.json")["claims"]
+        self._by_number = {}
+        for pid, pol in self._policies.items():
+            self._by_number.setdefault(pol.get("policy_number", "").lower(), pid)
+        self._ids_lower = {pid.lower(): pid for pid in self._policies}
+        self._lock = threading.Lock()
+
+    def get_policy(self, policy_id):
+        return self._policies.get(policy_id)
+
+    def get_policy_by_number(self, policy_number):
+        pid = self._by_number.get(policy_number.lower())
+        pol = self._policies.get(pid) if pid else None
+        return pol if pol is not None and pol.get("policy_number", "") == policy_number else None
+
+    def find_policy(self, value):
+        pid = self._by_number.get(value.lower()) or self._ids_lower.get(value.lower())
+        return self._policies.get(pid) if pid else None
+
+    def get_policies(self, policy_ids):
+        return {pid: self._policies[pid] for pid in policy_ids if pid in self._policies}
+
+    def policy_numbers(self):
+        return ((pid, pol.get("policy_number", "")) for pid, pol in self._policies.items())
+
+    def iter_policies(self):
+        return iter(self._policies.values())
+
+    def search_policies(self, query, limit=None):
+        q = query.lower()
+        results = []
+        for pid, pol in self._policies.items():
+            name = self._clients.get(pol.get("client_id", ""), {}).get("name", "")
+            if q in pol.get("policy_number", "").lower() or q in pid.lower() or q in name.lower():
+                results.append((pol, name))
+                if len(results) == limit:
+                    break
+        return results
+
+    def get_client(self, client_id):
+        return self._clients.get(client_id)
+
+    def client_names(self):
+        return ((cid, c.get("name") or "", c.get("contact_person") or "") for cid, c in self._clients.items())
+
+    def iter_clients(self):
+        return iter(self._clients.values())
+
+    def get_carrier(self, carrier_id):
+        return self._carriers.get(carrier_id)
+
+    def find_carrier(self, name):
+        needle = name.lower()
+        return next((c for c in self._carriers.values() if needle in c.get("name", "").lower()), None)
+
+    def list_carriers(self):
+        return list(self._carriers.values())
+
+    def get_claim(self, claim_id):
+        return self._claims.get(claim_id)
+
+    def claims_for_client(self, client_id):
+        return [c for c in self._claims.values() if c.get("client_id") == client_id]
+
+    def add_claim(self, claim):
+        with self._lock:
+            self._claims[claim["id"]] = claim
+
+    def counts(self):
+        return {"clients": len(self._clients), "policies": len(self._policies),
+                "carriers": len(self._carriers), "claims": len(self._claims)}
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS clients (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    contact_person TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS policies (
+    id TEXT PRIMARY KEY,
+    policy_number TEXT NOT NULL,
+    client_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS policies_number ON policies (policy_number COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS policies_id_nocase ON policies (id COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS carriers (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS claims (
+    id TEXT PRIMARY KEY,
+    client_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS claims_client ON claims (client_id);
+"""
+
+_GET_GENERATION = "SELECT value FROM meta WHERE key = 'generation'"
+_BUMP_GENERATION = ("INSERT INTO meta VALUES ('generation', '1') "
+                    "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1")
+_GET_POLICY = "SELECT data FROM policies WHERE id = ?"
+_GET_POLICY_BY_NUMBER = "SELECT policy_number, data FROM policies WHERE policy_number = ? COLLATE NOCASE ORDER BY rowid"
+_FIND_POLICY_BY_NUMBER = "SELECT data FROM policies WHERE policy_number = ? COLLATE NOCASE ORDER BY rowid LIMIT 1"
+_FIND_POLICY_BY_ID = "SELECT data FROM policies WHERE id = ? COLLATE NOCASE ORDER BY rowid LIMIT 1"
+_GET_CLIENT = "SELECT data FROM clients WHERE id = ?"
+_GET_CARRIER = "SELECT data FROM carriers WHERE id = ?"
+_FIND_CARRIER = "SELECT data FROM carriers WHERE instr(lower(name), lower(?)) > 0 ORDER BY rowid LIMIT 1"
+_GET_CLAIM = "SELECT data FROM claims WHERE id = ?"
+_CLAIMS_FOR_CLIENT = "SELECT data FROM claims WHERE client_id = ? ORDER BY rowid"
+_UPSERT_CLAIM = ("INSERT INTO claims (id, client_id, data) VALUES (?, ?, ?) "
+                 "ON CONFLICT (id) DO UPDATE SET client_id = excluded.client_id, data = excluded.data")
+_SEARCH_POLICIES = """
+SELECT p.data, coalesce(c.name, '') FROM policies p LEFT JOIN clients c ON c.id = p.client_id
+WHERE instr(lower(p.policy_number), ?1) > 0 OR instr(lower(p.id), ?1) > 0 OR instr(lower(c.name), ?1) > 0
+ORDER BY p.rowid LIMIT ?2
+"""
+
+
+class SQLiteAMSStore(AMSStore):
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, cached_statements=64)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA mmap_size = 268435456")
+            self._local.conn = conn
+        return conn
+
+    @property
+    def generation(self) -> int:
+        # Read each time: the importer may have reloaded the data from another process
+        row = self._conn().execute(_GET_GENERATION).fetchone()
+        return int(row[0]) if row else 0
+
+    def _one(self, sql: str, *params) -> dict | None:
+        row = self._conn().execute(sql, params).fetchone()
+        return loads(row[0]) if row else None
+
+    def get_policy(self, policy_id):
+        return self._one(_GET_POLICY, policy_id)
+
+    def get_policy_by_number(self, policy_number):
+        # Exact match, served by the NOCASE index
+        for number, data in self._conn().execute(_GET_POLICY_BY_NUMBER, (policy_number,)):
+            if number == policy_number:
+                return loads(data)
+        return None
+
+    def find_policy(self, value):
+        return self._one(_FIND_POLICY_BY_NUMBER, value) or self._one(_FIND_POLICY_BY_ID, value)
+
+    def get_policies(self, policy_ids):
+        if not policy_ids:
+            return {}
+        # One statement per list length; clients hold a handful of policies, so the cache covers them
+        sql = f"SELECT id, data FROM policies WHERE id IN ({','.join('?' * len(policy_ids))})"
+        return {pid: loads(data) for pid, data in self._conn().execute(sql, policy_ids)}
+
+    def policy_numbers(self):
+        return iter(self._conn().execute("SELECT id, policy_number FROM policies ORDER BY rowid"))
+
+    def iter_policies(self):
+        return (loads(d) for (d,) in self._conn().execute("SELECT data FROM policies ORDER BY rowid"))
+
+    def search_policies(self, query, limit=None):
+        rows = self._conn().execute(_SEARCH_POLICIES, (query.lower(), -1 if limit is None else limit))
+        return [(loads(d), name) for d, name in rows]
+
+    def get_client(self, client_id):
+        return self._one(_GET_CLIENT, client_id)
+
+    def client_names(self):
+        return iter(self._conn().execute("SELECT id, name, contact_person FROM clients ORDER BY rowid"))
+
+    def iter_clients(self):
+        return (loads(d) for (d,) in self._conn().execute("SELECT data FROM clients ORDER BY rowid"))
+
+    def get_carrier(self, carrier_id):
+        return self._one(_GET_CARRIER, carrier_id)
+
+    def find_carrier(self, name):
+        return self._one(_FIND_CARRIER, name)
+
+    def list_carriers(self):
+        return [loads(d) for (d,) in self._conn().execute("SELECT data FROM carriers ORDER BY rowid")]
+
+    def get_claim(self, claim_id):
+        return self._one(_GET_CLAIM, claim_id)
+
+    def claims_for_client(self, client_id):
+        return [loads(d) for (d,) in self._conn().execute(_CLAIMS_FOR_CLIENT, (client_id,))]
+
+    def add_claim(self, claim):
+        with self._write_lock:
+            self._conn().execute(_UPSERT_CLAIM, (claim["id"], claim.get("client_id", ""), dumps_str(claim)))
+
+    def counts(self):
+        conn = self._conn()
+        return {table: conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+                for table in ("clients", "policies", "carriers", "claims")}
+
+    def is_empty(self) -> bool:
+        return self._conn().execute("SELECT 1 FROM meta WHERE key = 'imported_at'").fetchone() is None
+
+    def bulk_load(self, clients: Iterable[dict], policies: Iterable[dict], carriers: Iterable[dict],
+                  claims: Iterable[dict], replace: bool = True) -> dict[str, int]:
+        """Load documents in one transaction (see backend.ams.importer)."""
+        counts = {}
+        conn = self._conn()
+        with self._write_lock:
+            conn.execute("BEGIN")
+            try:
+                if replace:
+                    for table in ("clients", "policies", "carriers", "claims"):
+                        conn.execute(f"DELETE FROM {table}")
+                counts["clients"] = _insert(conn, "INSERT OR REPLACE INTO clients VALUES (?, ?, ?, ?)", (
+                    (c["id"], c.get("name") or "", c.get("contact_person") or "", dumps_str(c)) for c in clients))
+                counts["policies"] = _insert(conn, "INSERT OR REPLACE INTO policies VALUES (?, ?, ?, ?)", (
+                    (p["id"], p.get("policy_number", ""), p.get("client_id", ""), dumps_str(p)) for p in policies))
+                counts["carriers"] = _insert(conn, "INSERT OR REPLACE INTO carriers VALUES (?, ?, ?)", (
+                    (c["id"], c.get("name", ""), dumps_str(c)) for c in carriers))
+                counts["claims"] = _insert(conn, "INSERT OR REPLACE INTO claims VALUES (?, ?, ?)", (
+                    (c["id"], c.get("client_id", ""), dumps_str(c)) for c in claims))
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('imported_at', datetime('now'))")
+                conn.execute(_BUMP_GENERATION)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        conn.execute("ANALYZE")
+        return counts
+
+
+def _insert(conn: sqlite3.Connection, sql: str, rows: Iterable[tuple], batch: int = 10000) -> int:
+    total = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == batch:
+            conn.executemany(sql, chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        conn.executemany(sql, chunk)
+        total += len(chunk)
+    return total
+
+
+def _read(path: Path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+_store: AMSStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_ams_store() -> AMSStore:
+    """The configured AMS store, opened (and for SQLite, seeded from data/*.json) on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if AMS_BACKEND == "json":
+                    _store = JsonAMSStore(DATA_DIR)
+                else:
+                    store = SQLiteAMSStore(AMS_DB_PATH)
+                    if store.is_empty():
+                        from backend.ams.importer import import_json
+                        import_json(store, DATA_DIR)
+                    _store = store
+    return _store
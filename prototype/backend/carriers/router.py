@@ -1,21 +1,7 @@
 """Carrier routing — routes claims to correct carrier with correct format."""
 from __future__ import annotations
-import json
-from pathlib import Path
 
-from backend.config import DATA_DIR
-
-_carriers_path = DATA_DIR / "carriers.json"
-_policies_path = DATA_DIR / "policies.json"
-
-
-def _load_carriers():
-    with open(_carriers_path) as f:
-        return json.load(f)["carriers"]
-
-def _load_policies():
-    with open(_policies_path) as f:
-        return json.load(f)["policies"]
+from backend.ams.store import get_ams_store
 
 
 class CarrierRouter:
@@ -23,22 +9,18 @@ class CarrierRouter:
 
     def get_carrier_for_policy(self, policy_id: str) -> dict:
         """Look up which carrier insures this policy."""
-        policies = _load_policies()
-        carriers = _load_carriers()
+        store = get_ams_store()
 
-        policy = policies.get(policy_id)
+        policy = store.get_policy(policy_id)
         if not policy:
             # Try by policy_number
-            for pid, pol in policies.items():
-                if pol.get("policy_number", "") == policy_id:
-                    policy = pol
-                    break
+            policy = store.get_policy_by_number(policy_id)
 
         if not policy:
             return {"error": f"Policy {policy_id} not found"}
 
         carrier_id = policy.get("carrier_id", "")
-        carrier = carriers.get(carrier_id, {})
+        carrier = store.get_carrier(carrier_id) or {}
 
         return {
             "carrier_id": carrier_id,
@@ -53,8 +35,7 @@ class CarrierRouter:
 
     def get_required_fields(self, carrier_id: str, loss_type: str = "") -> list[str]:
         """Get the required FNOL fields for this carrier."""
-        carriers = _load_carriers()
-        carrier = carriers.get(carrier_id, {})
+        carrier = get_ams_store().get_carrier(carrier_id) or {}
         return carrier.get("required_fnol_fields", [
             "policy_number", "date_of_loss", "location", "description", "claimant_contact"
         ])
@@ -0,0 +1,98 @@
+"""Negotiated response compression.
+
+Pure ASGI middleware that compresses buffered JSON/text responses of at least
+COMPRESSION_MIN_BYTES with brotli (when the ``brotli`` package is installed
+and the client accepts ``br``) or gzip. Streaming responses (file downloads,
+static assets sent in chunks) and responses that already carry a
+Content-Encoding pass through untouched.
+"""
+from __future__ import annotations
+import gzip
+
+from backend.config import COMPRESSION_MIN_BYTES, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+_COMPRESSIBLE = (b"application/json", b"text/", b"application/javascript")
+
+
+def _accepted(accept_encoding: str) -> str:
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        offered[name.strip().lower()] = q
+    if brotli is not None and offered.get("br", 0) > 0:
+        return "br"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return ""
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        encoding = _accepted(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            response_headers = dict(start_message["headers"])
+            content_type = response_headers.get(b"content-type", b"")
+            if (message.get("more_body", False) or len(body) < self.minimum_size
+                    or b"content-encoding" in response_headers
+                    or not content_type.startswith(_COMPRESSIBLE)):
+                # Streaming, small, already encoded or binary: send as is
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            new_headers = [(k, v) for k, v in start_message["headers"] if k.lower() != b"content-length"]
+            new_headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send({**start_message, "headers": new_headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -20,12 +20,103 @@ TEMPERATURE = float(os.getenv("TEMPERATURE", "0.1"))
 
 # Agent
 MAX_AGENT_STEPS = int(os.getenv("MAX_AGENT_STEPS", "5"))
+# Per-request latency budget; the agent loop forces a final answer before it runs out
+AGENT_LATENCY_BUDGET_MS = int(os.getenv("AGENT_LATENCY_BUDGET_MS", "20000"))
+# Initial guess for one model call, until real latencies have been observed
+AGENT_STEP_ESTIMATE_MS = int(os.getenv("AGENT_STEP_ESTIMATE_MS", "3000"))
+# Floor for max_tokens as the budget shrinks
+AGENT_MIN_TOKENS = int(os.getenv("AGENT_MIN_TOKENS", "512"))
+# Start the current specialist alongside supervisor classification on follow-up turns
+SPECULATIVE_ROUTING = os.getenv("SPECULATIVE_ROUTING", "true").lower() == "true"
+# Longest list (vehicles, timeline events, search results) sent back to the model in a tool result
+TOOL_RESULT_MAX_LIST_ITEMS = int(os.getenv("TOOL_RESULT_MAX_LIST_ITEMS", "5"))
+
+# Model client — adaptive (AIMD) in-flight limit
+LLM_CONCURRENCY_INITIAL = int(os.getenv("LLM_CONCURRENCY_INITIAL", "8"))
+LLM_CONCURRENCY_MIN = int(os.getenv("LLM_CONCURRENCY_MIN", "1"))
+LLM_CONCURRENCY_MAX = int(os.getenv("LLM_CONCURRENCY_MAX", "64"))
+LLM_LATENCY_TARGET_MS = int(os.getenv("LLM_LATENCY_TARGET_MS", "10000"))
+LLM_QUEUE_TIMEOUT_S = float(os.getenv("LLM_QUEUE_TIMEOUT_S", "30"))
+
+# Model client — record/replay cassettes for offline runs (off | record | replay)
+LLM_CASSETTE_MODE = os.getenv("LLM_CASSETTE_MODE", "off")
+LLM_CASSETTE_PATH = os.getenv("LLM_CASSETTE_PATH", str(BASE_DIR.parent / "cassettes" / "demo.jsonl.gz"))
+# Replay sleeps for recorded latency x scale (0 = answer instantly)
+LLM_CASSETTE_LATENCY_SCALE = float(os.getenv("LLM_CASSETTE_LATENCY_SCALE", "1.0"))
+
+# Single-flight — identical concurrent read-only tool calls, knowledge-base searches and model
+# calls at or below this temperature (deterministic by default) share one execution
+SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() == "true"
+SINGLEFLIGHT_MODEL_MAX_TEMPERATURE = float(os.getenv("SINGLEFLIGHT_MODEL_MAX_TEMPERATURE", "0"))
+
+# Tracing — share of requests (decided at the root span) written to the JSONL exporter
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+# Empty disables export; traces still appear in API responses
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+# Recent request traces kept in memory for /api/debug/traces
+TRACE_STORE_CAPACITY = int(os.getenv("TRACE_STORE_CAPACITY", "500"))
+# Detail embedded in chat/intake responses when the request has no ?trace= (none | summary | full)
+TRACE_DEFAULT_LEVEL = os.getenv("TRACE_DEFAULT_LEVEL", "full")
+
+# Per-request sampling profiler — X-Profile: 1 plus X-Admin-Token, or a random share of /api requests
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+# HTTP response compression (brotli when installed and accepted, else gzip)
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+# Idempotency-Key on claim intake/approve/submit — a completed response is replayed for the
+# TTL and a retry of a request still in flight waits for it; oldest keys go beyond the cap
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "1000"))
 
 # RAG
 RAG_CHUNK_SIZE = int(os.getenv("RAG_CHUNK_SIZE", "500"))
 RAG_CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "100"))
 RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
 
+# AMS storage — "sqlite" (indexed, seeded from data/*.json on first start) or "json" (in-memory dicts)
+AMS_BACKEND = os.getenv("AMS_BACKEND", "sqlite").lower()
+AMS_DB_PATH = os.getenv("AMS_DB_PATH", str(BASE_DIR.parent / "var" / "ams.sqlite3"))
+
+# Claims dashboard sync — deltas kept for clients resuming from a version; older clients get a snapshot
+CLAIM_CHANGELOG_SIZE = int(os.getenv("CLAIM_CHANGELOG_SIZE", "1000"))
+
+# Claim journal — state transitions are fsynced in batches every flush interval, with a
+# compacted snapshot every N events so startup replays a bounded tail
+JOURNAL_ENABLED = os.getenv("JOURNAL_ENABLED", "true").lower() == "true"
+JOURNAL_DIR = os.getenv("JOURNAL_DIR", str(BASE_DIR.parent / "var" / "journal"))
+JOURNAL_FLUSH_INTERVAL_MS = float(os.getenv("JOURNAL_FLUSH_INTERVAL_MS", "20"))
+JOURNAL_SNAPSHOT_EVERY = int(os.getenv("JOURNAL_SNAPSHOT_EVERY", "1000"))
+
+# Audit log — queued and written to rotated NDJSON in fsynced batches; a full queue
+# makes chat turns wait rather than drop entries
+AUDIT_ENABLED = os.getenv("AUDIT_ENABLED", "true").lower() == "true"
+AUDIT_DIR = os.getenv("AUDIT_DIR", str(BASE_DIR.parent / "var" / "audit"))
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "256"))
+AUDIT_FLUSH_INTERVAL_MS = float(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "50"))
+AUDIT_MAX_BYTES = int(os.getenv("AUDIT_MAX_BYTES", str(50 * 1024 * 1024)))
+AUDIT_BACKUPS = int(os.getenv("AUDIT_BACKUPS", "10"))
+AUDIT_SESSION_RING = int(os.getenv("AUDIT_SESSION_RING", "50"))
+
+# Catastrophe surge mode — same-event claims (date of loss, peril, region) share carrier
+# requirements, procedure lookups and document templates. "auto" turns it on for an event
+# once it has SURGE_MIN_CLAIMS claims; "on" always, "off" never
+SURGE_MODE = os.getenv("SURGE_MODE", "auto").lower()
+SURGE_MIN_CLAIMS = int(os.getenv("SURGE_MIN_CLAIMS", "3"))
+SURGE_WINDOW_MINUTES = int(os.getenv("SURGE_WINDOW_MINUTES", "720"))
+
+# Intake dedup — repeat and near-duplicate FNOL emails are linked to the existing claim before
+# any model call; a second report of the same extracted policy and date of loss is flagged for
+# review. Each LSH bucket keeps its newest DEDUP_BUCKET_SIZE claims, which bounds the work per email
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+DEDUP_SIMILARITY = float(os.getenv("DEDUP_SIMILARITY", "0.8"))
+DEDUP_BUCKET_SIZE = int(os.getenv("DEDUP_BUCKET_SIZE", "64"))
+
 # Session
 SESSION_TIMEOUT_MINUTES = int(os.getenv("SESSION_TIMEOUT_MINUTES", "60"))
 
@@ -0,0 +1,199 @@
+"""Idempotency-Key support for the claim endpoints that do expensive or one-time work.
+
+Pure ASGI middleware. A POST to an IDEMPOTENT_ROUTES path carrying an
+``Idempotency-Key`` header is recorded under (method, path, key) with a
+fingerprint of its query string and body:
+
+- first request: runs normally; a final response below 500 is stored for
+  IDEMPOTENCY_TTL_SECONDS (5xx and exceptions release the key so a retry
+  runs again);
+- retry while the first is still running: waits for it, then gets its
+  response;
+- retry after it completed: the stored response is replayed with
+  ``Idempotent-Replayed: true``;
+- same key with a different query or body: 422.
+
+Responses are stored uncompressed (the middleware sits inside compression),
+at most IDEMPOTENCY_MAX_KEYS of them, oldest evicted first. Requests
+without the header are untouched. The dashboard sends a key with every
+demo-scenario intake, approve and submit (see actionKey in app.js).
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from backend.config import IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_KEYS
+
+IDEMPOTENT_ROUTES = (
+    re.compile(r"^/api/claims/intake$"),
+    re.compile(r"^/api/demo/scenario/[^/]+$"),
+    re.compile(r"^/api/claims/[^/]+/approve$"),
+    re.compile(r"^/api/claims/[^/]+/submit$"),
+)
+MAX_KEY_LENGTH = 255
+
+
+@dataclass
+class StoredResponse:
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    duration_s: float
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    expires: float
+    done: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+    response: StoredResponse | None = None
+
+
+class IdempotencyStore:
+    """TTL map from (method, path, key) to the in-flight or completed response. Event loop only."""
+
+    def __init__(self, ttl_seconds: int = 86400, max_keys: int = 1000):
+        self.ttl = ttl_seconds
+        self.max_keys = max_keys
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self.stats = {"new": 0, "replayed": 0, "joined": 0, "mismatch": 0, "released": 0, "saved_seconds": 0.0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def begin(self, key: tuple, fingerprint: str) -> tuple[str, _Entry | None]:
+        """("new", entry) to run the request, ("wait" | "replay", entry) for a retry, ("mismatch", None)."""
+        self._prune(time.time())
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry(fingerprint, time.time() + self.ttl)
+            self.stats["new"] += 1
+            return "new", entry
+        if entry.fingerprint != fingerprint:
+            self.stats["mismatch"] += 1
+            return "mismatch", None
+        return ("replay" if entry.response is not None else "wait"), entry
+
+    def complete(self, key: tuple, entry: _Entry, response: StoredResponse | None) -> None:
+        """Store the final response, or release the key (None) so a retry runs again."""
+        if response is not None:
+            entry.response = response
+        elif self._entries.get(key) is entry:
+            del self._entries[key]
+            self.stats["released"] += 1
+        if not entry.done.done():
+            entry.done.set_result(None)
+
+    def reused(self, how: str, response: StoredResponse) -> None:
+        self.stats[how] += 1
+        self.stats["saved_seconds"] += response.duration_s
+
+    def _prune(self, now: float) -> None:
+        # Fixed TTL: insertion order is expiry order
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires > now and len(self._entries) < self.max_keys:
+                break
+            if entry.response is None and entry.expires > now:
+                break  # never evict a request still running
+            del self._entries[key]
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app, store: IdempotencyStore | None = None):
+        self.app = app
+        # An empty store is falsy (__len__), so test for None
+        self.store = store if store is not None else idempotency_store
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or \
+                not any(r.match(scope["path"]) for r in IDEMPOTENT_ROUTES):
+            await self.app(scope, receive, send)
+            return
+        idempotency_key = dict(scope["headers"]).get(b"idempotency-key", b"").decode("latin-1").strip()
+        if not idempotency_key:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > MAX_KEY_LENGTH:
+            await _send_json(send, 400, {"detail": f"Idempotency-Key longer than {MAX_KEY_LENGTH} characters"})
+            return
+
+        body = await _read_body(receive)
+        fingerprint = hashlib.sha256(scope.get("query_string", b"") + b"?" + body).hexdigest()
+        key = (scope["method"], scope["path"], idempotency_key)
+        while True:
+            state, entry = self.store.begin(key, fingerprint)
+            if state == "mismatch":
+                await _send_json(send, 422, {"detail": "Idempotency-Key was already used with a different request"})
+                return
+            if state == "new":
+                break
+            if state == "wait":
+                await asyncio.shield(entry.done)
+                if entry.response is None:
+                    continue  # the original failed and released the key; run it here
+                state = "joined"
+            else:
+                state = "replayed"
+            self.store.reused(state, entry.response)
+            await _replay(send, entry.response)
+            return
+
+        start = time.perf_counter()
+        status, headers, chunks = 500, [], []
+        body_sent = False
+
+        async def replay_receive():
+            # The body was read for the fingerprint; hand it over once, then pass disconnects through
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send_wrapper(message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status, headers = message["status"], list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        response = None
+        try:
+            await self.app(scope, replay_receive, send_wrapper)
+            if status < 500:
+                response = StoredResponse(status, headers, b"".join(chunks), time.perf_counter() - start)
+        finally:
+            self.store.complete(key, entry, response)
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def _replay(send, response: StoredResponse) -> None:
+    await send({"type": "http.response.start", "status": response.status,
+                "headers": response.headers + [(b"idempotent-replayed", b"true")]})
+    await send({"type": "http.response.body", "body": response.body})
+
+
+async def _send_json(send, status: int, payload: dict) -> None:
+    body = json.dumps(payload).encode()
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+
+# Singleton
+idempotency_store = IdempotencyStore(IDEMPOTENCY_TTL_SECONDS, IDEMPOTENCY_MAX_KEYS)
@@ -0,0 +1 @@
+# ClaimFlow AI — model client layer
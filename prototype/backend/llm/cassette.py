@@ -0,0 +1,142 @@
+"""Record/replay cassettes for model calls.
+
+In record mode every ``messages.create`` request is fingerprinted and its
+response (text and tool_use blocks, stop reason, usage, latency) appended to a
+gzip-compressed JSONL cassette. In replay mode the same requests are answered
+from the cassette — no network, no API key — optionally sleeping for the
+recorded latency times LLM_CASSETTE_LATENCY_SCALE, so the pipeline can be
+benchmarked and regression-tested offline.
+"""
+from __future__ import annotations
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+import logging
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# IDs minted per run (claim records, AMS claims, escalations, sessions) that end
+# up in prompts; normalized so a replayed run matches the recorded one.
+_VOLATILE_IDS = [
+    (re.compile(r"\bCF-\d{8}-[0-9A-F]{4}\b"), "CF-<id>"),
+    (re.compile(r"\bCLM-\d{4}-[0-9A-F]{4}\b"), "CLM-<id>"),
+    (re.compile(r"\bESC-[0-9A-F]{8}\b"), "ESC-<id>"),
+    (re.compile(r"\bsess_[0-9a-f]{12}\b"), "sess_<id>"),
+]
+
+# Request fields that don't change the model's answer for replay purposes
+# (max_tokens shrinks with the latency budget).
+_UNFINGERPRINTED = {"max_tokens"}
+
+
+class CassetteMiss(KeyError):
+    """Replay found no recorded response for a request."""
+
+
+def fingerprint(request: dict) -> str:
+    """Stable hash of a messages.create request."""
+    canonical = json.dumps(
+        {k: v for k, v in request.items() if k not in _UNFINGERPRINTED},
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    for pattern, replacement in _VOLATILE_IDS:
+        canonical = pattern.sub(replacement, canonical)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+def _dump_response(response: Any) -> dict:
+    content = []
+    for block in response.content:
+        if block.type == "text":
+            content.append({"type": "text", "text": block.text})
+        elif block.type == "tool_use":
+            content.append({"type": "tool_use", "id": block.id, "name": block.name, "input": block.input})
+    usage = getattr(response, "usage", None)
+    return {
+        "content": content,
+        "stop_reason": getattr(response, "stop_reason", None),
+        "usage": {
+            "input_tokens": getattr(usage, "input_tokens", 0),
+            "output_tokens": getattr(usage, "output_tokens", 0),
+        },
+    }
+
+
+def _load_response(data: dict) -> SimpleNamespace:
+    """Rebuild an object with the attribute shape callers read off SDK responses."""
+    return SimpleNamespace(
+        content=[SimpleNamespace(**block) for block in data["content"]],
+        stop_reason=data.get("stop_reason"),
+        usage=SimpleNamespace(**data.get("usage", {})),
+    )
+
+
+class Cassette:
+    """One cassette file, in either record or replay mode."""
+
+    def __init__(self, path: str | Path, mode: str = "replay", latency_scale: float = 1.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        self._entries: dict[str, list[dict]] = {}
+        self._cursor: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        if mode == "replay":
+            self._load()
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["fp"], []).append(entry)
+        logger.info(f"[Cassette] Loaded {sum(len(v) for v in self._entries.values())} responses from {self.path}")
+
+    def record(self, request: dict, response: Any, latency_ms: int) -> None:
+        entry = {"fp": fingerprint(request), "model": request.get("model", ""),
+                 "latency_ms": latency_ms, "response": _dump_response(response)}
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            # Each append is its own gzip member; readers see one continuous stream
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line)
+            self.recorded += 1
+
+    def replay(self, request: dict) -> SimpleNamespace:
+        """Return the recorded response for a request, after the (scaled) recorded latency."""
+        fp = fingerprint(request)
+        entries = self._entries.get(fp)
+        if entries is None and (request.get("tool_choice") or {}).get("type") == "none":
+            # A deadline-forced final answer that wasn't forced when recorded
+            entries = self._entries.get(fingerprint({k: v for k, v in request.items() if k != "tool_choice"}))
+        with self._lock:
+            if not entries:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded response for request {fp} in {self.path}")
+            self.hits += 1
+            # Identical requests replay their recordings in order, then repeat the last
+            i = self._cursor.get(fp, 0)
+            self._cursor[fp] = i + 1
+            entry = entries[min(i, len(entries) - 1)]
+        if self.latency_scale > 0:
+            time.sleep(entry["latency_ms"] * self.latency_scale / 1000)
+        return _load_response(entry["response"])
+
+    def stats(self) -> dict:
+        return {"path": str(self.path), "mode": self.mode, "latency_scale": self.latency_scale,
+                "hits": self.hits, "misses": self.misses, "recorded": self.recorded}
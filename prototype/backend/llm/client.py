@@ -0,0 +1,94 @@
+"""Shared model client for ClaimFlow AI.
+
+Agents call ``client.messages.create(...)`` exactly as they would on the
+Anthropic SDK; this wrapper adds the adaptive concurrency limit, the
+record/replay cassette layer and single-flight for deterministic calls in
+one place.
+"""
+from __future__ import annotations
+import time
+from typing import Any
+import anthropic
+
+from backend.config import (
+    LLM_CONCURRENCY_INITIAL, LLM_CONCURRENCY_MIN, LLM_CONCURRENCY_MAX,
+    LLM_LATENCY_TARGET_MS, LLM_QUEUE_TIMEOUT_S,
+    LLM_CASSETTE_MODE, LLM_CASSETTE_PATH, LLM_CASSETTE_LATENCY_SCALE,
+    SINGLEFLIGHT_MODEL_MAX_TEMPERATURE,
+)
+from backend.llm.concurrency import AIMDLimiter
+from backend.llm.cassette import Cassette
+from backend.singleflight import model_flight, request_key
+
+
+class _Messages:
+    def __init__(self, owner: "ModelClient"):
+        self._owner = owner
+
+    def create(self, **kwargs) -> Any:
+        return self._owner.create_message(**kwargs)
+
+
+class ModelClient:
+    def __init__(self, limiter: AIMDLimiter, cassette: Cassette | None = None):
+        self.limiter = limiter
+        self.cassette = cassette
+        self.messages = _Messages(self)
+        self._sdk: anthropic.Anthropic | None = None
+
+    def use_backend(self, backend: Any) -> None:
+        """Replace the Anthropic SDK with any object exposing ``messages.create`` (e.g. a load-test fake)."""
+        self._sdk = backend
+
+    def use_cassette(self, cassette: Cassette | None) -> None:
+        """Switch recording/replay on (or off with None) at runtime."""
+        self.cassette = cassette
+
+    @property
+    def sdk(self) -> anthropic.Anthropic:
+        if self._sdk is None:
+            self._sdk = anthropic.Anthropic()
+        return self._sdk
+
+    def create_message(self, **kwargs) -> Any:
+        # Identical deterministic requests in flight share one call (and one concurrency slot)
+        if kwargs.get("temperature", 1.0) <= SINGLEFLIGHT_MODEL_MAX_TEMPERATURE:
+            return model_flight.do(request_key(kwargs), self._create, kwargs)
+        return self._create(kwargs)
+
+    def _create(self, kwargs: dict) -> Any:
+        saturated = self.limiter.acquire()
+        start = time.time()
+        error = None
+        try:
+            if self.cassette and self.cassette.mode == "replay":
+                return self.cassette.replay(kwargs)
+            response = self.sdk.messages.create(**kwargs)
+            if self.cassette:
+                self.cassette.record(kwargs, response, int((time.time() - start) * 1000))
+            return response
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.limiter.release(int((time.time() - start) * 1000), error, saturated)
+
+    def stats(self) -> dict:
+        stats = {"concurrency": self.limiter.snapshot()}
+        if self.cassette:
+            stats["cassette"] = self.cassette.stats()
+        return stats
+
+
+# Singleton
+client = ModelClient(
+    AIMDLimiter(
+        initial=LLM_CONCURRENCY_INITIAL,
+        min_limit=LLM_CONCURRENCY_MIN,
+        max_limit=LLM_CONCURRENCY_MAX,
+        latency_target_ms=LLM_LATENCY_TARGET_MS,
+        queue_timeout_s=LLM_QUEUE_TIMEOUT_S,
+    ),
+    cassette=Cassette(LLM_CASSETTE_PATH, LLM_CASSETTE_MODE, LLM_CASSETTE_LATENCY_SCALE)
+    if LLM_CASSETTE_MODE != "off" else None,
+)
@@ -0,0 +1,124 @@
+"""Adaptive (AIMD) concurrency limit for model calls.
+
+The limit grows by roughly one slot per window of fast calls (additive
+increase) and is cut multiplicatively on 429 / overloaded errors or latency
+spikes, the same way TCP congestion control probes for available bandwidth.
+Only calls that found every slot busy, when they started or finished, grow
+the limit: fast calls at low load say nothing about capacity beyond what is
+in use, and would otherwise walk the limit up to its maximum.
+"""
+from __future__ import annotations
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses that mean "slow down": rate limited, overloaded, unavailable
+OVERLOAD_STATUS_CODES = {429, 503, 529}
+
+
+class ConcurrencyLimitExceeded(Exception):
+    """Raised when a call waited longer than the queue timeout for a slot."""
+
+
+def is_overload_error(error: Exception) -> bool:
+    """True if the model API rejected the call because of load."""
+    return getattr(error, "status_code", None) in OVERLOAD_STATUS_CODES
+
+
+class AIMDLimiter:
+    """Thread-safe in-flight limit with additive increase / multiplicative decrease."""
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        latency_target_ms: int,
+        queue_timeout_s: float,
+        backoff: float = 0.5,
+        spike_factor: float = 2.0,
+    ):
+        self._cond = threading.Condition()
+        self._limit = float(max(min_limit, min(initial, max_limit)))
+        self._min = min_limit
+        self._max = max_limit
+        self._target_ms = latency_target_ms
+        self._queue_timeout_s = queue_timeout_s
+        self._backoff = backoff
+        self._spike_factor = spike_factor
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._counters = {
+            "acquired": 0,
+            "rejected": 0,
+            "rate_limited": 0,
+            "overloaded": 0,
+            "latency_spikes": 0,
+            "increases": 0,
+            "decreases": 0,
+        }
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self) -> bool:
+        """Wait for a free slot, or raise ConcurrencyLimitExceeded after the queue timeout.
+        Returns True if this call took the last free slot (pass it to release)."""
+        deadline = time.monotonic() + self._queue_timeout_s
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters["rejected"] += 1
+                    raise ConcurrencyLimitExceeded(
+                        f"No model call slot free after {self._queue_timeout_s:.0f}s "
+                        f"(limit {int(self._limit)}, in flight {self._in_flight})"
+                    )
+                self._cond.wait(remaining)
+            self._in_flight += 1
+            self._counters["acquired"] += 1
+            return self._in_flight >= int(self._limit)
+
+    def release(self, latency_ms: int, error: Exception | None = None, saturated: bool = False) -> None:
+        """Free a slot and adjust the limit from the call's outcome."""
+        with self._cond:
+            saturated = saturated or self._in_flight >= int(self._limit)
+            self._in_flight -= 1
+            if error is not None and is_overload_error(error):
+                key = "rate_limited" if getattr(error, "status_code", None) == 429 else "overloaded"
+                self._counters[key] += 1
+                self._decrease(key)
+            elif latency_ms > self._target_ms * self._spike_factor:
+                self._counters["latency_spikes"] += 1
+                self._decrease("latency_spike")
+            elif error is None and saturated and latency_ms <= self._target_ms and self._limit < self._max:
+                # +1 per full window of successful calls at the limit
+                self._limit = min(self._max, self._limit + 1.0 / self._limit)
+                self._counters["increases"] += 1
+            self._cond.notify_all()
+
+    def _decrease(self, reason: str) -> None:
+        # A burst of 429s from calls that were already in flight is one
+        # congestion event, so back off at most once per target latency window.
+        now = time.monotonic()
+        if now - self._last_decrease < self._target_ms / 1000:
+            return
+        self._last_decrease = now
+        old = int(self._limit)
+        self._limit = max(float(self._min), self._limit * self._backoff)
+        self._counters["decreases"] += 1
+        logger.warning(f"[LLM] Concurrency limit {old} -> {int(self._limit)} ({reason})")
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "min_limit": self._min,
+                "max_limit": self._max,
+                "latency_target_ms": self._target_ms,
+                **self._counters,
+            }
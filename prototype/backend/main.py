@@ -2,34 +2,59 @@
 import asyncio
 import json
 import logging
+import threading
 import time
 from datetime import datetime, timezone
 from pathlib import Path
 from contextlib import asynccontextmanager
 from typing import Optional, List, Dict
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Query
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-from backend.config import BASE_DIR, DOCS_DIR
+from backend.config import (
+    BASE_DIR, DOCS_DIR, SPECULATIVE_ROUTING, AGENT_LATENCY_BUDGET_MS, TRACE_DEFAULT_LEVEL, JOURNAL_ENABLED,
+    AUDIT_ENABLED,
+)
 from backend.models import (
     Intent, FNOL_INTENTS, Priority, AuditEntry, TraceStep, HandoffContext, ClaimStatus,
+    AgentResponse, ToolCall,
 )
 from backend.state.session import SessionManager, ClaimPipeline
+from backend.state.journal import claim_journal
+from backend.state.audit import audit_sink
+from backend.state.surge import surge, event_procedures
+from backend.state.dedup import claim_dedup, DuplicateMatch
+from backend.ams.store import get_ams_store
+from backend.ams.exposure import get_exposure_table
 from backend.rag.retriever import retriever
 from backend.agents.supervisor import classify_intent
 from backend.agents.email_parser import parse_email
 from backend.agents.fnol import run_fnol_agent
 from backend.agents.policy_lookup import run_policy_lookup_agent
 from backend.agents.claims import run_claims_agent
-from backend.agents.base import run_agent_loop, TOOL_DEFINITIONS
+from backend.agents.base import run_agent_loop, TOOL_DEFINITIONS, AgentCancelled
+from backend.agents.context import prefetch_member_context, member_context_prompt, tool_steps_avoided
+from backend.agents.speculation import agent_for_intent, speculative_intent, speculation_stats
 from backend.carriers.router import carrier_router
-from backend.tools.ams_api import lookup_policy, lookup_client, verify_coverage
+from backend.llm.client import client as model_client
+from backend.serialization import FastJSONResponse, dumps_str
+from backend.compression import CompressionMiddleware
+from backend.idempotency import IdempotencyMiddleware, idempotency_store
+from backend.singleflight import flights
+from backend.observability.metrics import metrics, observe_trace, MetricsMiddleware
+from backend.observability.tracing import tracer, in_executor, trace_dicts, Span
+from backend.observability.trace_store import trace_store
+from backend.observability.profiler import ProfilingMiddleware
+from backend.observability.verbosity import TraceLevel, apply_trace_level
+from backend.tools.ams_api import lookup_policy, lookup_client, verify_coverage, get_policy_index
 from backend.tools.carrier_api import get_carrier_requirements
 from backend.tools.document_generator import (
+    generate_event_submission_template, generate_event_confirmation_template,
+    render_event_submission, render_event_confirmation,
     generate_carrier_submission, generate_client_confirmation, generate_followup_email,
 )
 from backend.tools.email_intake import get_sample_email, list_scenarios, SAMPLE_EMAILS
@@ -47,15 +72,35 @@ claim_pipeline = ClaimPipeline()
 ws_connections: Dict[str, List[WebSocket]] = {}
 
 
+def _attach_profile(trace_id: str, profile: dict) -> None:
+    if not trace_store.attach_profile(trace_id, profile):
+        logger.info(f"Profiled request had no stored trace ({profile['samples']} samples discarded)")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize RAG index on startup."""
+    """Initialize RAG index, open the AMS store, recover journaled claims and index them for dedup on startup."""
     retriever.initialize()
+    get_ams_store()
+    if JOURNAL_ENABLED:
+        claim_pipeline.attach_journal(claim_journal)
+        claim_journal.open()
+    claim_dedup.index_claims(claim_pipeline.records())
+    if AUDIT_ENABLED:
+        await audit_sink.start()
+    loop = asyncio.get_running_loop()
+    # Large books take seconds to load into the exposure table and policy index; do it before the first query
+    loop.run_in_executor(None, get_exposure_table)
+    loop.run_in_executor(None, get_policy_index)
+    # Claim changes happen on executor threads too; wake the dashboard syncs on the loop
+    claim_pipeline.on_change(lambda version: loop.call_soon_threadsafe(_wake_claim_syncs))
     logger.info("ClaimFlow AI ready — Prairie Shield Insurance Group")
     yield
+    await audit_sink.stop()
+    claim_journal.close()
 
 
-app = FastAPI(title="ClaimFlow AI — FNOL Automation", lifespan=lifespan)
+app = FastAPI(title="ClaimFlow AI — FNOL Automation", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -64,6 +109,11 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Innermost, so stored idempotent responses are uncompressed and negotiated per retry
+app.add_middleware(IdempotencyMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware, on_complete=_attach_profile)
 
 FRONTEND_DIR = BASE_DIR.parent / "frontend"
 
@@ -74,6 +124,8 @@ class EmailIntakeRequest(BaseModel):
     email_text: str
     from_address: str = ""
     subject: str = ""
+    # Process even when the email repeats an existing claim
+    allow_duplicate: bool = False
 
 class ClaimApproveRequest(BaseModel):
     extraction: dict = {}
@@ -98,6 +150,8 @@ class ChatResponse(BaseModel):
     latency_ms: int = 0
     latency_breakdown: Dict[str, int] = {}
     guardrail_flags: List[dict] = []
+    request_id: str = ""
+    trace_level: str = "full"
 
 
 # ── Health & Data ────────────────────────────────────────────────────
@@ -107,6 +161,117 @@ def health_check():
     return {"status": "ok", "service": "claimflow-ai", "rag_ready": retriever._ready}
 
 
+@app.get("/api/llm/stats")
+def llm_stats():
+    return {**model_client.stats(), "speculation": speculation_stats.snapshot(),
+            "singleflight": {f.name: f.snapshot() for f in flights()}}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def _runtime_metrics():
+    """Scrape-time gauges and counters owned by the model client, router, claim journal, audit sink, single-flight, idempotency keys, intake dedup and surge mode."""
+    conc = model_client.stats()["concurrency"]
+    yield ("claimflow_llm_concurrency_limit", "gauge", "Current AIMD model-call concurrency limit", {}, conc["limit"])
+    yield ("claimflow_llm_in_flight", "gauge", "Model calls currently in flight", {}, conc["in_flight"])
+    for event in ("acquired", "rejected", "rate_limited", "overloaded", "latency_spikes", "increases", "decreases"):
+        yield ("claimflow_llm_limiter_events_total", "counter", "Concurrency limiter events",
+               {"event": event}, conc.get(event, 0))
+    spec = speculation_stats.snapshot()
+    for outcome, key in (("hit", "hits"), ("miss", "misses")):
+        yield ("claimflow_speculation_total", "counter", "Speculative routing outcomes",
+               {"outcome": outcome}, spec[key])
+    yield ("claimflow_speculation_saved_seconds_total", "counter", "Latency saved by speculative routing",
+           {}, spec["saved_ms_total"] / 1000)
+    journal = claim_journal.stats
+    yield ("claimflow_journal_events_total", "counter", "Claim journal events appended", {}, journal["appended"])
+    yield ("claimflow_journal_fsyncs_total", "counter", "Claim journal batched fsyncs", {}, journal["flushes"])
+    yield ("claimflow_journal_write_errors_total", "counter", "Claim journal batch writes that failed and were retried",
+           {}, journal["write_errors"])
+    yield ("claimflow_journal_snapshots_total", "counter", "Claim journal snapshots written", {}, journal["snapshots"])
+    yield ("claimflow_journal_recovery_seconds", "gauge", "Time spent replaying the journal at startup",
+           {}, journal["recovery_ms"] / 1000)
+    yield ("claimflow_audit_queue_depth", "gauge", "Audit records waiting to be written", {}, audit_sink.queue_depth)
+    yield ("claimflow_audit_written_total", "counter", "Audit records written to disk", {}, audit_sink.stats["written"])
+    yield ("claimflow_audit_backpressure_total", "counter", "Audit writes that waited for queue space",
+           {}, audit_sink.stats["backpressure_waits"])
+    for flight in flights():
+        yield ("claimflow_singleflight_calls_total", "counter", "Single-flight calls (tool, retrieval, model)",
+               {"layer": flight.name}, flight.stats["calls"])
+    for flight in flights():
+        yield ("claimflow_singleflight_shared_total", "counter", "Calls that joined an identical call in flight",
+               {"layer": flight.name}, flight.stats["shared"])
+    for flight in flights():
+        yield ("claimflow_singleflight_coalesced_ratio", "gauge", "Share of calls served by another call's execution",
+               {"layer": flight.name}, round(flight.ratio(), 4))
+    for result in ("new", "replayed", "joined", "mismatch"):
+        yield ("claimflow_idempotency_requests_total", "counter", "Requests carrying an Idempotency-Key, by outcome",
+               {"result": result}, idempotency_store.stats[result])
+    yield ("claimflow_idempotency_saved_seconds_total", "counter",
+           "Handler time not spent again because a retry was replayed or joined an in-flight request",
+           {}, round(idempotency_store.stats["saved_seconds"], 3))
+    yield ("claimflow_idempotency_keys", "gauge", "Idempotency keys held (in flight or stored)", {},
+           len(idempotency_store))
+    for match in ("exact", "near"):
+        yield ("claimflow_intake_duplicates_total", "counter", "Intake emails linked to an existing claim before extraction",
+               {"match": match}, claim_dedup.stats[match])
+    yield ("claimflow_intake_possible_duplicates_total", "counter",
+           "Claims with the same extracted policy number and date of loss as an earlier claim", {},
+           claim_dedup.stats["flagged"])
+    yield ("claimflow_intake_dedup_indexed", "gauge", "Claims in the intake dedup index", {}, claim_dedup.size)
+    yield ("claimflow_intake_claims_per_minute", "gauge", "Claim intakes completed in the last minute",
+           {}, surge.claims_per_minute())
+    yield ("claimflow_surge_active_events", "gauge", "Catastrophe events currently in surge mode",
+           {}, surge.snapshot()["active_events"])
+    for result, key in (("hit", "shared_hits"), ("miss", "shared_misses")):
+        yield ("claimflow_surge_shared_total", "counter", "Surge-mode shared lookups (carrier, procedures, templates)",
+               {"result": result}, surge.stats[key])
+
+
+metrics.register_collector(_runtime_metrics)
+
+
+@app.get("/api/debug/traces")
+def debug_traces(min_ms: Optional[int] = None, max_ms: Optional[int] = None, endpoint: Optional[str] = None,
+                 intent: Optional[str] = None, status: Optional[str] = None, error: Optional[bool] = None,
+                 limit: int = 50):
+    """Recent request trace summaries, newest first, filtered on the store's indexes."""
+    return {
+        "traces": trace_store.query(min_ms=min_ms, max_ms=max_ms, endpoint=endpoint, intent=intent,
+                                    status=status, error=error, limit=min(limit, 500)),
+        "store": trace_store.stats(),
+    }
+
+
+@app.get("/api/debug/traces/{trace_id}")
+def debug_trace(trace_id: str):
+    trace = trace_store.get(trace_id)
+    if not trace:
+        raise HTTPException(status_code=404, detail="Trace not found (expired from the ring or never recorded)")
+    return trace
+
+
+@app.get("/api/debug/traces/{trace_id}/profile", response_class=PlainTextResponse)
+def debug_trace_profile(trace_id: str):
+    """Collapsed stacks for a profiled request (feed to flamegraph.pl or speedscope)."""
+    profile = trace_store.get_profile(trace_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="No profile for this trace")
+    return PlainTextResponse(profile["collapsed"])
+
+
+@app.get("/api/requests/{request_id}")
+def get_request_payload(request_id: str):
+    """Full chat or intake response for a request_id, whatever trace level it was served at."""
+    payload = trace_store.get_payload(request_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Request not found (expired from the trace store)")
+    return FastJSONResponse(payload)
+
+
 @app.get("/api/clients")
 def list_clients():
     return {"clients": session_manager.get_clients()}
@@ -114,39 +279,20 @@ def list_clients():
 
 @app.get("/api/policies")
 def list_policies():
-    from backend.state.session import get_policies_db
-    policies = get_policies_db()
-    return {"policies": list(policies.values())}
+    return {"policies": get_ams_store().list_policies()}
 
 
 @app.get("/api/policies/search")
 def search_policies(q: str = ""):
-    from backend.state.session import get_policies_db, get_clients_db
     if not q:
         return {"results": []}
-    policies = get_policies_db()
-    clients = get_clients_db()
-    results = []
-    q_lower = q.lower()
-    for pid, pol in policies.items():
-        pn = pol.get("policy_number", "").lower()
-        client = clients.get(pol.get("client_id", ""), {})
-        cname = client.get("name", "").lower()
-        if q_lower in pn or q_lower in pid.lower() or q_lower in cname:
-            results.append({**pol, "client_name": client.get("name", "")})
-    return {"results": results}
+    return {"results": [{**pol, "client_name": name} for pol, name in get_ams_store().search_policies(q)]}
 
 
 @app.get("/api/policies/{policy_id}")
 def get_policy(policy_id: str):
-    from backend.state.session import get_policies_db
-    policies = get_policies_db()
-    pol = policies.get(policy_id)
-    if not pol:
-        for pid, p in policies.items():
-            if p.get("policy_number", "") == policy_id:
-                pol = p
-                break
+    store = get_ams_store()
+    pol = store.get_policy(policy_id) or store.get_policy_by_number(policy_id)
     if not pol:
         raise HTTPException(status_code=404, detail="Policy not found")
     return pol
@@ -154,20 +300,42 @@ def get_policy(policy_id: str):
 
 @app.get("/api/carriers")
 def list_carriers():
-    from backend.state.session import get_carriers_db
-    return {"carriers": list(get_carriers_db().values())}
+    return {"carriers": get_ams_store().list_carriers()}
 
 
 @app.get("/api/carriers/{carrier_id}")
 def get_carrier(carrier_id: str):
-    from backend.state.session import get_carriers_db
-    carriers = get_carriers_db()
-    carrier = carriers.get(carrier_id)
+    carrier = get_ams_store().get_carrier(carrier_id)
     if not carrier:
         raise HTTPException(status_code=404, detail="Carrier not found")
     return carrier
 
 
+@app.get("/api/exposure")
+def policy_exposure(date: str, peril: Optional[str] = None, city: Optional[str] = None, state: Optional[str] = None,
+                    zip: Optional[str] = None, carrier: Optional[str] = None, type: Optional[str] = None,
+                    include_inactive: bool = False, limit: int = Query(100, ge=0, le=1000)):
+    """Policies in force on a date that cover a peril (hail, wind, fire, theft, vandalism,
+    collision) in an area. city/state/zip/carrier/type take comma-separated values; zip takes
+    5-digit codes or 3-digit prefixes."""
+    def values(param: Optional[str]) -> list[str] | None:
+        return [v.strip() for v in param.split(",") if v.strip()] if param else None
+
+    try:
+        return get_exposure_table().query(
+            date, peril, limit=limit, cities=values(city), states=values(state), zips=values(zip),
+            carriers=values(carrier), types=values(type), include_inactive=include_inactive,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/surge")
+async def surge_events():
+    """Catastrophe surge mode: active event clusters, claims per minute and shared-work hits."""
+    return surge.snapshot()
+
+
 @app.get("/api/docs/{doc_name}")
 def get_document(doc_name: str):
     doc_path = DOCS_DIR / doc_name
@@ -179,10 +347,21 @@ def get_document(doc_name: str):
 # ── Claims Pipeline ─────────────────────────────────────────────────
 
 @app.post("/api/claims/intake")
-async def intake_claim(req: EmailIntakeRequest):
+async def intake_claim(req: EmailIntakeRequest, trace: Optional[TraceLevel] = None):
     """Submit an email for FNOL processing. Core pipeline endpoint."""
+    with tracer.span("POST /api/claims/intake", "request", from_address=req.from_address) as root:
+        payload = await _intake(req, root)
+    trace_store.attach_payload(root.trace_id, payload)
+    return _respond(payload, trace or TRACE_DEFAULT_LEVEL)
+
+
+def _respond(payload: dict, level: TraceLevel) -> FastJSONResponse:
+    """Trim a full response payload to the requested trace level."""
+    return FastJSONResponse(apply_trace_level({**payload, "trace_level": level}, level))
+
+
+async def _intake(req: EmailIntakeRequest, root: Span) -> dict:
     start_time = time.time()
-    all_trace = []
 
     # 1. Create claim record
     record = claim_pipeline.create_claim(
@@ -190,24 +369,32 @@ async def intake_claim(req: EmailIntakeRequest):
         email_from=req.from_address,
         email_subject=req.subject,
     )
-    all_trace.append({"name": "Email Received", "step_type": "intake", "duration_ms": 0,
-                       "status": "success", "details": {"claim_id": record.claim_id, "from": req.from_address}})
+    root.set(claim_id=record.claim_id)
+    tracer.event("Email Received", "intake", claim_id=record.claim_id, **{"from": req.from_address})
 
+    # Repeat reports of a claim already in the pipeline are linked to it, not sent to the model again
+    duplicate = claim_dedup.admit(record.claim_id, req.email_text, check=not req.allow_duplicate)
+    if duplicate is not None:
+        return await _link_duplicate(record, duplicate, root, start_time)
+    try:
+        return await _process_claim(record, req, root, start_time)
+    except BaseException:
+        # Unindex the half-processed claim so a retry is processed, not linked to it
+        claim_dedup.forget(record.claim_id)
+        raise
+
+
+async def _process_claim(record, req: EmailIntakeRequest, root: Span, start_time: float) -> dict:
     await _ws_broadcast("claims", {"type": "email_received", "claim_id": record.claim_id,
                                      "from": req.from_address, "subject": req.subject})
 
     # 2. Parse email
-    record.status = "processing"
+    claim_pipeline.update_claim(record.claim_id, status="processing")
     await _ws_broadcast("claims", {"type": "parsing_started", "claim_id": record.claim_id})
 
-    loop = asyncio.get_event_loop()
-    extraction, parse_traces = await loop.run_in_executor(
-        None, parse_email, req.email_text, req.from_address, req.subject
-    )
-    all_trace.extend([{"name": t.name, "step_type": t.step_type, "duration_ms": t.duration_ms,
-                        "status": t.status, "details": t.details} for t in parse_traces])
+    extraction, _ = await in_executor(parse_email, req.email_text, req.from_address, req.subject)
 
-    record.extraction = {
+    claim_pipeline.update_claim(record.claim_id, priority=extraction.urgency, extraction={
         "reporter_name": extraction.reporter_name,
         "reporter_email": extraction.reporter_email,
         "reporter_phone": extraction.reporter_phone,
@@ -227,8 +414,7 @@ async def intake_claim(req: EmailIntakeRequest):
         "urgency": extraction.urgency,
         "missing_fields": extraction.missing_fields,
         "confidence_score": extraction.confidence_score,
-    }
-    record.priority = extraction.urgency
+    })
 
     await _ws_broadcast("claims", {"type": "extraction_complete", "claim_id": record.claim_id,
                                      "extraction": record.extraction})
@@ -237,15 +423,30 @@ async def intake_claim(req: EmailIntakeRequest):
     policy_data = {}
     if extraction.policy_number:
         await _ws_broadcast("claims", {"type": "policy_lookup_started", "claim_id": record.claim_id})
-        pol_start = time.time()
-        policy_data = await loop.run_in_executor(None, lookup_policy, extraction.policy_number)
-        pol_ms = int((time.time() - pol_start) * 1000)
-        all_trace.append({"name": "Policy Lookup", "step_type": "tool_call", "duration_ms": pol_ms,
-                           "status": "error" if "error" in policy_data else "success",
-                           "details": {"policy_number": extraction.policy_number,
-                                       "found": "error" not in policy_data}})
-        record.policy_data = policy_data
+        with tracer.span("Policy Lookup", "tool_call", policy_number=extraction.policy_number) as pol_span:
+            policy_data = await in_executor(lookup_policy, extraction.policy_number)
+            pol_span.set(found="error" not in policy_data)
+            if "error" in policy_data:
+                pol_span.status = "error"
+        claim_pipeline.update_claim(record.claim_id, policy_data=policy_data)
+
+    # A second report of a loss already filed (other wording, other reporter): flag it, don't link it
+    earlier = claim_dedup.add_loss(record.claim_id, (extraction.policy_number, policy_data.get("policy_number")),
+                                   extraction.date_of_loss)
+    if earlier is not None and not req.allow_duplicate:
+        claim_pipeline.update_claim(record.claim_id, possible_duplicate_of=earlier)
+        tracer.event("Possible Duplicate", "pipeline", status="warning", possible_duplicate_of=earlier)
+
+    # Catastrophe events: same-event claims share carrier requirements, procedures and templates
+    event = surge.assign(record.claim_id, record.extraction, policy_data)
+    if event is not None:
+        claim_pipeline.update_claim(record.claim_id, event_id=event.event_id)
+        tracer.event("Event Clustered", "pipeline", event_id=event.event_id, event_claims=len(event.claim_ids),
+                     surge=surge.in_surge(event))
+        if surge.in_surge(event):
+            await surge.run(event, ("procedures",), event_procedures, event.peril)
 
+    if extraction.policy_number:
         if "error" not in policy_data:
             await _ws_broadcast("claims", {"type": "policy_verified", "claim_id": record.claim_id,
                                              "policy": {"carrier": policy_data.get("carrier", ""),
@@ -254,54 +455,57 @@ async def intake_claim(req: EmailIntakeRequest):
 
             # 4. Coverage verification
             if extraction.date_of_loss and extraction.loss_type:
-                cov_data = await loop.run_in_executor(
-                    None, verify_coverage,
-                    policy_data.get("id", ""), extraction.date_of_loss, extraction.loss_type
-                )
-                all_trace.append({"name": "Coverage Check", "step_type": "tool_call", "duration_ms": 0,
-                                   "status": "success",
-                                   "details": {"potentially_covered": cov_data.get("potentially_covered", False)}})
+                with tracer.span("Coverage Check", "tool_call") as cov_span:
+                    cov_data = await in_executor(
+                        verify_coverage,
+                        policy_data.get("id", ""), extraction.date_of_loss, extraction.loss_type
+                    )
+                    cov_span.set(potentially_covered=cov_data.get("potentially_covered", False))
 
             # 5. Carrier requirements
             carrier_id = policy_data.get("carrier_id", "")
             if carrier_id:
                 await _ws_broadcast("claims", {"type": "carrier_identified", "claim_id": record.claim_id,
                                                  "carrier": policy_data.get("carrier", "")})
-                carrier_data = await loop.run_in_executor(None, get_carrier_requirements, carrier_id)
-                record.carrier_data = carrier_data
-                all_trace.append({"name": "Carrier Requirements Loaded", "step_type": "tool_call",
-                                   "duration_ms": 0, "status": "success",
-                                   "details": {"carrier": carrier_data.get("carrier_name", ""),
-                                               "format": carrier_data.get("submission_format", "")}})
+                with tracer.span("Carrier Requirements Loaded", "tool_call") as carrier_span:
+                    carrier_data = await surge.run(event, ("carrier", carrier_id), get_carrier_requirements, carrier_id)
+                    carrier_span.set(carrier=carrier_data.get("carrier_name", ""),
+                                     format=carrier_data.get("submission_format", ""),
+                                     shared_event=event.event_id if surge.in_surge(event) else "")
+                claim_pipeline.update_claim(record.claim_id, carrier_data=carrier_data)
 
                 # 6. Validate submission completeness
-                validation = carrier_router.validate_submission(carrier_id, record.extraction)
-                all_trace.append({"name": "Submission Validation", "step_type": "validation",
-                                   "duration_ms": 0, "status": "success" if validation.get("valid") else "warning",
-                                   "details": validation})
+                with tracer.span("Submission Validation", "validation") as val_span:
+                    validation = carrier_router.validate_submission(carrier_id, record.extraction)
+                    val_span.set(**validation)
+                    if not validation.get("valid"):
+                        val_span.status = "warning"
 
     # 7. Compliance flags
     compliance_flags = check_compliance_flags(record.extraction)
     if compliance_flags:
-        all_trace.append({"name": "Compliance Check", "step_type": "guardrail", "duration_ms": 0,
-                           "status": "warning", "details": {"flags": compliance_flags}})
+        tracer.event("Compliance Check", "guardrail", status="warning", flags=compliance_flags)
 
     # Determine final status
     if extraction.missing_fields and "policy_number" in extraction.missing_fields:
-        record.status = "follow_up"
+        final_status = "follow_up"
     elif extraction.confidence_score >= 0.7 and "error" not in policy_data:
-        record.status = "needs_review"
+        final_status = "needs_review"
     else:
-        record.status = "needs_review"
+        final_status = "needs_review"
+    claim_pipeline.update_claim(record.claim_id, status=final_status)
 
-    record.trace_steps = all_trace
     total_ms = int((time.time() - start_time) * 1000)
+    tracer.event("Ready for Review", "pipeline", duration_ms=total_ms, final_status=record.status)
+    root.set(status=record.status, intent=extraction.loss_type, agent="intake_pipeline")
+    all_trace = trace_dicts(root.trace_steps(include_self=False))
+    claim_pipeline.update_claim(record.claim_id, trace_steps=all_trace)
 
-    all_trace.append({"name": "Ready for Review", "step_type": "pipeline", "duration_ms": total_ms,
-                       "status": "success", "details": {"final_status": record.status}})
-
+    surge.complete(event)
     await _ws_broadcast("claims", {"type": "ready_for_review", "claim_id": record.claim_id,
                                      "status": record.status, "total_ms": total_ms})
+    observe_trace("/api/claims/intake", all_trace, total_ms, agent="intake_pipeline",
+                  intent=extraction.loss_type or "unknown", status=record.status)
 
     return {
         "claim_id": record.claim_id,
@@ -310,15 +514,66 @@ async def intake_claim(req: EmailIntakeRequest):
         "policy_data": record.policy_data,
         "carrier_data": record.carrier_data,
         "priority": record.priority,
+        "possible_duplicate_of": record.possible_duplicate_of,
         "compliance_flags": compliance_flags,
+        "event": {**event.summary(), "surge": surge.in_surge(event)} if event is not None else None,
         "trace_steps": all_trace,
         "latency_ms": total_ms,
+        "request_id": root.trace_id,
+    }
+
+
+async def _link_duplicate(record, duplicate: DuplicateMatch, root: Span, start_time: float) -> dict:
+    """Mark the new claim as a duplicate of the matched one and record it on that claim."""
+    claim_pipeline.update_claim(record.claim_id, status="duplicate", duplicate_of=duplicate.claim_id)
+    original = claim_pipeline.get_claim(duplicate.claim_id)
+    link = {"claim_id": record.claim_id, "match": duplicate.match, "score": round(duplicate.score, 3),
+            "email_from": record.email_from, "received_at": record.created_at}
+    claim_pipeline.update_claim(duplicate.claim_id, duplicates=[*original.duplicates, link])
+
+    total_ms = int((time.time() - start_time) * 1000)
+    tracer.event("Duplicate Linked", "pipeline", duration_ms=total_ms, duplicate_of=duplicate.claim_id,
+                 match=duplicate.match, score=round(duplicate.score, 3))
+    root.set(status=record.status, intent="duplicate", agent="intake_pipeline")
+    all_trace = trace_dicts(root.trace_steps(include_self=False))
+    claim_pipeline.update_claim(record.claim_id, trace_steps=all_trace)
+
+    await _ws_broadcast("claims", {"type": "duplicate_linked", "claim_id": record.claim_id,
+                                     "duplicate_of": duplicate.claim_id, "match": duplicate.match})
+    observe_trace("/api/claims/intake", all_trace, total_ms, agent="intake_pipeline",
+                  intent="duplicate", status=record.status)
+
+    return {
+        "claim_id": record.claim_id,
+        "status": record.status,
+        "duplicate_of": duplicate.claim_id,
+        "match": {"type": duplicate.match, "score": round(duplicate.score, 3)},
+        "original_status": original.status,
+        "extraction": {},
+        "policy_data": {},
+        "carrier_data": {},
+        "priority": record.priority,
+        "compliance_flags": [],
+        "event": None,
+        "trace_steps": all_trace,
+        "latency_ms": total_ms,
+        "request_id": root.trace_id,
     }
 
 
 @app.get("/api/claims")
-def list_claims():
-    return {"claims": claim_pipeline.list_claims()}
+def list_claims(status: Optional[str] = None, priority: Optional[str] = None, loss_type: Optional[str] = None,
+                carrier: Optional[str] = None, cursor: Optional[str] = None,
+                limit: int = Query(100, ge=1, le=500), fields: Optional[str] = None):
+    """Newest-first claims. Filter by status/priority/loss_type/carrier, page with limit (default 100)
+    and the returned next_cursor, and project with fields=claim_id,status,... (comma separated)."""
+    if cursor is not None and not cursor.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    page = claim_pipeline.list_claims(
+        status=status, priority=priority, loss_type=loss_type, carrier=carrier, cursor=cursor, limit=limit,
+        fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+    )
+    return FastJSONResponse({**page, "status_counts": claim_pipeline.counts("status")})
 
 
 @app.get("/api/claims/{claim_id}")
@@ -326,7 +581,7 @@ def get_claim(claim_id: str):
     record = claim_pipeline.get_claim(claim_id)
     if not record:
         raise HTTPException(status_code=404, detail="Claim not found")
-    return {
+    return FastJSONResponse({
         "claim_id": record.claim_id,
         "status": record.status,
         "email_raw": record.email_raw,
@@ -339,9 +594,13 @@ def get_claim(claim_id: str):
         "client_email": record.client_email,
         "followup_email": record.followup_email,
         "priority": record.priority,
+        "event_id": record.event_id,
+        "duplicate_of": record.duplicate_of,
+        "duplicates": record.duplicates,
+        "possible_duplicate_of": record.possible_duplicate_of,
         "trace_steps": record.trace_steps,
         "created_at": record.created_at,
-    }
+    })
 
 
 @app.post("/api/claims/{claim_id}/approve")
@@ -353,26 +612,41 @@ async def approve_claim(claim_id: str, req: ClaimApproveRequest):
 
     # Apply any edits from the CSR
     if req.extraction:
-        record.extraction.update(req.extraction)
+        claim_pipeline.update_claim(claim_id, extraction={**record.extraction, **req.extraction})
 
-    record.status = "approved"
+    claim_pipeline.update_claim(claim_id, status="approved")
     start = time.time()
     loop = asyncio.get_event_loop()
 
-    # Generate carrier submission and client email in parallel
-    sub_future = loop.run_in_executor(
-        None, generate_carrier_submission,
-        record.extraction, record.policy_data, record.carrier_data
-    )
-    email_future = loop.run_in_executor(
-        None, generate_client_confirmation,
-        record.extraction, record.policy_data, record.carrier_data, claim_id
-    )
+    event = surge.cluster_for(claim_id)
+    if surge.in_surge(event):
+        # Catastrophe event: fill the event's shared templates instead of a model call per claim
+        carrier_id = record.carrier_data.get("carrier_id", "")
+        procedures = await surge.run(event, ("procedures",), event_procedures, event.peril)
+        sub_template, email_template = await asyncio.gather(
+            surge.run(event, ("submission_template", carrier_id), generate_event_submission_template,
+                      event.summary(), record.carrier_data, procedures),
+            surge.run(event, ("email_template", carrier_id), generate_event_confirmation_template,
+                      event.summary(), record.carrier_data, procedures),
+        )
+        sub_result = render_event_submission(sub_template, record.extraction, record.policy_data,
+                                             record.carrier_data, claim_id)
+        email_result = render_event_confirmation(email_template, record.extraction, record.policy_data, claim_id)
+    else:
+        # Generate carrier submission and client email in parallel
+        sub_future = loop.run_in_executor(
+            None, generate_carrier_submission,
+            record.extraction, record.policy_data, record.carrier_data
+        )
+        email_future = loop.run_in_executor(
+            None, generate_client_confirmation,
+            record.extraction, record.policy_data, record.carrier_data, claim_id
+        )
 
-    sub_result, email_result = await asyncio.gather(sub_future, email_future)
+        sub_result, email_result = await asyncio.gather(sub_future, email_future)
 
-    record.carrier_submission = sub_result.get("submission_text", "")
-    record.client_email = email_result.get("email_text", "")
+    claim_pipeline.update_claim(claim_id, carrier_submission=sub_result.get("submission_text", ""),
+                                client_email=email_result.get("email_text", ""))
 
     total_ms = int((time.time() - start) * 1000)
 
@@ -396,7 +670,7 @@ async def submit_claim(claim_id: str):
     if not record:
         raise HTTPException(status_code=404, detail="Claim not found")
 
-    record.status = "submitted"
+    claim_pipeline.update_claim(claim_id, status="submitted")
 
     # Create a claim record in the mock AMS
     if record.policy_data and record.extraction:
@@ -454,8 +728,7 @@ async def generate_claim_followup(claim_id: str):
     loop = asyncio.get_event_loop()
     result = await loop.run_in_executor(None, generate_followup_email, record.extraction, missing)
 
-    record.followup_email = result.get("email_text", "")
-    record.status = "follow_up"
+    claim_pipeline.update_claim(claim_id, followup_email=result.get("email_text", ""), status="follow_up")
 
     return {
         "claim_id": claim_id,
@@ -473,8 +746,8 @@ async def save_claim_draft(claim_id: str, req: ClaimApproveRequest):
     if not record:
         raise HTTPException(status_code=404, detail="Claim not found")
     if req.extraction:
-        record.extraction.update(req.extraction)
-    record.status = "draft"
+        claim_pipeline.update_claim(claim_id, extraction={**record.extraction, **req.extraction})
+    claim_pipeline.update_claim(claim_id, status="draft")
     return {"claim_id": claim_id, "status": "draft", "message": "Draft saved."}
 
 
@@ -484,7 +757,7 @@ async def escalate_claim(claim_id: str):
     record = claim_pipeline.get_claim(claim_id)
     if not record:
         raise HTTPException(status_code=404, detail="Claim not found")
-    record.status = "escalated"
+    claim_pipeline.update_claim(claim_id, status="escalated")
     await _ws_broadcast("claims", {"type": "claim_escalated", "claim_id": claim_id})
     return {"claim_id": claim_id, "status": "escalated",
             "message": f"Claim {claim_id} has been escalated to a senior adjuster for review."}
@@ -498,7 +771,7 @@ def demo_scenarios():
 
 
 @app.post("/api/demo/scenario/{scenario_name}")
-async def run_demo_scenario(scenario_name: str):
+async def run_demo_scenario(scenario_name: str, trace: Optional[TraceLevel] = None):
     """Trigger a demo scenario — loads a pre-written email and processes it."""
     email = get_sample_email(scenario_name)
     if not email:
@@ -509,8 +782,10 @@ async def run_demo_scenario(scenario_name: str):
         email_text=email["body"],
         from_address=email["from"],
         subject=email["subject"],
+        # Scenarios are replayed on purpose
+        allow_duplicate=True,
     )
-    return await intake_claim(req)
+    return await intake_claim(req, trace)
 
 
 # ── Chat (for claim status queries, interactive mode) ────────────────
@@ -524,8 +799,69 @@ def start_session(client_id: str = "CLI-1001"):
     return {"session_id": session.session_id, "client": session.member_data}
 
 
+@app.get("/api/session/{session_id}/audit")
+def get_session_audit(session_id: str):
+    session = session_manager.get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return {"session_id": session_id, "entries": list(session.audit_log)}
+
+
+def _run_specialist(intent: Intent, agent_kwargs: dict, cancel_event: threading.Event | None = None) -> AgentResponse:
+    """Run the specialist for an intent (blocking — call from an executor)."""
+    if intent == Intent.ESCALATE:
+        from backend.tools.claims_api import escalate_to_human
+        result = escalate_to_human("Client requested human agent", "Chat escalation")
+        return AgentResponse(
+            text=result["message"], intent=Intent.ESCALATE, agent_name="escalation_handler",
+            tools_called=[ToolCall("escalate_to_human", {"reason": "client_request"}, result)],
+            escalated=True, escalation_reason="client_request",
+        )
+    if intent in FNOL_INTENTS:
+        return run_fnol_agent(**agent_kwargs, intent=intent, cancel_event=cancel_event)
+    if intent == Intent.CLAIM_STATUS:
+        return run_claims_agent(**agent_kwargs, cancel_event=cancel_event)
+    if intent == Intent.POLICY_QUESTION:
+        return run_policy_lookup_agent(**agent_kwargs, cancel_event=cancel_event)
+
+    # General, billing, COI — use general handler
+    system_prompt = f"""You are the ClaimFlow AI assistant for Prairie Shield Insurance Group in Omaha, Nebraska.
+
+Client: {agent_kwargs['member_name']}
+
+You can help with:
+- Filing new claims (FNOL)
+- Checking claim status
+- Looking up policy information
+- Answering insurance questions
+
+If the client wants to file a claim, help them get started.
+If they need a Certificate of Insurance (COI) or have billing questions, let them know those features are coming soon and offer to connect them with a CSR.
+Use search_knowledge_base for general insurance questions.
+""" + agent_kwargs["member_context"]
+    tools = [TOOL_DEFINITIONS["search_knowledge_base"], TOOL_DEFINITIONS["lookup_client"]]
+    return run_agent_loop(
+        system_prompt=system_prompt, messages=agent_kwargs["messages"],
+        tools=tools, agent_name="general_agent", intent=intent, cancel_event=cancel_event,
+        deadline=agent_kwargs["deadline"],
+    )
+
+
+def _discard_speculation(future: asyncio.Future) -> None:
+    """Swallow the outcome of a cancelled speculative run."""
+    if not future.cancelled() and future.exception() and not isinstance(future.exception(), AgentCancelled):
+        logger.warning(f"Discarded speculative run failed: {future.exception()}")
+
+
+def _chat_payload(**fields) -> dict:
+    """ChatResponse fields built from data we assembled ourselves: model_construct fills
+    defaults without re-validating the nested lists. Returned through _respond, so
+    FastAPI's response-model pass is skipped (the model still documents the endpoint)."""
+    return dict(ChatResponse.model_construct(**fields))
+
+
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(req: ChatRequest):
+async def chat(req: ChatRequest, trace: Optional[TraceLevel] = None):
     session = session_manager.get_session(req.session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found or expired")
@@ -543,95 +879,111 @@ async def chat(req: ChatRequest):
     if blocked:
         session.add_message("user", user_message)
         session.add_message("assistant", blocked)
-        return ChatResponse(
+        blocked_trace = [{"name": "Topic Blocked", "step_type": "guardrail", "duration_ms": 0,
+                          "status": "blocked", "details": {"topic": blocked_topic}}]
+        observe_trace("/api/chat", blocked_trace, 0, agent="guardrails", intent="blocked", status="blocked")
+        return _respond(_chat_payload(
             response=blocked, intent="blocked", agent="guardrails",
-            trace_steps=[{"name": "Topic Blocked", "step_type": "guardrail", "duration_ms": 0,
-                          "status": "blocked", "details": {"topic": blocked_topic}}],
+            trace_steps=blocked_trace,
             guardrail_flags=guardrail_flags,
-        )
+        ), trace or TRACE_DEFAULT_LEVEL)
 
     session.add_message("user", user_message)
+    with tracer.span("POST /api/chat", "request", session_id=session.session_id,
+                     member_id=session.member_id, turn=session.turn_count) as root:
+        payload = await _chat_turn(session, user_message, guardrail_flags, root)
+    trace_store.attach_payload(root.trace_id, payload)
+    return _respond(payload, trace or TRACE_DEFAULT_LEVEL)
+
+
+async def _chat_turn(session, user_message: str, guardrail_flags: list[dict], root: Span) -> dict:
     start_time = time.time()
 
     await _ws_broadcast(session.session_id, {"type": "processing_started", "message": user_message})
 
-    # Classify intent
+    # Classify intent. On follow-up turns the current specialist starts
+    # speculatively alongside classification and is kept if the intent holds.
     conversation_history = session.get_conversation_history()
-    sup_start = time.time()
-    intent, confidence, reasoning, sentiment, priority = classify_intent(
+    ctx_span = None
+    if session.turn_count > 1:
+        # Refresh so claims filed since the session started are visible to the specialist
+        with tracer.span("Member Context Prefetched", "context") as ctx_span:
+            session.member_context = await in_executor(prefetch_member_context, session.member_id)
+    agent_kwargs = dict(
         messages=conversation_history,
+        member_id=session.member_id,
         member_name=session.member_data.get("name", ""),
-        current_agent=session.current_agent,
+        member_context=member_context_prompt(session.member_context),
+        deadline=start_time + AGENT_LATENCY_BUDGET_MS / 1000,
     )
-    sup_ms = int((time.time() - sup_start) * 1000)
+    spec_intent = None
+    if SPECULATIVE_ROUTING:
+        spec_intent = speculative_intent(session.current_intent, session.current_agent, session.escalated)
+    if spec_intent:
+        spec_cancel = threading.Event()
+        spec_future = in_executor(_run_specialist, spec_intent, agent_kwargs, spec_cancel)
+
+    with tracer.span("Supervisor Classification", "supervisor") as sup_span:
+        intent, confidence, reasoning, sentiment, priority = await in_executor(
+            classify_intent,
+            messages=conversation_history,
+            member_name=session.member_data.get("name", ""),
+            current_agent=session.current_agent,
+        )
+        sup_span.set(intent=intent.value, confidence=confidence, sentiment=sentiment,
+                     priority=priority.value, reasoning=reasoning)
+    sup_ms = sup_span.duration_ms
 
     session.sentiment_history.append(sentiment)
 
-    trace_steps = [
-        {"name": "Supervisor Classification", "step_type": "supervisor", "duration_ms": sup_ms,
-         "status": "success", "details": {"intent": intent.value, "confidence": confidence,
-                                           "sentiment": sentiment, "priority": priority.value, "reasoning": reasoning}},
-    ]
-
     await _ws_broadcast(session.session_id, {"type": "intent_classified", "intent": intent.value,
                                                "confidence": confidence, "priority": priority.value})
 
     # Route to specialist
-    agent_kwargs = dict(
-        messages=conversation_history,
-        member_id=session.member_id,
-        member_name=session.member_data.get("name", ""),
-    )
-
-    if intent == Intent.ESCALATE:
-        from backend.tools.claims_api import escalate_to_human
-        from backend.models import AgentResponse, ToolCall
-        result = escalate_to_human("Client requested human agent", "Chat escalation")
-        agent_response = AgentResponse(
-            text=result["message"], intent=Intent.ESCALATE, agent_name="escalation_handler",
-            tools_called=[ToolCall("escalate_to_human", {"reason": "client_request"}, result)],
-            escalated=True, escalation_reason="client_request",
-        )
-    elif intent in FNOL_INTENTS:
-        agent_response = run_fnol_agent(**agent_kwargs, intent=intent)
-    elif intent == Intent.CLAIM_STATUS:
-        agent_response = run_claims_agent(**agent_kwargs)
-    elif intent == Intent.POLICY_QUESTION:
-        agent_response = run_policy_lookup_agent(**agent_kwargs)
-    else:
-        # General, billing, COI — use general handler
-        system_prompt = f"""You are the ClaimFlow AI assistant for Prairie Shield Insurance Group in Omaha, Nebraska.
-
-Client: {agent_kwargs['member_name']}
-
-You can help with:
-- Filing new claims (FNOL)
-- Checking claim status
-- Looking up policy information
-- Answering insurance questions
-
-If the client wants to file a claim, help them get started.
-If they need a Certificate of Insurance (COI) or have billing questions, let them know those features are coming soon and offer to connect them with a CSR.
-Use search_knowledge_base for general insurance questions.
-"""
-        tools = [TOOL_DEFINITIONS["search_knowledge_base"], TOOL_DEFINITIONS["lookup_client"]]
-        agent_response = run_agent_loop(
-            system_prompt=system_prompt, messages=conversation_history,
-            tools=tools, agent_name="general_agent", intent=intent,
-        )
-
-    # Build response trace
-    all_trace = trace_steps + [
-        {"name": ts.name, "step_type": ts.step_type, "duration_ms": ts.duration_ms,
-         "status": ts.status, "details": ts.details}
-        for ts in agent_response.trace_steps
-    ]
+    agent_response = None
+    speculation_saved_ms = 0
+    if spec_intent:
+        # Same intent, not just same agent: run_fnol_agent behaves differently per FNOL intent
+        if intent == spec_intent:
+            agent_response = await spec_future
+            # Sequential cost would have been sup_ms + specialist; overlapped it is the max of the two
+            speculation_saved_ms = min(sup_ms, agent_response.latency_ms)
+            speculation_stats.record_hit(speculation_saved_ms)
+            tracer.event("Speculative Routing", "routing", agent=agent_response.agent_name, hit=True,
+                         saved_ms=speculation_saved_ms)
+        else:
+            # Cooperative: the run stops at its next model call or tool step
+            spec_cancel.set()
+            spec_future.add_done_callback(_discard_speculation)
+            speculation_stats.record_miss()
+            tracer.event("Speculative Routing", "routing", status="cancelled", agent=agent_for_intent(spec_intent),
+                         hit=False, rerouted_to=agent_for_intent(intent))
+
+    if agent_response is None:
+        agent_response = await in_executor(_run_specialist, intent, agent_kwargs)
+
+    if session.member_context:
+        ctx = session.member_context
+        ctx_details = dict(policies=len(ctx["policies"]), open_claims=len(ctx["open_claims"]),
+                           carriers=len(ctx["carriers"]),
+                           tool_steps_avoided=tool_steps_avoided(
+                               ctx, agent_response.agent_name,
+                               [tc.tool_name for tc in agent_response.tools_called]))
+        if ctx_span is not None:
+            ctx_span.set(**ctx_details)
+        else:
+            # Prefetched when the session started
+            tracer.event("Member Context Prefetched", "context", duration_ms=ctx["prefetch_ms"], **ctx_details)
 
     # Response guardrails
     is_valid, resp_confidence = validate_response(agent_response.text)
-    all_trace.append({"name": "Response Guardrails", "step_type": "guardrail", "duration_ms": 0,
-                       "status": "success" if is_valid else "warning",
-                       "details": {"valid": is_valid, "confidence": round(resp_confidence, 2)}})
+    tracer.event("Response Guardrails", "guardrail", status="success" if is_valid else "warning",
+                 valid=is_valid, confidence=round(resp_confidence, 2))
+
+    # Build response trace from the request's span tree
+    root.set(intent=intent.value, agent=agent_response.agent_name,
+             status="escalated" if agent_response.escalated else "success")
+    all_trace = trace_dicts(root.trace_steps(include_self=False))
 
     session.current_intent = intent.value
     session.current_agent = agent_response.agent_name
@@ -667,12 +1019,14 @@ Use search_knowledge_base for general insurance questions.
         latency_ms=latency,
         sentiment=sentiment,
     )
-    session.add_audit_entry(audit)
+    await audit_sink.write(session.add_audit_entry(audit))
 
     await _ws_broadcast(session.session_id, {"type": "response_ready", "response": agent_response.text,
                                                "intent": intent.value, "latency_ms": latency})
+    observe_trace("/api/chat", all_trace, latency, agent=agent_response.agent_name, intent=intent.value,
+                  status="escalated" if agent_response.escalated else "success")
 
-    return ChatResponse(
+    return _chat_payload(
         response=agent_response.text,
         intent=intent.value,
         agent=agent_response.agent_name,
@@ -686,8 +1040,10 @@ Use search_knowledge_base for general insurance questions.
         priority=priority.value,
         latency_ms=latency,
         latency_breakdown={"classification_ms": sup_ms, "tools_ms": tools_ms,
-                           "generation_ms": max(0, latency - sup_ms - tools_ms)},
+                           "generation_ms": max(0, latency - sup_ms + speculation_saved_ms - tools_ms),
+                           "speculation_saved_ms": speculation_saved_ms},
         guardrail_flags=guardrail_flags,
+        request_id=root.trace_id,
     )
 
 
@@ -699,20 +1055,75 @@ async def websocket_endpoint(websocket: WebSocket, channel: str):
     if channel not in ws_connections:
         ws_connections[channel] = []
     ws_connections[channel].append(websocket)
+    sync_task: asyncio.Task | None = None
     try:
         while True:
-            await websocket.receive_text()
+            text = await websocket.receive_text()
+            if channel != "claims":
+                continue
+            try:
+                message = json.loads(text)
+            except ValueError:
+                continue
+            if isinstance(message, dict) and message.get("type") == "subscribe":
+                # {"type": "subscribe", "since": N, "epoch": E} — resume the change feed after version N of epoch E
+                if sync_task is not None:
+                    sync_task.cancel()
+                since, epoch = message.get("since"), message.get("epoch")
+                sync_task = asyncio.create_task(_claims_sync(websocket, since if isinstance(since, int) else -1,
+                                                             epoch if isinstance(epoch, str) else ""))
     except WebSocketDisconnect:
         ws_connections[channel].remove(websocket)
         if not ws_connections[channel]:
             del ws_connections[channel]
+    finally:
+        if sync_task is not None:
+            sync_task.cancel()
+
+
+_claim_sync_events: set[asyncio.Event] = set()
+
+
+def _wake_claim_syncs():
+    for event in _claim_sync_events:
+        event.set()
+
+
+async def _claims_sync(websocket: WebSocket, since: int, epoch: str):
+    """Stream claim changes after version `since` of `epoch`: field-level deltas while
+    the change log still covers the client, a full snapshot when it does not (or the
+    version is from another process)."""
+    event = asyncio.Event()
+    _claim_sync_events.add(event)
+    try:
+        while True:
+            event.clear()
+            changes, current = claim_pipeline.changes_since(since, epoch)
+            if changes is None:
+                epoch, version, claims = claim_pipeline.snapshot()
+                await websocket.send_text(dumps_str({"type": "claims_snapshot", "epoch": epoch, "version": version,
+                                                     "claims": claims}))
+                since = version
+            elif changes:
+                await websocket.send_text(dumps_str({"type": "claims_delta", "epoch": epoch, "from": since,
+                                                     "to": changes[-1]["v"], "changes": changes}))
+                since = changes[-1]["v"]
+            if since == claim_pipeline.version:
+                await event.wait()
+    except Exception:
+        pass
+    finally:
+        _claim_sync_events.discard(event)
 
 
 async def _ws_broadcast(channel: str, data: dict):
     connections = ws_connections.get(channel, [])
+    if not connections:
+        return
+    text = dumps_str(data)
     for ws in connections:
         try:
-            await ws.send_json(data)
+            await ws.send_text(text)
         except Exception:
             pass
 
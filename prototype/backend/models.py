@@ -40,6 +40,7 @@ class ClaimStatus(str, Enum):
     SUBMITTED = "submitted"
     FOLLOW_UP = "follow_up"
     DRAFT = "draft"
+    DUPLICATE = "duplicate"
 
 
 @dataclass
@@ -76,6 +77,8 @@ class TraceStep:
     duration_ms: int = 0
     status: str = "success"
     details: dict[str, Any] = field(default_factory=dict)
+    span_id: str = ""
+    parent_id: str = ""
 
 
 @dataclass
@@ -0,0 +1 @@
+# ClaimFlow AI — metrics and tracing
@@ -0,0 +1,199 @@
+"""In-process metrics with Prometheus text exposition.
+
+Recording is a single ``deque.append`` (atomic under the GIL), so the hot path
+never waits on a lock. Samples are folded into counters and histograms when
+/metrics is scraped, or opportunistically by a recording thread once the
+backlog grows, using a non-blocking lock acquire.
+"""
+from __future__ import annotations
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable
+
+# Histogram buckets in seconds (model calls dominate, so the tail is long)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+# Fold pending samples in from the recording thread past this backlog
+_DRAIN_THRESHOLD = 10_000
+
+LabelSet = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict | None) -> LabelSet:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _fmt_labels(labels: LabelSet, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self._buckets = buckets
+        self._pending: deque = deque()
+        self._lock = threading.Lock()
+        self._meta: dict[str, tuple[str, str]] = {}
+        self._counters: dict[tuple[str, LabelSet], float] = {}
+        self._histograms: dict[tuple[str, LabelSet], list] = {}
+        self._collectors: list[Callable[[], Iterable[tuple[str, str, str, dict, float]]]] = []
+
+    # ── Recording (hot path) ─────────────────────────────────────────
+
+    def inc(self, name: str, labels: dict | None = None, value: float = 1.0) -> None:
+        self._pending.append(("c", name, _labels(labels), value))
+        self._maybe_drain()
+
+    def observe(self, name: str, value: float, labels: dict | None = None) -> None:
+        self._pending.append(("h", name, _labels(labels), value))
+        self._maybe_drain()
+
+    def _maybe_drain(self) -> None:
+        if len(self._pending) > _DRAIN_THRESHOLD and self._lock.acquire(blocking=False):
+            try:
+                self._drain()
+            finally:
+                self._lock.release()
+
+    # ── Registration ─────────────────────────────────────────────────
+
+    def describe(self, name: str, metric_type: str, help_text: str) -> None:
+        self._meta[name] = (metric_type, help_text)
+
+    def register_collector(self, fn: Callable[[], Iterable[tuple[str, str, str, dict, float]]]) -> None:
+        """Add a scrape-time callback yielding (name, type, help, labels, value) for gauges
+        and for counters kept elsewhere (e.g. the model client's limiter)."""
+        self._collectors.append(fn)
+
+    # ── Scrape ───────────────────────────────────────────────────────
+
+    def _drain(self) -> None:
+        pending = self._pending
+        while pending:
+            try:
+                kind, name, labels, value = pending.popleft()
+            except IndexError:
+                break
+            key = (name, labels)
+            if kind == "c":
+                self._counters[key] = self._counters.get(key, 0.0) + value
+            else:
+                hist = self._histograms.get(key)
+                if hist is None:
+                    hist = self._histograms[key] = [[0] * len(self._buckets), 0.0, 0]
+                for i, bound in enumerate(self._buckets):
+                    if value <= bound:
+                        hist[0][i] += 1
+                        break
+                hist[1] += value
+                hist[2] += 1
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            self._drain()
+            counters = dict(self._counters)
+            histograms = {k: [list(v[0]), v[1], v[2]] for k, v in self._histograms.items()}
+
+        lines: list[str] = []
+        emitted: set[str] = set()
+
+        def header(name: str, default_type: str, default_help: str = "") -> None:
+            if name in emitted:
+                return
+            emitted.add(name)
+            metric_type, help_text = self._meta.get(name, (default_type, default_help))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, "counter")
+            lines.append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+
+        for (name, labels), (buckets, total, count) in sorted(histograms.items()):
+            header(name, "histogram")
+            cumulative = 0
+            for bound, n in zip(self._buckets, buckets):
+                cumulative += n
+                lines.append(f"{name}_bucket{_fmt_labels(labels, (('le', _fmt_value(bound)),))} {cumulative}")
+            lines.append(f"{name}_bucket{_fmt_labels(labels, (('le', '+Inf'),))} {count}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_value(round(total, 6))}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {count}")
+
+        for collect in self._collectors:
+            for name, metric_type, help_text, labels, value in collect():
+                header(name, metric_type, help_text)
+                lines.append(f"{name}{_fmt_labels(_labels(labels))} {_fmt_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Singleton
+metrics = MetricsRegistry()
+
+metrics.describe("claimflow_stage_duration_seconds", "histogram",
+                 "Duration of pipeline trace steps by step type, tool, agent, intent and status")
+metrics.describe("claimflow_stage_total", "counter", "Pipeline trace steps recorded")
+metrics.describe("claimflow_request_duration_seconds", "histogram", "End-to-end pipeline request latency")
+metrics.describe("claimflow_http_request_duration_seconds", "histogram", "HTTP request latency by route")
+
+
+def observe_trace(endpoint: str, trace_steps: list[dict], latency_ms: int,
+                  agent: str = "", intent: str = "", status: str = "success") -> None:
+    """Feed a request's trace steps and total latency into the stage and request metrics."""
+    for step in trace_steps:
+        name, step_type = step.get("name", ""), step.get("step_type", "")
+        if name.startswith("Tool: "):
+            tool = name[6:]
+        else:
+            tool = name if step_type == "tool_call" else ""
+        labels = {
+            "step_type": step_type,
+            "tool": tool,
+            "agent": agent,
+            "intent": intent,
+            "status": step.get("status", "success"),
+        }
+        metrics.inc("claimflow_stage_total", labels)
+        if step.get("duration_ms"):
+            metrics.observe("claimflow_stage_duration_seconds", step["duration_ms"] / 1000, labels)
+    metrics.observe("claimflow_request_duration_seconds", latency_ms / 1000,
+                    {"endpoint": endpoint, "agent": agent, "intent": intent, "status": status})
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request by route template and status code."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            metrics.observe("claimflow_http_request_duration_seconds", time.perf_counter() - start, {
+                "method": scope["method"],
+                "route": getattr(route, "path", "unmatched"),
+                "status": status["code"],
+            })
@@ -0,0 +1,209 @@
+"""On-demand sampling profiler for individual requests.
+
+A profiled request registers the threads doing its work (the event-loop
+thread while the request is in flight, plus thread-pool workers while they
+run callables submitted through ``tracing.in_executor``). One daemon thread
+samples ``sys._current_frames()`` for the registered threads every
+PROFILE_INTERVAL_MS and counts collapsed stacks, so the cost is paid only
+while at least one profile is active.
+
+The event-loop thread is shared with other in-flight requests, so samples
+taken there are approximate under concurrency; executor work is exact.
+
+Profiling is opt-in per request: an ``X-Profile: 1`` header together with a
+matching ``X-Admin-Token`` (header triggering is off while ADMIN_TOKEN is
+unset), or a random PROFILE_SAMPLE_RATE share of /api requests.
+"""
+from __future__ import annotations
+import contextvars
+import functools
+import hmac
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable
+
+from backend.config import ADMIN_TOKEN, PROFILE_SAMPLE_RATE, PROFILE_INTERVAL_MS
+
+_active_profile: contextvars.ContextVar["Profile | None"] = contextvars.ContextVar("claimflow_profile", default=None)
+
+# Deepest stack kept per sample (frames nearest the leaf win)
+_MAX_DEPTH = 64
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    parts = path.replace("\\", "/").rsplit("/", 2)
+    short = "/".join(parts[-2:]) if len(parts) > 1 else path
+    return f"{short}:{code.co_name}"
+
+
+class Profile:
+    def __init__(self, reason: str):
+        self.reason = reason
+        self.trace_id = ""
+        self.samples = 0
+        self.idle_samples = 0
+        self.stacks: Counter[str] = Counter()
+        self._threads: Counter[int] = Counter()
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._end: float | None = None
+
+    def attach(self, thread_id: int) -> None:
+        with self._lock:
+            self._threads[thread_id] += 1
+
+    def detach(self, thread_id: int) -> None:
+        with self._lock:
+            self._threads[thread_id] -= 1
+            if self._threads[thread_id] <= 0:
+                del self._threads[thread_id]
+
+    def sample(self, frames: dict) -> None:
+        with self._lock:
+            thread_ids = list(self._threads)
+        for tid in thread_ids:
+            frame = frames.get(tid)
+            if frame is None:
+                continue
+            if frame.f_code.co_filename.endswith("selectors.py"):
+                # Event loop parked waiting for I/O — not CPU spent on this request
+                self.idle_samples += 1
+                continue
+            labels = []
+            while frame is not None and len(labels) < _MAX_DEPTH:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Brendan Gregg collapsed-stack format (flamegraph.pl, speedscope)."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, top: int = 20) -> dict:
+        self_counts: Counter[str] = Counter()
+        total_counts: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            for label in set(frames):
+                total_counts[label] += count
+        end = self._end if self._end is not None else time.perf_counter()
+        return {
+            "reason": self.reason,
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "interval_ms": PROFILE_INTERVAL_MS,
+            "duration_ms": int((end - self._start) * 1000),
+            "top_self": [{"frame": f, "samples": n} for f, n in self_counts.most_common(top)],
+            "top_total": [{"frame": f, "samples": n} for f, n in total_counts.most_common(top)],
+            "collapsed": self.collapsed(),
+        }
+
+
+class Profiler:
+    def __init__(self, interval_ms: float = 5.0):
+        self.interval_s = interval_ms / 1000
+        self._profiles: set[Profile] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self, reason: str) -> Profile:
+        profile = Profile(reason)
+        with self._lock:
+            self._profiles.add(profile)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="claimflow-profiler", daemon=True)
+                self._thread.start()
+        return profile
+
+    def stop(self, profile: Profile) -> None:
+        profile._end = time.perf_counter()
+        with self._lock:
+            self._profiles.discard(profile)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                profiles = list(self._profiles)
+                if not profiles:
+                    self._thread = None
+                    return
+            frames = sys._current_frames()
+            for profile in profiles:
+                profile.sample(frames)
+            del frames
+            time.sleep(self.interval_s)
+
+
+def current_profile() -> Profile | None:
+    return _active_profile.get()
+
+
+def attached(fn: Callable) -> Callable:
+    """Wrap fn so the thread running it is sampled for the caller's active profile, if any.
+    Must be called in the context that will run fn (e.g. inside ``ctx.run``)."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile = _active_profile.get()
+        if profile is None:
+            return fn(*args, **kwargs)
+        tid = threading.get_ident()
+        profile.attach(tid)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.detach(tid)
+    return wrapper
+
+
+def _should_profile(headers: dict[bytes, bytes]) -> str:
+    requested = headers.get(b"x-profile", b"").lower() in (b"1", b"true", b"yes")
+    if requested and ADMIN_TOKEN:
+        token = headers.get(b"x-admin-token", b"").decode("latin-1")
+        if hmac.compare_digest(token, ADMIN_TOKEN):
+            return "header"
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return ""
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware that profiles opted-in /api requests.
+
+    on_complete(trace_id, summary) receives the finished profile; trace_id is
+    the request's root trace id when the endpoint was traced, else "".
+    """
+
+    def __init__(self, app, on_complete: Callable[[str, dict], None]):
+        self.app = app
+        self.on_complete = on_complete
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith("/api/"):
+            await self.app(scope, receive, send)
+            return
+        reason = _should_profile(dict(scope["headers"]))
+        if not reason:
+            await self.app(scope, receive, send)
+            return
+
+        profile = profiler.start(reason)
+        token = _active_profile.set(profile)
+        tid = threading.get_ident()
+        profile.attach(tid)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile.detach(tid)
+            profiler.stop(profile)
+            _active_profile.reset(token)
+            self.on_complete(profile.trace_id, profile.summary())
+
+
+# Singleton
+profiler = Profiler(PROFILE_INTERVAL_MS)
@@ -0,0 +1,193 @@
+"""Bounded in-memory store of recent request traces.
+
+Keeps the last N finished request spans in a ring. Each entry gets a small
+summary (endpoint, intent, status, error flag, latency) that is indexed on
+insert, so /api/debug/traces filters on the indexes and never walks the
+stored span trees. Full steps are only built when a single trace is fetched.
+The full response body is kept alongside, for clients that asked for a
+trimmed ``?trace=`` level and need the detail later.
+"""
+from __future__ import annotations
+import bisect
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+
+from backend.config import TRACE_STORE_CAPACITY
+from backend.observability.tracing import Span, tracer, trace_dicts
+from backend.observability.profiler import current_profile
+
+
+@dataclass
+class TraceSummary:
+    seq: int
+    trace_id: str
+    endpoint: str
+    intent: str
+    agent: str
+    status: str
+    error: bool
+    latency_ms: int
+    timestamp: str
+    steps: int
+    attributes: dict
+    profiled: bool = False
+
+
+class TraceStore:
+    def __init__(self, capacity: int = 500):
+        self.capacity = capacity
+        self._ring: list[tuple[TraceSummary, Span] | None] = [None] * capacity
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._by_trace_id: dict[str, int] = {}
+        self._by_endpoint: dict[str, set[int]] = {}
+        self._by_intent: dict[str, set[int]] = {}
+        self._by_status: dict[str, set[int]] = {}
+        self._errors: set[int] = set()
+        # (latency_ms, seq), kept sorted for range queries
+        self._by_latency: list[tuple[int, int]] = []
+        self._profiles: dict[int, dict] = {}
+        self._payloads: dict[int, dict] = {}
+
+    def add(self, root: Span) -> None:
+        spans = list(root.walk())
+        attrs = root.attributes
+        status = root.status if root.status != "success" else str(attrs.get("status", "success"))
+        with self._lock:
+            seq = self._seq
+            self._seq += 1
+            summary = TraceSummary(
+                seq=seq,
+                trace_id=root.trace_id,
+                endpoint=root.name.split(" ", 1)[-1],
+                intent=str(attrs.get("intent", "")),
+                agent=str(attrs.get("agent", "")),
+                status=status,
+                error=any(s.status == "error" for s in spans),
+                latency_ms=root.duration_ms,
+                timestamp=datetime.fromtimestamp(root.start_ts, timezone.utc).isoformat(),
+                steps=len(spans) - 1,
+                attributes={k: v for k, v in attrs.items() if isinstance(v, (str, int, float, bool))},
+            )
+            slot = seq % self.capacity
+            evicted = self._ring[slot]
+            if evicted is not None:
+                self._unindex(evicted[0])
+            self._ring[slot] = (summary, root)
+            self._index(summary)
+        profile = current_profile()
+        if profile is not None:
+            # Profile finishes after the response is sent; attach_profile links it then
+            profile.trace_id = root.trace_id
+
+    def attach_profile(self, trace_id: str, profile: dict) -> bool:
+        with self._lock:
+            seq = self._by_trace_id.get(trace_id)
+            if seq is None:
+                return False
+            self._profiles[seq] = profile
+            self._ring[seq % self.capacity][0].profiled = True
+            return True
+
+    def attach_payload(self, trace_id: str, payload: dict) -> None:
+        """Keep the full response body so trimmed (?trace=) responses can be expanded later."""
+        with self._lock:
+            seq = self._by_trace_id.get(trace_id)
+            if seq is not None:
+                self._payloads[seq] = payload
+
+    def get_payload(self, trace_id: str) -> dict | None:
+        with self._lock:
+            seq = self._by_trace_id.get(trace_id)
+            return self._payloads.get(seq) if seq is not None else None
+
+    def _index(self, s: TraceSummary) -> None:
+        self._by_trace_id[s.trace_id] = s.seq
+        self._by_endpoint.setdefault(s.endpoint, set()).add(s.seq)
+        self._by_intent.setdefault(s.intent, set()).add(s.seq)
+        self._by_status.setdefault(s.status, set()).add(s.seq)
+        if s.error:
+            self._errors.add(s.seq)
+        bisect.insort(self._by_latency, (s.latency_ms, s.seq))
+
+    def _unindex(self, s: TraceSummary) -> None:
+        self._by_trace_id.pop(s.trace_id, None)
+        for index, key in ((self._by_endpoint, s.endpoint), (self._by_intent, s.intent), (self._by_status, s.status)):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.discard(s.seq)
+                if not bucket:
+                    del index[key]
+        self._errors.discard(s.seq)
+        self._profiles.pop(s.seq, None)
+        self._payloads.pop(s.seq, None)
+        i = bisect.bisect_left(self._by_latency, (s.latency_ms, s.seq))
+        if i < len(self._by_latency) and self._by_latency[i] == (s.latency_ms, s.seq):
+            del self._by_latency[i]
+
+    def query(self, min_ms: int | None = None, max_ms: int | None = None, endpoint: str | None = None,
+              intent: str | None = None, status: str | None = None, error: bool | None = None,
+              limit: int = 50) -> list[dict]:
+        """Summaries matching every given filter, newest first."""
+        with self._lock:
+            candidates: set[int] | None = None
+
+            def narrow(seqs) -> None:
+                nonlocal candidates
+                candidates = set(seqs) if candidates is None else candidates & set(seqs)
+
+            if min_ms is not None or max_ms is not None:
+                lo = bisect.bisect_left(self._by_latency, (min_ms if min_ms is not None else -1, -1))
+                hi = (bisect.bisect_right(self._by_latency, (max_ms, float("inf")))
+                      if max_ms is not None else len(self._by_latency))
+                narrow(seq for _, seq in self._by_latency[lo:hi])
+            if endpoint is not None:
+                narrow(self._by_endpoint.get(endpoint, ()))
+            if intent is not None:
+                narrow(self._by_intent.get(intent, ()))
+            if status is not None:
+                narrow(self._by_status.get(status, ()))
+            if error is not None:
+                if error:
+                    narrow(self._errors)
+                else:
+                    narrow(seq for seq in self._by_trace_id.values() if seq not in self._errors)
+            if candidates is None:
+                candidates = set(self._by_trace_id.values())
+
+            newest = sorted(candidates, reverse=True)[:limit]
+            return [asdict(self._ring[seq % self.capacity][0]) for seq in newest]
+
+    def get(self, trace_id: str) -> dict | None:
+        with self._lock:
+            seq = self._by_trace_id.get(trace_id)
+            if seq is None:
+                return None
+            summary, root = self._ring[seq % self.capacity]
+            profile = self._profiles.get(seq)
+        trace = {**asdict(summary), "trace_steps": trace_dicts(root.trace_steps(include_self=False))}
+        if profile is not None:
+            trace["profile"] = {k: v for k, v in profile.items() if k != "collapsed"}
+        return trace
+
+    def get_profile(self, trace_id: str) -> dict | None:
+        with self._lock:
+            seq = self._by_trace_id.get(trace_id)
+            return self._profiles.get(seq) if seq is not None else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "stored": len(self._by_trace_id),
+                "recorded": self._seq,
+                "errors": len(self._errors),
+                "profiled": len(self._profiles),
+                "endpoints": {k: len(v) for k, v in self._by_endpoint.items()},
+            }
+
+
+# Singleton
+trace_store = TraceStore(TRACE_STORE_CAPACITY)
+tracer.on_trace_end(trace_store.add)
@@ -0,0 +1,210 @@
+"""Span-based request tracing.
+
+Spans nest through a context variable, so the active span follows asyncio
+tasks automatically and follows work handed to a thread pool when it is
+submitted with ``in_executor`` (which runs the callable in a copy of the
+caller's context). The flat ``TraceStep`` lists returned by the API are
+derived from the span tree.
+
+Sampling is decided once per trace at the root span (head-based); only
+sampled traces are handed to the exporter.
+"""
+from __future__ import annotations
+import asyncio
+import contextvars
+import functools
+import logging
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from backend.config import TRACE_SAMPLE_RATE, TRACE_EXPORT_PATH
+from backend.models import TraceStep
+from backend.serialization import dumps_str
+from backend.observability.profiler import attached
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar("claimflow_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "step_type", "trace_id", "span_id", "parent_id", "sampled", "status",
+                 "attributes", "children", "start_ts", "_start", "_end", "_token")
+
+    def __init__(self, name: str, step_type: str, trace_id: str, parent_id: str | None,
+                 sampled: bool, attributes: dict[str, Any]):
+        self.name = name
+        self.step_type = step_type
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.status = "success"
+        self.attributes = attributes
+        self.children: list[Span] = []
+        self.start_ts = time.time()
+        self._start = time.perf_counter()
+        self._end: float | None = None
+        self._token = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def ended(self) -> bool:
+        return self._end is not None
+
+    @property
+    def duration_ms(self) -> int:
+        end = self._end if self._end is not None else time.perf_counter()
+        return int((end - self._start) * 1000)
+
+    def walk(self) -> Iterator["Span"]:
+        """Depth-first, children in the order they were opened or recorded."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def trace_steps(self, include_self: bool = True) -> list[TraceStep]:
+        spans = self.walk() if include_self else (s for c in self.children for s in c.walk())
+        return [TraceStep(
+            name=s.name,
+            step_type=s.step_type,
+            duration_ms=s.duration_ms,
+            status=s.status if s.ended else "running",
+            details=dict(s.attributes),
+            span_id=s.span_id,
+            parent_id=s.parent_id or "",
+        ) for s in spans]
+
+    def to_dict(self, origin: float | None = None) -> dict:
+        origin = self._start if origin is None else origin
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "step_type": self.step_type,
+            "start_offset_ms": round((self._start - origin) * 1000, 3),
+            "duration_ms": self.duration_ms,
+            "status": self.status if self.ended else "running",
+            "attributes": self.attributes,
+        }
+
+
+class Tracer:
+    def __init__(self, sample_rate: float = 1.0, exporter: "JsonlExporter | None" = None):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self._listeners: list[Callable[[Span], None]] = []
+
+    def on_trace_end(self, fn: Callable[[Span], None]) -> None:
+        """Call fn with every finished root span, sampled or not."""
+        self._listeners.append(fn)
+
+    def current(self) -> Span | None:
+        return _current_span.get()
+
+    def start(self, name: str, step_type: str = "internal", **attributes) -> Span:
+        """Open a span as a child of the active one (or as a new trace root) and make it active.
+        Prefer the ``span`` context manager; a started span must be ended with ``end``."""
+        parent = _current_span.get()
+        if parent is None:
+            span = Span(name, step_type, uuid.uuid4().hex, None,
+                        random.random() < self.sample_rate, attributes)
+        else:
+            span = Span(name, step_type, parent.trace_id, parent.span_id, parent.sampled, attributes)
+            parent.children.append(span)
+        span._token = _current_span.set(span)
+        return span
+
+    def end(self, span: Span) -> None:
+        span._end = time.perf_counter()
+        if span._token is not None:
+            try:
+                _current_span.reset(span._token)
+            except ValueError:
+                # Ended from a different context than it was started in
+                pass
+            span._token = None
+        if span.parent_id is None:
+            for fn in self._listeners:
+                try:
+                    fn(span)
+                except Exception as e:
+                    logger.warning(f"Trace listener failed: {e}")
+            if span.sampled and self.exporter is not None:
+                self.exporter.export(span)
+
+    @contextmanager
+    def span(self, name: str, step_type: str = "internal", **attributes) -> Iterator[Span]:
+        span = self.start(name, step_type, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            if span.status == "success":
+                span.status = "error"
+            span.attributes.setdefault("error", type(e).__name__)
+            raise
+        finally:
+            self.end(span)
+
+    def event(self, name: str, step_type: str, duration_ms: int = 0, status: str = "success",
+              **attributes) -> Span | None:
+        """Record an already-finished step under the active span (no-op outside a trace)."""
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        span = Span(name, step_type, parent.trace_id, parent.span_id, parent.sampled, attributes)
+        span.status = status
+        span._start -= duration_ms / 1000
+        span.start_ts -= duration_ms / 1000
+        span._end = span._start + duration_ms / 1000
+        parent.children.append(span)
+        return span
+
+
+class JsonlExporter:
+    """Appends one JSON line per sampled trace: the root summary plus its flattened spans."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, root: Span) -> None:
+        record = {
+            "trace_id": root.trace_id,
+            "name": root.name,
+            "timestamp": root.start_ts,
+            "duration_ms": root.duration_ms,
+            "status": root.status,
+            "attributes": root.attributes,
+            "spans": [s.to_dict(root._start) for s in root.walk()],
+        }
+        line = dumps_str(record) + "\n"
+        try:
+            with self._lock, self.path.open("a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError as e:
+            logger.warning(f"Trace export failed: {e}")
+
+
+def in_executor(fn: Callable, *args, **kwargs) -> asyncio.Future:
+    """loop.run_in_executor that carries the caller's context (its active span and
+    profile, if any) into the worker."""
+    ctx = contextvars.copy_context()
+    return asyncio.get_running_loop().run_in_executor(None, functools.partial(ctx.run, attached(fn), *args, **kwargs))
+
+
+def trace_dicts(steps: list[TraceStep]) -> list[dict]:
+    return [{"name": s.name, "step_type": s.step_type, "duration_ms": s.duration_ms, "status": s.status,
+             "details": s.details, "span_id": s.span_id, "parent_id": s.parent_id} for s in steps]
+
+
+# Singleton
+tracer = Tracer(TRACE_SAMPLE_RATE, JsonlExporter(TRACE_EXPORT_PATH) if TRACE_EXPORT_PATH else None)
@@ -0,0 +1,39 @@
+"""Response trace verbosity.
+
+Chat and intake responses embed full tool outputs, RAG chunk texts and every
+trace step. Clients pick how much of that to receive with ``?trace=``:
+
+    full     everything (default, TRACE_DEFAULT_LEVEL)
+    summary  tool names/inputs/timings, RAG source headings and scores, trace
+             steps without details
+    none     no tools_called, rag_sources or trace_steps
+
+The full payload stays retrievable by request_id from the trace store.
+"""
+from __future__ import annotations
+from typing import Literal
+
+TraceLevel = Literal["none", "summary", "full"]
+
+_HEAVY_KEYS = ("tools_called", "rag_sources", "trace_steps")
+_STEP_SUMMARY_KEYS = ("name", "step_type", "duration_ms", "status", "span_id", "parent_id")
+_RAG_SUMMARY_KEYS = ("source_doc", "heading", "relevance_score")
+
+
+def apply_trace_level(payload: dict, level: TraceLevel) -> dict:
+    """Shallow copy of a response payload trimmed to the level; "full" returns it unchanged."""
+    if level == "full":
+        return payload
+    out = dict(payload)
+    if level == "none":
+        for key in _HEAVY_KEYS:
+            if key in out:
+                out[key] = []
+        return out
+    if "tools_called" in out:
+        out["tools_called"] = [{k: v for k, v in tc.items() if k != "output"} for tc in out["tools_called"]]
+    if "rag_sources" in out:
+        out["rag_sources"] = [{k: rs.get(k) for k in _RAG_SUMMARY_KEYS} for rs in out["rag_sources"]]
+    if "trace_steps" in out:
+        out["trace_steps"] = [{k: step.get(k) for k in _STEP_SUMMARY_KEYS} for step in out["trace_steps"]]
+    return out
@@ -10,6 +10,7 @@ import numpy as np
 
 from backend.config import RAG_TOP_K
 from backend.rag.indexer import Chunk, load_and_chunk_documents
+from backend.singleflight import retrieval_flight
 
 logger = logging.getLogger(__name__)
 
@@ -41,11 +42,13 @@ class Retriever:
         logger.info(f"Indexed {len(self._chunks)} chunks from {len(set(c.source_doc for c in self._chunks))} documents")
 
     def search(self, query: str, top_k: int | None = None) -> list[dict]:
-        """Search for relevant chunks given a query."""
+        """Search for relevant chunks given a query (identical concurrent searches run once)."""
         if not self._ready or self._vectorizer is None:
             return []
-
         k = top_k or RAG_TOP_K
+        return retrieval_flight.do((query, k), self._search, query, k)
+
+    def _search(self, query: str, k: int) -> list[dict]:
         query_vec = self._vectorizer.transform([query])
         scores = cosine_similarity(query_vec, self._tfidf_matrix).flatten()
 
@@ -0,0 +1,45 @@
+"""JSON encoding for API responses and tool results.
+
+Uses orjson when it is installed and falls back to the stdlib encoder with the
+same compact output. Responses we assemble ourselves are returned as
+``FastJSONResponse`` so FastAPI skips response-model validation and
+``jsonable_encoder`` on payloads that are already plain JSON types.
+"""
+from __future__ import annotations
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTS)
+
+    def dumps_str(obj: Any) -> str:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTS).decode()
+
+    loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str)
+
+    def dumps(obj: Any) -> bytes:
+        return _encoder.encode(obj).encode()
+
+    def dumps_str(obj: Any) -> str:
+        return _encoder.encode(obj)
+
+    loads = json.loads
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,99 @@
+"""Single-flight: concurrent identical calls share one execution.
+
+The first caller for a key runs the function; callers arriving with the same
+key while it runs block until it finishes and get their own copy of its
+result (or its exception). Nothing is kept afterwards. This is not a cache;
+a call that starts after the first has finished runs again.
+
+Tools, knowledge-base searches and model calls run on executor threads, so
+this is thread-based (a lock and one Event per key). Each layer keeps its own
+counts for the coalescing-ratio metrics; see flights().
+"""
+from __future__ import annotations
+import copy
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Hashable
+
+from backend.config import SINGLEFLIGHT_ENABLED
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "shared")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.shared = 0
+
+
+class SingleFlight:
+    def __init__(self, name: str, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self.stats = {"calls": 0, "executions": 0, "shared": 0}
+        _flights.append(self)
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        if not self.enabled:
+            return fn(*args, **kwargs)
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["executions"] += 1
+            else:
+                call.shared += 1
+                self.stats["shared"] += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            # Callers may edit what they get back, so each follower gets its own copy
+            return copy.deepcopy(call.result)
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        else:
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+            # No one can join now. Followers copy from a private copy taken before they
+            # wake, so the leader's caller is free to mutate the result it got back.
+            if call.error is None and call.shared:
+                call.result = copy.deepcopy(result)
+            call.done.set()
+
+    def ratio(self) -> float:
+        """Share of calls that joined another call instead of executing."""
+        return self.stats["shared"] / self.stats["calls"] if self.stats["calls"] else 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {**self.stats, "in_flight": len(self._calls), "coalesced_ratio": round(self.ratio(), 4)}
+
+
+def request_key(*parts: Any) -> str:
+    """Stable key for JSON-like arguments (dict order ignored; other objects by repr)."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=repr).encode()).hexdigest()
+
+
+def flights() -> list[SingleFlight]:
+    return list(_flights)
+
+
+_flights: list[SingleFlight] = []
+
+# Singletons
+tool_flight = SingleFlight("tool", SINGLEFLIGHT_ENABLED)
+retrieval_flight = SingleFlight("retrieval", SINGLEFLIGHT_ENABLED)
+model_flight = SingleFlight("model", SINGLEFLIGHT_ENABLED)
@@ -0,0 +1,130 @@
+"""Asynchronous audit log sink.
+
+Chat turns hand their (already redacted) audit records to ``audit_sink.write``,
+which only enqueues them on a bounded asyncio queue. A background task drains
+the queue in batches of up to AUDIT_BATCH_SIZE, waiting at most
+AUDIT_FLUSH_INTERVAL_MS for a batch to fill, and appends each batch to an
+NDJSON file with a single fsync on an executor thread (group commit).
+
+When the writer falls behind and the queue is full, ``write`` waits for room
+instead of dropping the entry, so a slow disk slows chat turns down rather
+than losing audit history. Waits are counted in ``stats["backpressure_waits"]``.
+
+The active file is ``audit.ndjson``; past AUDIT_MAX_BYTES it is renamed to
+``audit-<UTC timestamp>.ndjson`` and the oldest rotated files beyond
+AUDIT_BACKUPS are deleted.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+
+from backend.config import (
+    AUDIT_DIR, AUDIT_QUEUE_SIZE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL_MS, AUDIT_MAX_BYTES, AUDIT_BACKUPS,
+)
+from backend.serialization import dumps_str
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_FILE = "audit.ndjson"
+
+
+class AuditSink:
+    def __init__(self, directory: Path | str, queue_size: int = 10000, batch_size: int = 256,
+                 flush_interval_ms: float = 50, max_bytes: int = 50_000_000, backups: int = 10):
+        self.directory = Path(directory)
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_ms / 1000
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue: asyncio.Queue[str] | None = None
+        self._task: asyncio.Task | None = None
+        self._file = None
+        self.stats = {"written": 0, "batches": 0, "rotations": 0, "backpressure_waits": 0, "errors": 0}
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.directory / ACTIVE_FILE, "a", encoding="utf-8")
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Write out everything queued, then close the file."""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._queue = None
+        self._file.close()
+        self._file = None
+
+    async def write(self, entry: dict) -> None:
+        """Queue an audit record; waits for room when the writer is behind."""
+        if self._queue is None:
+            return
+        line = dumps_str(entry)
+        try:
+            self._queue.put_nowait(line)
+        except asyncio.QueueFull:
+            self.stats["backpressure_waits"] += 1
+            await self._queue.put(line)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval_s
+            while len(batch) < self.batch_size:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+            try:
+                await loop.run_in_executor(None, self._write_batch, batch)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Audit write failed, {len(batch)} entries not persisted: {e}")
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write_batch(self, lines: list[str]) -> None:
+        self._file.write("\n".join(lines) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.stats["written"] += len(lines)
+        self.stats["batches"] += 1
+        if self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        os.replace(self.directory / ACTIVE_FILE, self.directory / f"audit-{stamp}.ndjson")
+        self._file = open(self.directory / ACTIVE_FILE, "a", encoding="utf-8")
+        self.stats["rotations"] += 1
+        rotated = sorted(self.directory.glob("audit-*.ndjson"))
+        for old in rotated[:max(0, len(rotated) - self.backups)]:
+            old.unlink()
+
+
+# Singleton
+audit_sink = AuditSink(AUDIT_DIR, AUDIT_QUEUE_SIZE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL_MS,
+                       AUDIT_MAX_BYTES, AUDIT_BACKUPS)
@@ -0,0 +1,226 @@
+"""Intake dedup: link repeat FNOL emails to the claim they repeat, before any model call.
+
+Claimants resend the same loss, or reply with the first email quoted. Each
+incoming body is checked, in order, for
+
+1. an exact repeat — hash of the normalized body (lowercased words, quoted
+   replies and forwarding headers dropped);
+2. a near-duplicate — MinHash signature over word 3-shingles, found through
+   LSH band buckets and confirmed when the estimated Jaccard similarity is at
+   least DEDUP_SIMILARITY.
+
+A match is linked to the earlier claim and not sent to the model. A second
+report of the same loss in other words (a spouse writing separately) is
+caught after extraction instead: add_loss returns the earlier claim with the
+same extracted (policy number, date of loss), and the new claim is flagged
+as a possible duplicate for the CSR but processed as usual. Dates named in a
+body are not used, since an email may mention an earlier, settled loss.
+
+Every lookup is a dict probe. Each LSH bucket keeps only its newest
+DEDUP_BUCKET_SIZE claims, so a near-duplicate check compares at most
+bands x bucket size signatures however many claims there are. A claim is
+indexed when its intake starts (so a resend while it is processing links to
+it) and dropped again with forget() if the intake fails. Duplicates are not
+indexed. All methods run on the event loop; the index is rebuilt from the
+claim pipeline on startup.
+"""
+from __future__ import annotations
+import hashlib
+import re
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable
+
+import numpy as np
+
+from backend.config import DEDUP_ENABLED, DEDUP_SIMILARITY, DEDUP_BUCKET_SIZE
+from backend.tools.policy_index import normalize_policy_number, fold_ocr
+
+NUM_PERM = 128
+BANDS = 16  # 8 rows per band: candidates from about 0.7 similarity
+SHINGLE = 3
+
+_WORDS = re.compile(r"[a-z0-9]+")
+_QUOTE_START = re.compile(r"^\s*(on .{0,200} wrote:|-{2,}\s*original message\s*-{2,})\s*$", re.I)
+_HEADER = re.compile(r"^\s*((from|to|cc|sent|date|subject):.*|-{2,}\s*forwarded message\s*-{2,}|begin forwarded message:?)\s*$",
+                     re.I)
+
+
+def own_text(text: str) -> str:
+    """The email's own lines: quoted replies and forwarding headers dropped."""
+    lines = []
+    for line in text.splitlines():
+        if _QUOTE_START.match(line):
+            break
+        if line.lstrip().startswith(">") or _HEADER.match(line):
+            continue
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def policy_key(value: str) -> str:
+    return fold_ocr(normalize_policy_number(value or ""))
+
+
+def loss_date_key(value: str) -> str:
+    """ISO date for a YYYY-MM-DD (or longer ISO) date of loss; "" when it is not one."""
+    try:
+        return date.fromisoformat((value or "").strip()[:10]).isoformat()
+    except ValueError:
+        return ""
+
+
+@dataclass
+class DuplicateMatch:
+    claim_id: str
+    match: str  # exact | near
+    score: float
+
+
+class MinHasher:
+    """MinHash over word shingles with NUM_PERM multiply-shift hash functions."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 0x5EED):
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, size=(num_perm, 1), dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, words: list[str]) -> np.ndarray | None:
+        if len(words) < SHINGLE:
+            return None
+        shingles = np.unique(np.fromiter(
+            (zlib.crc32(" ".join(words[i:i + SHINGLE]).encode()) for i in range(len(words) - SHINGLE + 1)),
+            dtype=np.uint64))
+        # uint64 arithmetic wraps, so (a*x + b) >> 32 is a 32-bit multiply-shift hash per row
+        return ((self._a * shingles + self._b) >> np.uint64(32)).min(axis=1).astype(np.uint32)
+
+
+class ClaimDedup:
+    def __init__(self, enabled: bool = True, similarity: float = 0.8, bucket_size: int = 64,
+                 num_perm: int = NUM_PERM, bands: int = BANDS):
+        self.enabled = enabled
+        self.similarity = similarity
+        self.bucket_size = bucket_size
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._hasher = MinHasher(num_perm)
+        self._exact: dict[bytes, str] = {}
+        self._digests: dict[str, bytes] = {}
+        self._signatures: dict[str, np.ndarray] = {}
+        self._buckets: dict[tuple[int, bytes], deque[str]] = {}
+        self._losses: dict[tuple[str, str], str] = {}
+        self._loss_keys: dict[str, set[tuple[str, str]]] = {}
+        self.stats = {"checked": 0, "indexed": 0, "exact": 0, "near": 0, "flagged": 0}
+
+    def admit(self, claim_id: str, email_text: str, check: bool = True) -> DuplicateMatch | None:
+        """The claim this email repeats, or None after indexing it as a new claim.
+        check=False indexes it without looking for a match."""
+        if not self.enabled:
+            return None
+        body = " ".join(_WORDS.findall(own_text(email_text).lower()))
+        digest = hashlib.blake2b(body.encode(), digest_size=16).digest()
+        signature = self._hasher.signature(body.split())
+        if check:
+            self.stats["checked"] += 1
+            match = self._match(body, digest, signature)
+            if match is not None:
+                self.stats[match.match] += 1
+                return match
+        self._index(claim_id, body, digest, signature)
+        return None
+
+    def add_loss(self, claim_id: str, policy_numbers: Iterable[str | None], date_of_loss: str | None) -> str | None:
+        """Index a claim's extracted date of loss under each of its policy numbers (as written,
+        and as found in the AMS). Returns an earlier claim already holding one of those keys:
+        a possible duplicate for the CSR to review."""
+        earlier = self._add_loss(claim_id, policy_numbers, date_of_loss)
+        if earlier is not None:
+            self.stats["flagged"] += 1
+        return earlier
+
+    def forget(self, claim_id: str) -> None:
+        """Drop a claim whose intake failed, so a retry is processed instead of linked to it."""
+        digest = self._digests.pop(claim_id, None)
+        if digest is None:
+            return
+        self.stats["indexed"] -= 1
+        if self._exact.get(digest) == claim_id:
+            del self._exact[digest]
+        signature = self._signatures.pop(claim_id, None)
+        if signature is not None:
+            for key in self._band_keys(signature):
+                bucket = self._buckets.get(key)
+                if bucket is not None and claim_id in bucket:
+                    bucket.remove(claim_id)
+        for key in self._loss_keys.pop(claim_id, ()):
+            if self._losses.get(key) == claim_id:
+                del self._losses[key]
+
+    def index_claims(self, records: Iterable) -> None:
+        """Rebuild from restored ClaimRecords (linked duplicates are skipped)."""
+        for record in records:
+            if record.duplicate_of or not record.email_raw:
+                continue
+            self.admit(record.claim_id, record.email_raw, check=False)
+            self._add_loss(record.claim_id, (record.extraction.get("policy_number"),
+                                             record.policy_data.get("policy_number")),
+                           record.extraction.get("date_of_loss"))
+
+    @property
+    def size(self) -> int:
+        return self.stats["indexed"]
+
+    def _add_loss(self, claim_id: str, policy_numbers: Iterable[str | None], date_of_loss: str | None) -> str | None:
+        loss_date = loss_date_key(date_of_loss or "")
+        if not self.enabled or not loss_date:
+            return None
+        earlier = None
+        for policy_number in policy_numbers:
+            key = (policy_key(policy_number or ""), loss_date)
+            if not key[0]:
+                continue
+            owner = self._losses.setdefault(key, claim_id)
+            if owner == claim_id:
+                self._loss_keys.setdefault(claim_id, set()).add(key)
+            elif earlier is None:
+                earlier = owner
+        return earlier
+
+    def _match(self, body: str, digest: bytes, signature: np.ndarray | None) -> DuplicateMatch | None:
+        if body and digest in self._exact:
+            return DuplicateMatch(self._exact[digest], "exact", 1.0)
+        if signature is not None:
+            best: DuplicateMatch | None = None
+            seen: set[str] = set()
+            for key in self._band_keys(signature):
+                for claim_id in self._buckets.get(key, ()):
+                    if claim_id in seen:
+                        continue
+                    seen.add(claim_id)
+                    score = float(np.count_nonzero(self._signatures[claim_id] == signature)) / len(signature)
+                    if score >= self.similarity and (best is None or score > best.score):
+                        best = DuplicateMatch(claim_id, "near", score)
+            return best
+        return None
+
+    def _index(self, claim_id: str, body: str, digest: bytes, signature: np.ndarray | None) -> None:
+        self.stats["indexed"] += 1
+        self._digests[claim_id] = digest
+        if body:
+            self._exact.setdefault(digest, claim_id)
+        if signature is not None:
+            self._signatures[claim_id] = signature
+            for key in self._band_keys(signature):
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = deque(maxlen=self.bucket_size)
+                bucket.append(claim_id)
+
+    def _band_keys(self, signature: np.ndarray) -> list[tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+
+# Singleton
+claim_dedup = ClaimDedup(DEDUP_ENABLED, DEDUP_SIMILARITY, DEDUP_BUCKET_SIZE)
@@ -0,0 +1,280 @@
+"""Append-only journal of claim state transitions with periodic snapshots.
+
+Stores register a named *source* (snapshot and restore callbacks) and append
+one event per state transition. Events are serialized at append time and
+handed to a writer thread that writes and fsyncs them in batches every
+JOURNAL_FLUSH_INTERVAL_MS (group commit), so a crash loses at most one
+interval of transitions and request threads never wait on the disk.
+
+Every JOURNAL_SNAPSHOT_EVERY events the writer closes the current segment,
+asks each source for its state and writes a compacted snapshot; segments
+the snapshot covers are then deleted. Snapshots are fuzzy: state is read
+after the snapshot's sequence number is fixed, so it may already include
+some later events. Events carry absolute field values, so replaying those
+again on top of the snapshot converges on the same state.
+
+A failed write (disk full, I/O error) is rolled back to the segment's last
+good line and the batch stays queued for the next attempt; durability only
+advances past events that were written and fsynced, so flush() times out
+rather than acknowledging them.
+
+Recovery loads the latest snapshot and replays the journal tail, which the
+snapshot interval keeps bounded (see bench/journal_recovery.py). A torn
+last line from a crash mid-write ends the replay of that segment.
+
+Layout under JOURNAL_DIR::
+
+    snapshot.json                  {"seq": N, "sources": {name: state}}
+    journal-<first seq>.jsonl      {"seq": n, "src": name, ...event}
+"""
+from __future__ import annotations
+import gc
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from backend.config import JOURNAL_DIR, JOURNAL_FLUSH_INTERVAL_MS, JOURNAL_SNAPSHOT_EVERY
+from backend.serialization import dumps_str, loads
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = "snapshot.json"
+
+
+class ClaimJournal:
+    def __init__(self, directory: Path | str, flush_interval_ms: float = 20, snapshot_every: int = 1000):
+        self.directory = Path(directory)
+        self.flush_interval_s = flush_interval_ms / 1000
+        self.snapshot_every = snapshot_every
+        self._sources: dict[str, tuple[Callable[[], Any], Callable[[Any, list[dict]], None]]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._pending: list[str] = []
+        self._seq = 0
+        self._durable_seq = 0
+        self._since_snapshot = 0
+        self._segment = None
+        self._thread: threading.Thread | None = None
+        self._closing = False
+        self.stats = {"appended": 0, "flushes": 0, "write_errors": 0, "snapshots": 0, "recovered_events": 0,
+                      "recovery_ms": 0}
+
+    @property
+    def is_open(self) -> bool:
+        return self._segment is not None
+
+    def register(self, name: str, snapshot: Callable[[], Any], restore: Callable[[Any, list[dict]], None]) -> None:
+        """snapshot() returns the source's JSON-able state (taking its own lock);
+        restore(state, events) rebuilds it from a snapshot (None if none) plus the tail."""
+        self._sources[name] = (snapshot, restore)
+
+    def append(self, source: str, event: dict) -> int:
+        """Queue an event; returns its sequence number (0 while the journal is closed)."""
+        if self._segment is None:
+            return 0
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self._pending.append(dumps_str({"seq": seq, "src": source, **event}))
+            self.stats["appended"] += 1
+            self._since_snapshot += 1
+            if len(self._pending) == 1:
+                self._wake.notify()
+        return seq
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything appended so far is on disk; False on timeout (or while writes fail)."""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            target = self._seq
+            self._wake.notify()
+            while self._durable_seq < target and self._thread is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._wake.wait(remaining)
+        return True
+
+    # ── Recovery ─────────────────────────────────────────────────────
+
+    def open(self) -> dict:
+        """Recover every registered source, then start a fresh segment and the writer."""
+        start = time.perf_counter()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Replay allocates only long-lived objects; cyclic GC passes over them are pure overhead
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            snapshot_seq, states = self._load_snapshot()
+            events: dict[str, list[dict]] = {name: [] for name in self._sources}
+            last_seq = snapshot_seq
+            replayed = 0
+            for path in self._segments():
+                for event in self._read_segment(path):
+                    if event["seq"] <= snapshot_seq:
+                        continue
+                    last_seq = max(last_seq, event["seq"])
+                    if event["src"] in events:
+                        events[event["src"]].append(event)
+                        replayed += 1
+            for name, (_, restore) in self._sources.items():
+                restore(states.get(name), events[name])
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        self._seq = self._durable_seq = last_seq
+        self._since_snapshot = replayed
+        self._segment = open(self.directory / f"journal-{last_seq + 1:012d}.jsonl", "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="claimflow-journal", daemon=True)
+        self._thread.start()
+        self.stats["recovered_events"] = replayed
+        self.stats["recovery_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        if replayed or snapshot_seq:
+            logger.info(f"Recovered claim journal: snapshot @{snapshot_seq} + {replayed} events "
+                        f"in {self.stats['recovery_ms']}ms")
+        return {"snapshot_seq": snapshot_seq, "replayed": replayed, "seq": last_seq,
+                "recovery_ms": self.stats["recovery_ms"]}
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+        with self._lock:
+            self._closing = True
+            self._wake.notify()
+        self._thread.join()
+        self._thread = None
+        self._segment.close()
+        self._segment = None
+        self._closing = False
+
+    def _load_snapshot(self) -> tuple[int, dict]:
+        path = self.directory / SNAPSHOT_FILE
+        if not path.exists():
+            return 0, {}
+        with open(path, "rb") as f:
+            data = loads(f.read())
+        return int(data["seq"]), data.get("sources", {})
+
+    def _segments(self) -> list[Path]:
+        return sorted(self.directory.glob("journal-*.jsonl"))
+
+    @staticmethod
+    def _read_segment(path: Path):
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    yield loads(line)
+                except ValueError:
+                    # Torn write at the crash point; nothing after it was acknowledged
+                    logger.warning(f"Journal {path.name}: stopping at unreadable line")
+                    return
+
+    # ── Writer thread ────────────────────────────────────────────────
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._pending and not self._closing and self._since_snapshot < self.snapshot_every:
+                    self._wake.wait()
+                closing = self._closing
+            if not closing and self._pending:
+                # Group commit: let the batch fill for one interval, then fsync once
+                time.sleep(self.flush_interval_s)
+            with self._lock:
+                batch, self._pending = self._pending, []
+                seq = self._seq
+                snapshot_due = self._since_snapshot >= self.snapshot_every
+                if snapshot_due:
+                    self._since_snapshot = 0
+            if batch:
+                try:
+                    self._write(batch)
+                except OSError as e:
+                    self.stats["write_errors"] += 1
+                    with self._lock:
+                        # Keep the batch (ahead of anything appended since) and retry after an interval
+                        self._pending = batch + self._pending
+                        if snapshot_due:
+                            self._since_snapshot = self.snapshot_every
+                    if closing:
+                        logger.error(f"Journal write failed at close, {len(batch)} events not persisted: {e}")
+                        return
+                    logger.error(f"Journal write failed, {len(batch)} events queued for retry: {e}")
+                    time.sleep(self.flush_interval_s)
+                    continue
+            with self._lock:
+                self._durable_seq = seq
+                self._wake.notify_all()
+            if snapshot_due:
+                try:
+                    self._snapshot(seq)
+                except Exception as e:
+                    logger.error(f"Journal snapshot failed: {e}")
+            if closing:
+                with self._lock:
+                    if not self._pending:
+                        return
+
+    def _write(self, lines: list[str]) -> None:
+        if self._segment.closed:
+            # Closed by a failed write; reopening may fail again, which is retried like the write
+            self._segment = open(self._segment.name, "a", encoding="utf-8")
+        good_size = os.fstat(self._segment.fileno()).st_size
+        try:
+            self._segment.write("\n".join(lines) + "\n")
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+        except OSError:
+            # Drop the buffered remainder and any partial line: a torn line mid-segment ends replay there
+            path = self._segment.name
+            try:
+                self._segment.close()
+            except OSError:
+                pass
+            try:
+                os.truncate(path, good_size)
+            except OSError:
+                pass
+            raise
+        self.stats["flushes"] += 1
+
+    def _snapshot(self, seq: int) -> None:
+        # Everything up to seq is in the current segment; later events go to a new one
+        self._segment.close()
+        self._segment = open(self.directory / f"journal-{seq + 1:012d}.jsonl", "a", encoding="utf-8")
+        states = {name: snapshot() for name, (snapshot, _) in self._sources.items()}
+        tmp = self.directory / (SNAPSHOT_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(dumps_str({"seq": seq, "sources": states}))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.directory / SNAPSHOT_FILE)
+        _fsync_dir(self.directory)
+        current = Path(self._segment.name).name
+        for path in self._segments():
+            if path.name != current and _segment_start(path) <= seq:
+                path.unlink()
+        self.stats["snapshots"] += 1
+
+
+def _segment_start(path: Path) -> int:
+    return int(path.stem.split("-", 1)[1])
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # not supported on every platform
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# Singleton
+claim_journal = ClaimJournal(JOURNAL_DIR, JOURNAL_FLUSH_INTERVAL_MS, JOURNAL_SNAPSHOT_EVERY)
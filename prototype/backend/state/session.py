@@ -1,52 +1,20 @@
 """Session and data management for ClaimFlow AI."""
 from __future__ import annotations
+import bisect
+import threading
 import uuid
-import json
 import time
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
-from dataclasses import dataclass, field
-from typing import Any
+from dataclasses import dataclass, field, asdict, fields as dataclass_fields
+from typing import Any, Callable
 
-from backend.config import DATA_DIR, SESSION_TIMEOUT_MINUTES
+from backend.config import SESSION_TIMEOUT_MINUTES, CLAIM_CHANGELOG_SIZE, AUDIT_SESSION_RING
 from backend.models import AuditEntry, FNOLExtraction, ClaimStatus
-
-
-def _load_json(filename: str) -> dict:
-    path = DATA_DIR / filename
-    with open(path) as f:
-        return json.load(f)
-
-
-def get_clients_db() -> dict[str, Any]:
-    return _load_json("clients.json")["clients"]
-
-
-def get_policies_db() -> dict[str, Any]:
-    return _load_json("policies.json")["policies"]
-
-
-def get_carriers_db() -> dict[str, Any]:
-    return _load_json("carriers.json")["carriers"]
-
-
-def get_claims_db() -> dict[str, Any]:
-    return _load_json("claims.json")["claims"]
-
-
-# In-memory claims store for new claims created during session
-_active_claims: dict[str, dict] = {}
-
-
-def get_all_claims() -> dict[str, Any]:
-    """Get claims from file + any created during this session."""
-    claims = get_claims_db()
-    claims.update(_active_claims)
-    return claims
-
-
-def add_active_claim(claim_id: str, claim_data: dict) -> None:
-    _active_claims[claim_id] = claim_data
+from backend.agents.context import prefetch_member_context
+from backend.ams.store import get_ams_store
+from backend.state.journal import ClaimJournal
 
 
 @dataclass
@@ -65,6 +33,13 @@ class ClaimRecord:
     followup_email: str = ""
     priority: str = "normal"
     trace_steps: list[dict] = field(default_factory=list)
+    # Catastrophe event cluster (surge mode), when the loss is part of one
+    event_id: str = ""
+    # Intake dedup: the claim this email repeats, and on that claim the emails linked to it
+    duplicate_of: str = ""
+    duplicates: list[dict] = field(default_factory=list)
+    # An earlier claim with the same extracted policy number and date of loss, for the CSR to review
+    possible_duplicate_of: str = ""
     created_at: str = ""
     updated_at: str = ""
 
@@ -83,10 +58,12 @@ class Session:
     current_agent: str = ""
     escalated: bool = False
     fnol_data: dict[str, Any] = field(default_factory=dict)
-    audit_log: list[dict] = field(default_factory=list)
+    # Most recent audit records only; the full log is in the audit sink
+    audit_log: deque[dict] = field(default_factory=lambda: deque(maxlen=AUDIT_SESSION_RING))
     sentiment_history: list[str] = field(default_factory=list)
     rag_history: list[dict] = field(default_factory=list)
     review_queue: list[dict] = field(default_factory=list)
+    member_context: dict[str, Any] = field(default_factory=dict)
 
     @property
     def is_expired(self) -> bool:
@@ -98,9 +75,12 @@ class Session:
         if role == "user":
             self.turn_count += 1
 
-    def add_audit_entry(self, entry: AuditEntry) -> None:
-        self.audit_log.append({
+    def add_audit_entry(self, entry: AuditEntry) -> dict:
+        """Keep the entry in this session's ring; returns the record for the audit sink."""
+        record = {
             "timestamp": entry.timestamp,
+            "session_id": entry.session_id,
+            "member_id": entry.member_id,
             "turn": entry.turn,
             "user_message": entry.user_message,
             "intent": entry.intent,
@@ -110,70 +90,336 @@ class Session:
             "response": entry.response[:200],
             "latency_ms": entry.latency_ms,
             "sentiment": getattr(entry, "sentiment", "neutral"),
-        })
+        }
+        self.audit_log.append(record)
+        return record
 
     def get_conversation_history(self) -> list[dict[str, str]]:
         return list(self.messages)
 
 
+# Summary fields the claims listing can filter on, each backed by an index
+CLAIM_FILTER_FIELDS = ("status", "priority", "loss_type", "carrier")
+
+# Bulky ClaimRecord fields left out of sync snapshots and deltas; a delta only
+# names them under "changed" so a client showing that claim can refetch it
+CLAIM_SYNC_EXCLUDED = ("email_raw", "trace_steps", "carrier_submission", "client_email",
+                       "followup_email", "carrier_data")
+
+
 class ClaimPipeline:
-    """Manages claims being processed through the FNOL pipeline."""
+    """Manages claims being processed through the FNOL pipeline.
+
+    Claims are kept in creation order (a claim's position is its seq) with a
+    cached listing summary per claim and, for each CLAIM_FILTER_FIELDS value,
+    an ascending list of seqs. All changes go through create_claim and
+    update_claim, which keep the summaries and indexes current, so a listing
+    page is built by walking one index backwards from the cursor.
+
+    Every change also bumps a version and appends a field-level delta to a
+    bounded change log, so a dashboard can sync from version N (changes_since)
+    and fall back to a snapshot once N has scrolled out of the log. Versions
+    restart with the process, so they are only comparable within one epoch
+    (a random id per process and per restore); a client from another epoch
+    always gets a snapshot.
+
+    With a journal attached (attach_journal), every create and update is
+    journaled with its absolute field values, so the pipeline survives a
+    restart without reprocessing claims through the model.
+    """
 
     def __init__(self):
         self._claims: dict[str, ClaimRecord] = {}
+        self._lock = threading.Lock()
+        self._order: list[str] = []
+        self._seq: dict[str, int] = {}
+        self._summaries: list[dict] = []
+        self._indexes: dict[str, dict[str, list[int]]] = {f: {} for f in CLAIM_FILTER_FIELDS}
+        self._version = 0
+        self._epoch = uuid.uuid4().hex[:12]
+        self._changes: deque[dict] = deque(maxlen=CLAIM_CHANGELOG_SIZE)
+        self._listeners: list[Callable[[int], None]] = []
+        self._journal: ClaimJournal | None = None
 
     def create_claim(self, email_raw: str = "", email_from: str = "", email_subject: str = "") -> ClaimRecord:
-        claim_id = f"CF-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:4].upper()}"
-        now = datetime.now(timezone.utc).isoformat()
-        record = ClaimRecord(
-            claim_id=claim_id,
-            email_raw=email_raw,
-            email_from=email_from,
-            email_subject=email_subject,
-            created_at=now,
-            updated_at=now,
-        )
-        self._claims[claim_id] = record
+        with self._lock:
+            claim_id = _new_claim_id()
+            while claim_id in self._claims:
+                # 4 hex digits collide after a few hundred claims a day
+                claim_id = _new_claim_id()
+            # Timestamp taken under the lock, so created_at never decreases along _order
+            now = datetime.now(timezone.utc).isoformat()
+            record = ClaimRecord(
+                claim_id=claim_id,
+                email_raw=email_raw,
+                email_from=email_from,
+                email_subject=email_subject,
+                created_at=now,
+                updated_at=now,
+            )
+            seq = len(self._order)
+            self._claims[claim_id] = record
+            self._order.append(claim_id)
+            self._seq[claim_id] = seq
+            summary = _claim_summary(record)
+            self._summaries.append(summary)
+            for f in CLAIM_FILTER_FIELDS:
+                for key in _index_keys(f, summary):
+                    self._indexes[f].setdefault(key, []).append(seq)
+            version = self._log_change({"claim_id": claim_id, "op": "create", "set": _sync_record(record)})
+            if self._journal is not None:
+                self._journal.append("claims", {"op": "create", "record": asdict(record)})
+        self._notify(version)
         return record
 
     def get_claim(self, claim_id: str) -> ClaimRecord | None:
         return self._claims.get(claim_id)
 
-    def list_claims(self) -> list[dict]:
-        return [
-            {
-                "claim_id": c.claim_id,
-                "status": c.status,
-                "email_from": c.email_from,
-                "email_subject": c.email_subject,
-                "priority": c.priority,
-                "loss_type": c.extraction.get("loss_type", ""),
-                "reporter_name": c.extraction.get("reporter_name", ""),
-                "policy_number": c.extraction.get("policy_number", ""),
-                "confidence": c.extraction.get("confidence_score", 0),
-                "created_at": c.created_at,
-            }
-            for c in sorted(self._claims.values(), key=lambda x: x.created_at, reverse=True)
-        ]
+    def records(self) -> list[ClaimRecord]:
+        """Every claim, oldest first."""
+        with self._lock:
+            return [self._claims[cid] for cid in self._order]
+
+    def list_claims(self, status: str | None = None, priority: str | None = None,
+                    loss_type: str | None = None, carrier: str | None = None,
+                    cursor: str | None = None, limit: int | None = None,
+                    fields: list[str] | None = None) -> dict:
+        """Newest-first page of claim summaries.
+
+        Filters match exactly (carrier matches the carrier id or name). cursor is
+        the next_cursor of the previous page; limit None returns every match.
+        fields projects each summary to the listed keys. total is the number of
+        matches when it is known from a single index, else None.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be at least 1")
+        filters = {f: v for f, v in (("status", status), ("priority", priority),
+                                     ("loss_type", loss_type), ("carrier", carrier)) if v}
+        before = int(cursor) if cursor else None
+        with self._lock:
+            if filters:
+                postings = {f: self._indexes[f].get(_norm(v), []) for f, v in filters.items()}
+                driver_field = min(postings, key=lambda f: len(postings[f]))
+                driver = postings[driver_field]
+                others = [(f, _norm(v)) for f, v in filters.items() if f != driver_field]
+                total = len(driver) if not others else None
+            else:
+                driver = range(len(self._order))
+                others = []
+                total = len(driver)
+
+            end = bisect.bisect_left(driver, before) if before is not None else len(driver)
+            page: list[dict] = []
+            next_cursor = None
+            for i in range(end - 1, -1, -1):
+                seq = driver[i]
+                summary = self._summaries[seq]
+                if others and not all(key in _index_keys(f, summary) for f, key in others):
+                    continue
+                if limit is not None and len(page) == limit:
+                    next_cursor = str(page_last)
+                    break
+                page.append(summary if not fields else {k: summary[k] for k in fields if k in summary})
+                page_last = seq
+        return {"claims": page, "next_cursor": next_cursor, "total": total}
+
+    def counts(self, field_name: str) -> dict[str, int]:
+        """Number of claims per value of an indexed field."""
+        with self._lock:
+            return {k: len(v) for k, v in self._indexes[field_name].items()}
 
     def update_claim(self, claim_id: str, **kwargs) -> ClaimRecord | None:
-        record = self._claims.get(claim_id)
-        if not record:
-            return None
-        for key, value in kwargs.items():
-            if hasattr(record, key):
+        with self._lock:
+            record = self._claims.get(claim_id)
+            if not record:
+                return None
+            delta_set: dict[str, Any] = {}
+            delta_unset: list[str] = []
+            changed: list[str] = []
+            applied: dict[str, Any] = {}
+            for key, value in kwargs.items():
+                if not hasattr(record, key):
+                    continue
+                old = getattr(record, key)
+                if old == value:
+                    continue
                 setattr(record, key, value)
-        record.updated_at = datetime.now(timezone.utc).isoformat()
+                applied[key] = value
+                if key in CLAIM_SYNC_EXCLUDED:
+                    changed.append(key)
+                elif isinstance(old, dict) and isinstance(value, dict):
+                    delta_set.update({f"{key}.{k}": v for k, v in value.items() if k not in old or old[k] != v})
+                    delta_unset.extend(f"{key}.{k}" for k in old if k not in value)
+                else:
+                    delta_set[key] = value
+            record.updated_at = datetime.now(timezone.utc).isoformat()
+            version = None
+            if delta_set or delta_unset or changed:
+                delta_set["updated_at"] = record.updated_at
+                change = {"claim_id": claim_id, "op": "update", "set": delta_set}
+                if delta_unset:
+                    change["unset"] = delta_unset
+                if changed:
+                    change["changed"] = changed
+                version = self._log_change(change)
+                if self._journal is not None:
+                    self._journal.append("claims", {"op": "update", "claim_id": claim_id,
+                                                    "fields": {**applied, "updated_at": record.updated_at}})
+
+            seq = self._seq[claim_id]
+            old, new = self._summaries[seq], _claim_summary(record)
+            self._summaries[seq] = new
+            for f in CLAIM_FILTER_FIELDS:
+                old_keys, new_keys = _index_keys(f, old), _index_keys(f, new)
+                for key in old_keys - new_keys:
+                    postings = self._indexes[f][key]
+                    del postings[bisect.bisect_left(postings, seq)]
+                    if not postings:
+                        del self._indexes[f][key]
+                for key in new_keys - old_keys:
+                    bisect.insort(self._indexes[f].setdefault(key, []), seq)
+        if version is not None:
+            self._notify(version)
         return record
 
+    # ── Journal ──────────────────────────────────────────────────────
+
+    def attach_journal(self, journal: ClaimJournal) -> None:
+        """Journal every change from now on; journal.open() restores the saved claims first."""
+        journal.register("claims", self._journal_state, self._restore)
+        self._journal = journal
+
+    def _journal_state(self) -> list[dict]:
+        with self._lock:
+            return [asdict(self._claims[cid]) for cid in self._order]
+
+    def _restore(self, state: list[dict] | None, events: list[dict]) -> None:
+        records: dict[str, ClaimRecord] = {r["claim_id"]: _claim_record(r) for r in state or ()}
+        for event in events:
+            if event["op"] == "create":
+                records[event["record"]["claim_id"]] = _claim_record(event["record"])
+            elif event["op"] == "update" and event["claim_id"] in records:
+                record = records[event["claim_id"]]
+                for key, value in event["fields"].items():
+                    if key in _CLAIM_FIELDS:
+                        setattr(record, key, value)
+        with self._lock:
+            # Versions handed out before the restore describe other state
+            self._epoch = uuid.uuid4().hex[:12]
+            self._changes.clear()
+            self._claims.clear()
+            self._order.clear()
+            self._seq.clear()
+            self._summaries.clear()
+            self._indexes = {f: {} for f in CLAIM_FILTER_FIELDS}
+            for seq, record in enumerate(records.values()):
+                self._claims[record.claim_id] = record
+                self._order.append(record.claim_id)
+                self._seq[record.claim_id] = seq
+                summary = _claim_summary(record)
+                self._summaries.append(summary)
+                for f in CLAIM_FILTER_FIELDS:
+                    for key in _index_keys(f, summary):
+                        self._indexes[f].setdefault(key, []).append(seq)
+
+    # ── Change feed ──────────────────────────────────────────────────
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def epoch(self) -> str:
+        return self._epoch
+
+    def on_change(self, fn: Callable[[int], None]) -> None:
+        """Call fn(version) after every change (from the thread that made it, outside the lock)."""
+        self._listeners.append(fn)
+
+    def changes_since(self, version: int, epoch: str) -> tuple[list[dict] | None, int]:
+        """(deltas after version, current version). Deltas is None when version is from
+        another epoch or no longer covered by the change log (or is ahead of it); take a
+        snapshot instead."""
+        with self._lock:
+            current = self._version
+            if epoch != self._epoch:
+                return None, current
+            if version == current:
+                return [], current
+            oldest = self._changes[0]["v"] if self._changes else current + 1
+            if version > current or version < oldest - 1:
+                return None, current
+            return [c for c in self._changes if c["v"] > version], current
+
+    def snapshot(self) -> tuple[str, int, list[dict]]:
+        """(epoch, version, every claim in sync form, newest first)."""
+        with self._lock:
+            return self._epoch, self._version, [_sync_record(self._claims[cid]) for cid in reversed(self._order)]
+
+    def _log_change(self, change: dict) -> int:
+        # Caller holds the lock
+        self._version += 1
+        change["v"] = self._version
+        self._changes.append(change)
+        return self._version
+
+    def _notify(self, version: int) -> None:
+        for fn in self._listeners:
+            fn(version)
+
+
+_CLAIM_FIELDS = frozenset(f.name for f in dataclass_fields(ClaimRecord))
+
+
+def _claim_record(data: dict) -> ClaimRecord:
+    """ClaimRecord from journaled fields; fields from a newer build are ignored."""
+    return ClaimRecord(**{k: v for k, v in data.items() if k in _CLAIM_FIELDS})
+
+
+def _sync_record(c: ClaimRecord) -> dict:
+    return {f.name: getattr(c, f.name) for f in dataclass_fields(c) if f.name not in CLAIM_SYNC_EXCLUDED}
+
+
+def _new_claim_id() -> str:
+    return f"CF-{datetime.now().strftime('%Y%m%d')}-{uuid.uuid4().hex[:4].upper()}"
+
+
+def _claim_summary(c: ClaimRecord) -> dict:
+    return {
+        "claim_id": c.claim_id,
+        "status": c.status,
+        "email_from": c.email_from,
+        "email_subject": c.email_subject,
+        "priority": c.priority,
+        "loss_type": c.extraction.get("loss_type", ""),
+        "reporter_name": c.extraction.get("reporter_name", ""),
+        "policy_number": c.extraction.get("policy_number", ""),
+        "confidence": c.extraction.get("confidence_score", 0),
+        "carrier": c.policy_data.get("carrier", ""),
+        "carrier_id": c.policy_data.get("carrier_id", ""),
+        "duplicate_of": c.duplicate_of,
+        "created_at": c.created_at,
+    }
+
+
+def _norm(value: str) -> str:
+    return str(value).strip().lower()
+
+
+def _index_keys(field_name: str, summary: dict) -> set[str]:
+    if field_name == "carrier":
+        return {_norm(v) for v in (summary["carrier_id"], summary["carrier"]) if v}
+    value = summary[field_name]
+    return {_norm(value)} if value else set()
+
 
 class SessionManager:
     def __init__(self):
         self._sessions: dict[str, Session] = {}
 
     def create_session(self, client_id: str) -> Session:
-        clients = get_clients_db()
-        if client_id not in clients:
+        client = get_ams_store().get_client(client_id)
+        if client is None:
             raise ValueError(f"Unknown client: {client_id}")
 
         session_id = f"sess_{uuid.uuid4().hex[:12]}"
@@ -181,9 +427,10 @@ class SessionManager:
         session = Session(
             session_id=session_id,
             member_id=client_id,
-            member_data=clients[client_id],
+            member_data=client,
             created_at=now,
             last_active=now,
+            member_context=prefetch_member_context(client_id),
         )
         self._sessions[session_id] = session
         return session
@@ -209,15 +456,14 @@ class SessionManager:
         ]
 
     def get_clients(self) -> list[dict[str, Any]]:
-        clients = get_clients_db()
         return [
             {
-                "id": c.get("id", cid),
+                "id": c["id"],
                 "name": c["name"],
                 "type": c.get("type", "personal"),
                 "email": c.get("email", ""),
                 "phone": c.get("phone", ""),
                 "agent": c.get("agent", ""),
             }
-            for cid, c in clients.items()
+            for c in get_ams_store().list_clients()
         ]
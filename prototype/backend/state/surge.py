@@ -0,0 +1,211 @@
+"""Catastrophe surge mode: cluster same-event claims and share their processing.
+
+A hail storm brings dozens of near-identical FNOL emails within hours. Each
+email is still parsed on its own, but once its extraction and policy are
+known the claim joins an event cluster keyed by
+
+    (date of loss, peril group, region)
+
+The peril group comes from the extraction (hail, wind, tornado and storms
+are one "wind_hail" event; flood; wildfire), since the parser's loss types
+name the line of business rather than the cause. The region is the insured
+location's ZIP3 (property address, else client address), falling back to
+the reported city when the policy is unknown. Other losses are not clustered.
+
+A cluster surges once it holds SURGE_MIN_CLAIMS claims (SURGE_MODE=on: from
+the first). Claims in a surging cluster share, per cluster:
+
+- carrier requirements, resolved once per carrier;
+- knowledge-base procedure chunks for the peril (the CAT protocol in
+  emergency_procedures.md), searched once;
+- carrier submission and client email templates, generated by one model
+  call each per carrier and filled in per claim.
+
+Concurrent claims needing the same shared item await a single task. All
+methods run on the event loop. Clusters idle for SURGE_WINDOW_MINUTES are
+dropped. Throughput is intakes completed in the last minute, overall and per
+cluster.
+"""
+from __future__ import annotations
+import asyncio
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from backend.config import SURGE_MODE, SURGE_MIN_CLAIMS, SURGE_WINDOW_MINUTES
+from backend.ams.exposure import parse_location
+from backend.observability.tracing import in_executor
+from backend.rag.retriever import retriever
+
+PERIL_GROUPS = {
+    "wind_hail": {"hail", "hailstorm", "hailstones", "wind", "winds", "windstorm", "tornado", "storm", "storms",
+                  "thunderstorm", "derecho"},
+    "flood": {"flood", "flooding", "flooded", "floodwater"},
+    "wildfire": {"wildfire", "grassfire", "brushfire"},
+}
+# Knowledge-base query per peril group for the shared procedure chunks
+PROCEDURE_QUERIES = {
+    "wind_hail": "catastrophic loss protocol CAT event hail storm tornado roof damage",
+    "flood": "catastrophic loss protocol CAT event flood NFIP",
+    "wildfire": "catastrophic loss protocol CAT event fire",
+}
+_WORD = re.compile(r"[a-z]+")
+
+
+def event_peril(extraction: dict) -> str | None:
+    words = set(_WORD.findall(f"{extraction.get('description') or ''} {extraction.get('loss_type') or ''}".lower()))
+    for group, terms in PERIL_GROUPS.items():
+        if words & terms:
+            return group
+    return None
+
+
+def event_region(extraction: dict, policy_data: dict) -> str | None:
+    address = (policy_data.get("property") or {}).get("address") or policy_data.get("client_address") or ""
+    city, state, zip_code = parse_location(address)
+    if zip_code:
+        return f"{state}-{zip_code // 100:03d}"
+    # No insured location: the reported city ("..., Grand Island" or "Grand Island, NE")
+    location = extraction.get("location") or ""
+    city = parse_location(location)[0] or location.rsplit(",", 1)[-1]
+    return " ".join(_WORD.findall(city.lower())) or None
+
+
+def event_procedures(peril: str) -> list[dict]:
+    """Knowledge-base chunks on handling this kind of event."""
+    return retriever.search(PROCEDURE_QUERIES.get(peril, "catastrophic loss protocol CAT event"))
+
+
+@dataclass
+class EventCluster:
+    event_id: str
+    date_of_loss: str
+    peril: str
+    region: str
+    first_seen: float
+    last_seen: float
+    claim_ids: list[str] = field(default_factory=list)
+    completed: deque[float] = field(default_factory=deque)
+    shared: dict[tuple, asyncio.Future] = field(default_factory=dict)
+    shared_hits: int = 0
+    shared_misses: int = 0
+
+    def summary(self) -> dict[str, Any]:
+        return {"event_id": self.event_id, "date_of_loss": self.date_of_loss, "peril": self.peril,
+                "region": self.region, "claims": len(self.claim_ids)}
+
+
+class SurgeCoordinator:
+    def __init__(self, mode: str = "auto", min_claims: int = 3, window_minutes: int = 720):
+        self.mode = mode
+        self.min_claims = min_claims
+        self.window_s = window_minutes * 60
+        self._events: dict[str, EventCluster] = {}
+        self._by_claim: dict[str, str] = {}
+        self._completed: deque[float] = deque()
+        self.stats = {"clustered": 0, "shared_hits": 0, "shared_misses": 0}
+
+    def assign(self, claim_id: str, extraction: dict, policy_data: dict) -> EventCluster | None:
+        """Add a parsed claim to its event cluster; None for non-catastrophe losses or mode off."""
+        if self.mode == "off":
+            return None
+        date_of_loss = (extraction.get("date_of_loss") or "").strip()
+        peril = event_peril(extraction)
+        region = event_region(extraction, policy_data) if peril else None
+        if not (date_of_loss and peril and region):
+            return None
+
+        now = time.time()
+        self._prune(now)
+        event_id = f"EVT-{date_of_loss}-{peril}-{region}".replace(" ", "_")
+        cluster = self._events.get(event_id)
+        if cluster is None:
+            cluster = self._events[event_id] = EventCluster(event_id, date_of_loss, peril, region, now, now)
+        if claim_id not in self._by_claim:
+            cluster.claim_ids.append(claim_id)
+            self._by_claim[claim_id] = event_id
+            self.stats["clustered"] += 1
+        cluster.last_seen = now
+        return cluster
+
+    def cluster_for(self, claim_id: str) -> EventCluster | None:
+        event_id = self._by_claim.get(claim_id)
+        return self._events.get(event_id) if event_id else None
+
+    def in_surge(self, cluster: EventCluster | None) -> bool:
+        if cluster is None or self.mode == "off":
+            return False
+        return self.mode == "on" or len(cluster.claim_ids) >= self.min_claims
+
+    async def run(self, cluster: EventCluster | None, key: tuple, fn: Callable, *args) -> Any:
+        """fn(*args) on an executor thread; for a surging cluster, once per key and shared by its claims.
+        Results carrying an "error" key are not kept, so the next claim retries."""
+        if not self.in_surge(cluster):
+            return await in_executor(fn, *args)
+        future = cluster.shared.get(key)
+        if future is None:
+            future = cluster.shared[key] = asyncio.ensure_future(in_executor(fn, *args))
+            cluster.shared_misses += 1
+            self.stats["shared_misses"] += 1
+        else:
+            cluster.shared_hits += 1
+            self.stats["shared_hits"] += 1
+        try:
+            result = await asyncio.shield(future)
+        except Exception:
+            if cluster.shared.get(key) is future:
+                del cluster.shared[key]
+            raise
+        if isinstance(result, dict) and "error" in result and cluster.shared.get(key) is future:
+            del cluster.shared[key]
+        return result
+
+    def complete(self, cluster: EventCluster | None) -> None:
+        """Count a finished intake toward throughput."""
+        now = time.time()
+        self._completed.append(now)
+        if cluster is not None:
+            cluster.completed.append(now)
+        self.claims_per_minute()
+
+    def claims_per_minute(self, cluster: EventCluster | None = None) -> int:
+        times = cluster.completed if cluster is not None else self._completed
+        cutoff = time.time() - 60
+        while times and times[0] < cutoff:
+            times.popleft()
+        return len(times)
+
+    def snapshot(self) -> dict:
+        self._prune(time.time())
+        events = sorted(self._events.values(), key=lambda c: (-len(c.claim_ids), c.event_id))
+        return {
+            "mode": self.mode,
+            "min_claims": self.min_claims,
+            "claims_per_minute": self.claims_per_minute(),
+            "active_events": sum(1 for c in events if self.in_surge(c)),
+            "events": [{
+                **c.summary(),
+                "surge": self.in_surge(c),
+                "claims_per_minute": self.claims_per_minute(c),
+                "first_seen": _iso(c.first_seen),
+                "last_seen": _iso(c.last_seen),
+                "shared": {"hits": c.shared_hits, "misses": c.shared_misses,
+                           "resolved": sorted("/".join(map(str, k)) for k, f in c.shared.items() if f.done())},
+            } for c in events],
+        }
+
+    def _prune(self, now: float) -> None:
+        for event_id in [e for e, c in self._events.items() if now - c.last_seen > self.window_s]:
+            for claim_id in self._events.pop(event_id).claim_ids:
+                self._by_claim.pop(claim_id, None)
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+# Singleton
+surge = SurgeCoordinator(SURGE_MODE, SURGE_MIN_CLAIMS, SURGE_WINDOW_MINUTES)
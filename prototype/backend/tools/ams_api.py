@@ -1,98 +1,155 @@
 """Mock Agency Management System (AMS) API — policy and client lookup tools."""
 from __future__ import annotations
-import json
-from pathlib import Path
+import threading
+from functools import lru_cache
 
-from backend.config import DATA_DIR
+from backend.ams.store import get_ams_store
+from backend.tools.policy_index import PolicyIndex
+from backend.tools.client_index import ClientIndex
 
-# Load data at module level
-_clients_path = DATA_DIR / "clients.json"
-_policies_path = DATA_DIR / "policies.json"
+_policy_index: PolicyIndex | None = None
+_policy_index_generation = -1
+_policy_index_lock = threading.Lock()
 
-def _load_clients():
-    with open(_clients_path) as f:
-        return json.load(f)["clients"]
 
-def _load_policies():
-    with open(_policies_path) as f:
-        return json.load(f)["policies"]
+def get_policy_index() -> PolicyIndex:
+    """Policy-number index, rebuilt when the AMS data is reloaded."""
+    global _policy_index, _policy_index_generation
+    store = get_ams_store()
+    if _policy_index is None or store.generation != _policy_index_generation:
+        with _policy_index_lock:
+            if _policy_index is None or store.generation != _policy_index_generation:
+                generation = store.generation
+                _policy_index = PolicyIndex(dict(store.policy_numbers()))
+                _policy_index_generation = generation
+    return _policy_index
 
 
 def lookup_policy(policy_number: str) -> dict:
-    """Look up a policy by policy number. Returns full policy details."""
-    policies = _load_policies()
-    clients = _load_clients()
-
-    # Search by policy_number field or by ID
-    for pol_id, pol in policies.items():
-        if pol.get("policy_number", "").lower() == policy_number.lower() or pol_id.lower() == policy_number.lower():
-            # Attach client info
-            client_id = pol.get("client_id", "")
-            client = clients.get(client_id, {})
-            return {
-                **pol,
-                "client_name": client.get("name", "Unknown"),
-                "client_email": client.get("email", ""),
-                "client_phone": client.get("phone", ""),
-                "client_address": client.get("address", ""),
-            }
-
-    return {"error": f"Policy '{policy_number}' not found in our system. Please verify the policy number."}
-
-
-def lookup_client(client_name: str) -> dict:
-    """Look up a client by name (fuzzy match). Returns client details and policies."""
-    clients = _load_clients()
-    policies = _load_policies()
-
-    search = client_name.lower()
-    matches = []
-
-    for client_id, client in clients.items():
-        name = client.get("name", "").lower()
-        contact = client.get("contact_person", "").lower()
-        if search in name or search in contact or any(word in name for word in search.split()):
-            # Get their policies
-            client_policies = []
-            for pol_id in client.get("policies", []):
-                pol = policies.get(pol_id, {})
-                if pol:
-                    client_policies.append({
-                        "id": pol_id,
-                        "type": pol.get("type", ""),
-                        "carrier": pol.get("carrier", ""),
-                        "policy_number": pol.get("policy_number", ""),
-                        "status": pol.get("status", ""),
-                        "effective_date": pol.get("effective_date", ""),
-                        "expiration_date": pol.get("expiration_date", ""),
-                    })
-
-            matches.append({
-                **client,
-                "active_policies": client_policies,
-            })
-
-    if not matches:
+    """Look up a policy by policy number. Returns full policy details.
+
+    Falls back to the fuzzy index when there is no exact match: a number that
+    differs only in formatting or OCR look-alikes (missing dashes, l for 1)
+    resolves to its policy with a ``policy_match`` note; anything else returns
+    the error with ranked ``candidates`` so the caller can pick one directly.
+    """
+    store = get_ams_store()
+    pol = store.find_policy(policy_number.strip())
+    match = None
+    if pol is None:
+        not_found = {"error": f"Policy '{policy_number}' not found in our system. Please verify the policy number."}
+        candidates = get_policy_index().search(policy_number)
+        unambiguous = [c for c in candidates if c.ocr_distance == 0]
+        if len(unambiguous) != 1:
+            if candidates:
+                not_found["candidates"] = [c.to_dict() for c in candidates]
+            return not_found
+        match = unambiguous[0]
+        pol = store.get_policy(match.policy_id)
+        if pol is None:
+            # Removed by a reload the index was built before
+            return not_found
+
+    # Attach client info
+    client = store.get_client(pol.get("client_id", "")) or {}
+    result = {
+        **pol,
+        "client_name": client.get("name", "Unknown"),
+        "client_email": client.get("email", ""),
+        "client_phone": client.get("phone", ""),
+        "client_address": client.get("address", ""),
+    }
+    if match is not None:
+        result["policy_match"] = {"requested": policy_number, **match.to_dict()}
+    return result
+
+
+_client_index: ClientIndex | None = None
+_client_index_generation = -1
+_client_index_lock = threading.Lock()
+
+
+def get_client_index() -> ClientIndex:
+    """Client name index, rebuilt when the AMS data is reloaded."""
+    global _client_index, _client_index_generation
+    store = get_ams_store()
+    if _client_index is None or store.generation != _client_index_generation:
+        with _client_index_lock:
+            if _client_index is None or store.generation != _client_index_generation:
+                generation = store.generation
+                _client_index = ClientIndex(store.client_names())
+                _client_index_generation = generation
+    return _client_index
+
+
+@lru_cache(maxsize=4096)
+def _client_record(client_id: str, generation: int) -> dict | None:
+    """Client with policy summaries; cached per data generation (callers copy before returning it)."""
+    store = get_ams_store()
+    client = store.get_client(client_id)
+    if client is None:
+        return None
+    return _client_with_policies(client, store.get_policies(client.get("policies", [])))
+
+
+def lookup_client(client_name: str, limit: int = 5) -> dict:
+    """Look up a client by name (fuzzy match). Returns client details and policies.
+
+    Matches are ranked by trigram similarity on the client name and contact
+    person; a single match, or a sole exact one, is returned directly.
+    """
+    generation = get_ams_store().generation
+    results = [(_client_record(cid, generation), score) for cid, score in get_client_index().search(client_name, limit)]
+    if not results:
         return {"error": f"No client found matching '{client_name}'"}
 
-    if len(matches) == 1:
-        return matches[0]
+    exact = [record for record, score in results if score == 1.0]
+    if len(results) == 1 or len(exact) == 1:
+        return {**(exact[0] if exact else results[0][0])}
+
+    return {"matches": [{**record, "match_score": score} for record, score in results],
+            "message": f"Found {len(results)} clients matching '{client_name}'"}
+
+
+def get_client(client_id: str) -> dict:
+    """Get a client by ID with their policy summaries (same shape as a single lookup_client match)."""
+    record = _client_record(client_id, get_ams_store().generation)
+    if record is None:
+        return {"error": f"Client '{client_id}' not found"}
+    return {**record}
+
+
+def _client_with_policies(client: dict, policies: dict) -> dict:
+    client_policies = []
+    for pol_id in client.get("policies", []):
+        pol = policies.get(pol_id, {})
+        if pol:
+            client_policies.append({
+                "id": pol_id,
+                "type": pol.get("type", ""),
+                "carrier": pol.get("carrier", ""),
+                "policy_number": pol.get("policy_number", ""),
+                "status": pol.get("status", ""),
+                "effective_date": pol.get("effective_date", ""),
+                "expiration_date": pol.get("expiration_date", ""),
+            })
 
-    return {"matches": matches, "message": f"Found {len(matches)} clients matching '{client_name}'"}
+    return {
+        **client,
+        "active_policies": client_policies,
+    }
 
 
 def verify_coverage(policy_id: str, date_of_loss: str, loss_type: str) -> dict:
     """Verify that a loss type is potentially covered under a policy as of a date."""
-    policies = _load_policies()
+    store = get_ams_store()
 
-    policy = policies.get(policy_id)
+    policy = store.get_policy(policy_id)
     if not policy:
         # Try by policy_number
-        for pid, pol in policies.items():
-            if pol.get("policy_number", "") == policy_id:
-                policy = pol
-                policy_id = pid
-                break
+        policy = store.get_policy_by_number(policy_id)
+        if policy:
+            policy_id = policy["id"]
 
     if not policy:
         return {"error": f"Policy '{policy_id}' not found"}
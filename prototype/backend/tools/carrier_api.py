@@ -1,28 +1,17 @@
 """Mock carrier API — carrier requirements and submission handling."""
 from __future__ import annotations
-import json
-from pathlib import Path
 
-from backend.config import DATA_DIR
-
-_carriers_path = DATA_DIR / "carriers.json"
-
-def _load_carriers():
-    with open(_carriers_path) as f:
-        return json.load(f)["carriers"]
+from backend.ams.store import get_ams_store
 
 
 def get_carrier_requirements(carrier_id: str) -> dict:
     """Get the FNOL requirements for a specific carrier."""
-    carriers = _load_carriers()
+    store = get_ams_store()
 
-    carrier = carriers.get(carrier_id)
+    carrier = store.get_carrier(carrier_id)
     if not carrier:
         # Try by name
-        for cid, c in carriers.items():
-            if carrier_id.lower() in c.get("name", "").lower():
-                carrier = c
-                break
+        carrier = store.find_carrier(carrier_id)
 
     if not carrier:
         return {
@@ -1,44 +1,40 @@
 """Mock claims API tools for ClaimFlow AI."""
 from __future__ import annotations
 import uuid
-import json
 from datetime import datetime, timezone
-from pathlib import Path
 
-from backend.config import DATA_DIR
+from backend.ams.store import get_ams_store
+from backend.state.journal import claim_journal
 
-_claims_path = DATA_DIR / "claims.json"
+# Claims created through create_claim_record, journaled so they survive a restart
+# (and a re-import of the AMS data)
+_created: dict[str, dict] = {}
 
-# Load initial claims data
-def _load_claims():
-    with open(_claims_path) as f:
-        return json.load(f)["claims"]
 
-# In-memory claims store (loaded from file + any new claims added during session)
-_claims_db: dict | None = None
+def _restore_created(state: dict | None, events: list[dict]) -> None:
+    _created.update(state or {})
+    for event in events:
+        _created[event["record"]["id"]] = event["record"]
+    store = get_ams_store()
+    for claim in _created.values():
+        store.add_claim(claim)
 
-def _get_claims_db():
-    global _claims_db
-    if _claims_db is None:
-        _claims_db = _load_claims()
-    return _claims_db
+
+claim_journal.register("ams_claims", lambda: dict(_created), _restore_created)
 
 
 def get_claim_status(client_id: str, claim_id: str | None = None) -> dict:
     """Retrieve claim status for a client."""
-    claims = _get_claims_db()
+    store = get_ams_store()
 
     if claim_id:
-        claim = claims.get(claim_id)
+        claim = store.get_claim(claim_id)
         if not claim:
             return {"error": f"Claim {claim_id} not found"}
         return _format_claim(claim)
 
     # Return all claims for this client
-    client_claims = [
-        _format_claim(c) for c in claims.values()
-        if c.get("client_id") == client_id
-    ]
+    client_claims = [_format_claim(c) for c in store.claims_for_client(client_id)]
 
     if not client_claims:
         return {
@@ -92,8 +88,6 @@ def create_claim_record(
     priority: str = "normal",
 ) -> dict:
     """Create a new claim record in the mock AMS."""
-    claims = _get_claims_db()
-
     claim_id = f"CLM-{datetime.now().year}-{uuid.uuid4().hex[:4].upper()}"
 
     new_claim = {
@@ -122,7 +116,9 @@ def create_claim_record(
         ],
     }
 
-    claims[claim_id] = new_claim
+    get_ams_store().add_claim(new_claim)
+    _created[claim_id] = new_claim
+    claim_journal.append("ams_claims", {"op": "create", "record": new_claim})
 
     return {
         "claim_id": claim_id,
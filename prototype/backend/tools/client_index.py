@@ -0,0 +1,105 @@
+"""Trigram index over client names and contact persons for lookup_client.
+
+Each client's name and contact person are normalized (lowercase, letters and
+digits, single spaces) and split into padded character trigrams, so partial
+names, word order and small misspellings still overlap. The postings map a
+trigram to a numpy array of the clients containing it; a query counts
+overlaps over the postings of its own trigrams only (one bincount), then
+ranks the candidates sharing enough trigrams by
+
+    score = 0.7 * containment + 0.3 * dice
+
+where containment is the share of the query's trigrams the field contains
+(a first name alone still scores high against a full name) and dice is the
+symmetric overlap (closer-length names win ties). The better of name and
+contact person counts.
+
+The index holds only ids and names; the caller loads the records for the
+clients a search returns.
+"""
+from __future__ import annotations
+import re
+from typing import Iterable
+
+import numpy as np
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+# Minimum containment for a candidate to be returned at all
+MIN_CONTAINMENT = 0.6
+# Candidates scored exactly per result requested
+CANDIDATE_FACTOR = 20
+
+
+def normalize_name(value: str) -> str:
+    return _NON_ALNUM.sub(" ", value.lower()).strip()
+
+
+def trigrams(value: str) -> set[str]:
+    text = normalize_name(value)
+    if not text:
+        return set()
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class ClientIndex:
+    def __init__(self, clients: Iterable[tuple[str, str, str]]):
+        """clients: (client id, name, contact person) for every AMS client."""
+        self._ids: list[str] = []
+        self._fields: list[list[tuple[str, set[str]]]] = []
+        postings: dict[str, list[int]] = {}
+        for row, (client_id, name, contact) in enumerate(clients):
+            self._ids.append(client_id)
+            fields = []
+            for value in (name or "", contact or ""):
+                grams = trigrams(value)
+                if grams:
+                    fields.append((normalize_name(value), grams))
+                    for gram in grams:
+                        rows = postings.setdefault(gram, [])
+                        if not rows or rows[-1] != row:
+                            rows.append(row)
+            self._fields.append(fields)
+        self._postings = {gram: np.asarray(rows, dtype=np.int32) for gram, rows in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def search(self, query: str, limit: int = 5) -> list[tuple[str, float]]:
+        """(client id, score) pairs, best first; score 1.0 is an exact name or contact match."""
+        q_norm = normalize_name(query)
+        q_grams = trigrams(query)
+        if not q_grams:
+            return []
+        lists = [self._postings[g] for g in q_grams if g in self._postings]
+        if not lists:
+            return []
+        hits = np.bincount(np.concatenate(lists), minlength=len(self._ids))
+        # A field can only reach MIN_CONTAINMENT if the client shares enough trigrams overall
+        candidates = np.flatnonzero(hits >= MIN_CONTAINMENT * len(q_grams))
+        if len(candidates) > limit * CANDIDATE_FACTOR:
+            # Common first names match thousands of clients; score only the strongest overlaps
+            top = np.argpartition(hits[candidates], -limit * CANDIDATE_FACTOR)[-limit * CANDIDATE_FACTOR:]
+            candidates = candidates[top]
+
+        scored = []
+        for row in candidates.tolist():
+            best = 0.0
+            for text, grams in self._fields[row]:
+                if text == q_norm:
+                    best = 1.0
+                    break
+                overlap = len(q_grams & grams)
+                containment = overlap / len(q_grams)
+                if containment < MIN_CONTAINMENT:
+                    continue
+                dice = 2 * overlap / (len(q_grams) + len(grams))
+                best = max(best, min(0.99, 0.7 * containment + 0.3 * dice))
+            if best:
+                scored.append((best, row))
+        scored.sort(key=lambda s: (-s[0], self._ids[s[1]]))
+        return [(self._ids[row], round(score, 3)) for score, row in scored[:limit]]
@@ -2,12 +2,11 @@
 from __future__ import annotations
 import time
 import logging
-import anthropic
 
 from backend.config import SPECIALIST_MODEL, MAX_TOKENS
+from backend.llm.client import client
 
 logger = logging.getLogger(__name__)
-client = anthropic.Anthropic()
 
 
 def generate_carrier_submission(fnol_data: dict, policy_data: dict, carrier_data: dict) -> dict:
@@ -149,6 +148,143 @@ Output ONLY the email text, no commentary."""
         return {"error": str(e), "email_text": "Email generation failed."}
 
 
+# Per-claim placeholders in catastrophe event templates
+CLAIM_DETAILS, CLIENT_NAME, CLAIM_ID = "{{claim_details}}", "{{client_name}}", "{{claim_id}}"
+
+_EVENT_EMAIL_FALLBACK = """Dear {{client_name}},
+
+We're sorry about the damage from the {peril} event on {date_of_loss}. Your claim has been filed with {carrier} under reference {{claim_id}}.
+
+Because of the number of claims from this storm, the carrier's adjusters may take longer than the usual {hours} hours to reach you. In the meantime:
+- Photograph all damage before any cleanup or repairs
+- Make temporary repairs to prevent further damage (tarp roofs, board windows) and keep the receipts
+- Get repair estimates, and do not dispose of damaged property until the adjuster has seen it
+- Be cautious of contractors going door to door after the storm
+
+Prairie Shield Insurance Group
+(402) 555-0100 | claims@prairieshield.com
+
+The Claims Team at Prairie Shield Insurance Group"""
+
+
+def generate_event_submission_template(event: dict, carrier_data: dict, procedures: list[dict]) -> dict:
+    """One carrier submission template for every claim from a catastrophe event.
+    Each claim's details are filled in where {{claim_details}} appears."""
+    start = time.time()
+
+    prompt = f"""Generate a carrier FNOL submission template for claims from one catastrophe event.
+Several insureds were hit by the same event; this template will be reused for each of their claims.
+
+EVENT: {event.get('peril', '')} on {event.get('date_of_loss', '')}, region {event.get('region', '')}
+CARRIER: {carrier_data.get('carrier_name', 'Unknown')}
+SUBMISSION FORMAT: {carrier_data.get('submission_format', 'acord_form')}
+REQUIRED FIELDS: {', '.join(carrier_data.get('required_fields', []))}
+
+AGENCY CAT PROCEDURES:
+{_format_procedures(procedures)}
+
+Write the event-level sections once (reporting agency "Prairie Shield Insurance Group", event description,
+CAT handling notes). Put the exact placeholder {CLAIM_DETAILS} on its own line where the individual claim's
+fields belong. Do not invent claim-specific details.
+
+Output ONLY the template text, no commentary."""
+
+    try:
+        response = client.messages.create(
+            model=SPECIALIST_MODEL,
+            max_tokens=MAX_TOKENS,
+            temperature=0.1,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        template = response.content[0].text.strip()
+        if CLAIM_DETAILS not in template:
+            template += f"\n\n{CLAIM_DETAILS}"
+        return {"template": template, "duration_ms": int((time.time() - start) * 1000)}
+    except Exception as e:
+        logger.error(f"Event submission template generation failed: {e}")
+        return {"error": str(e), "template": f"CATASTROPHE EVENT CLAIM — {event.get('event_id', '')}\n"
+                                             f"Reporting agency: Prairie Shield Insurance Group\n\n{CLAIM_DETAILS}"}
+
+
+def generate_event_confirmation_template(event: dict, carrier_data: dict, procedures: list[dict]) -> dict:
+    """One client confirmation email template for every claim from a catastrophe event,
+    with {{client_name}} and {{claim_id}} filled in per claim."""
+    start = time.time()
+    fallback = (_EVENT_EMAIL_FALLBACK
+                .replace("{peril}", event.get("peril", "").replace("_", "/"))
+                .replace("{date_of_loss}", event.get("date_of_loss", ""))
+                .replace("{carrier}", carrier_data.get("carrier_name", "your carrier"))
+                .replace("{hours}", str(carrier_data.get("avg_response_time_hours", 24))))
+
+    prompt = f"""Write a professional, empathetic client confirmation email template for insureds whose claims
+from the same catastrophe event have been filed. It will be sent to each of them.
+
+EVENT: {event.get('peril', '')} on {event.get('date_of_loss', '')}
+CARRIER: {carrier_data.get('carrier_name', 'your carrier')}
+ADJUSTER CONTACT: {carrier_data.get('avg_response_time_hours', 24)} hours typical; longer during catastrophe events
+
+AGENCY CAT PROCEDURES:
+{_format_procedures(procedures)}
+
+Use the exact placeholders {CLIENT_NAME} for the greeting and {CLAIM_ID} for the claim reference number.
+Explain what to expect next and what to do now (document damage with photos, temporary repairs with receipts,
+keep damaged property, beware of storm-chasing contractors). Provide agency contact info:
+Prairie Shield Insurance Group, (402) 555-0100, claims@prairieshield.com
+
+Sign as "The Claims Team at Prairie Shield Insurance Group"
+
+Output ONLY the email text, no commentary."""
+
+    try:
+        response = client.messages.create(
+            model=SPECIALIST_MODEL,
+            max_tokens=MAX_TOKENS,
+            temperature=0.3,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        template = response.content[0].text.strip()
+        if CLIENT_NAME not in template or CLAIM_ID not in template:
+            template = fallback
+        return {"template": template, "duration_ms": int((time.time() - start) * 1000)}
+    except Exception as e:
+        logger.error(f"Event email template generation failed: {e}")
+        return {"error": str(e), "template": fallback}
+
+
+def render_event_submission(template: dict, fnol_data: dict, policy_data: dict, carrier_data: dict,
+                            claim_id: str = "") -> dict:
+    """Fill an event submission template for one claim (same shape as generate_carrier_submission)."""
+    contact = fnol_data.get("reporter_phone") or fnol_data.get("reporter_email")
+    details = [f"CLAIM REFERENCE: {claim_id or 'Pending'}",
+               f"INSURED: {policy_data.get('client_name', fnol_data.get('client_name') or '')}"]
+    for name in carrier_data.get("required_fields", []):
+        value = contact if name == "claimant_contact" else fnol_data.get(name) or policy_data.get(name)
+        details.append(f"{name.replace('_', ' ').upper()}: {value if value else '[NEEDS INFORMATION]'}")
+    details += ["", "CLAIM DATA:", _format_dict(fnol_data)]
+    return {
+        "submission_text": template["template"].replace(CLAIM_DETAILS, "\n".join(details)),
+        "carrier": carrier_data.get("carrier_name", ""),
+        "format": carrier_data.get("submission_format", "acord_form"),
+        "duration_ms": 0,
+    }
+
+
+def render_event_confirmation(template: dict, fnol_data: dict, client_data: dict, claim_id: str = "") -> dict:
+    """Fill an event email template for one claim (same shape as generate_client_confirmation)."""
+    client_name = client_data.get("name", fnol_data.get("reporter_name", "Valued Client"))
+    return {
+        "email_text": template["template"].replace(CLIENT_NAME, client_name).replace(CLAIM_ID, claim_id or "Pending"),
+        "to": client_data.get("email", fnol_data.get("reporter_email", "")),
+        "subject": f"Your Claim Has Been Filed — {claim_id or 'Reference Pending'}",
+        "duration_ms": 0,
+    }
+
+
+def _format_procedures(procedures: list[dict]) -> str:
+    return "\n\n".join(f"[{p.get('source_doc', '')} — {p.get('heading', '')}]\n{p.get('chunk_text', '')}"
+                         for p in procedures) or "(none)"
+
+
 def _format_dict(d: dict, indent: int = 0) -> str:
     """Format a dict for LLM prompting."""
     lines = []
@@ -0,0 +1,150 @@
+"""Typo- and OCR-tolerant index over policy numbers.
+
+Policy numbers copied out of emails arrive without dashes, with swapped
+characters or OCR confusions (``AOPA8847321``, ``AO-PA-884732l``). Keys are
+normalized before indexing and lookup:
+
+1. ``normalize_policy_number`` — uppercase, alphanumerics only.
+2. ``fold_ocr`` — map OCR look-alikes onto one symbol (O→0, I/L→1, S→5,
+   B→8, Z→2), so those confusions cost nothing.
+
+Fuzzy candidates come from a symmetric delete-1 neighborhood: every folded
+key is stored together with each of its single-character deletions, as
+64-bit hashes in one sorted numpy array. A query probes its own neighborhood
+with a vectorized ``searchsorted``, which finds every key within one edit
+(insertion, deletion, substitution or adjacent transposition) and many at
+two, without scanning the portfolio. Candidates are verified and ranked by
+optimal string alignment distance.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+
+import numpy as np
+
+_OCR_FOLD = str.maketrans({"O": "0", "Q": "0", "D": "0", "I": "1", "L": "1", "S": "5", "B": "8", "Z": "2"})
+
+
+def normalize_policy_number(value: str) -> str:
+    return "".join(ch for ch in value.upper() if ch.isalnum())
+
+
+def fold_ocr(key: str) -> str:
+    return key.translate(_OCR_FOLD)
+
+
+def osa_distance(a: str, b: str, max_distance: int | None = None) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent transpositions).
+    Returns max_distance + 1 as soon as the distance is known to exceed max_distance."""
+    if a == b:
+        return 0
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    # Candidates share most of the key; only the differing middle needs the DP
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        distance = len(a) or len(b)
+        return distance if max_distance is None else min(distance, max_distance + 1)
+
+    prev2: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            d = prev[j - 1] + (a[i - 1] != b[j - 1])
+            if prev[j] + 1 < d:
+                d = prev[j] + 1
+            if cur[j - 1] + 1 < d:
+                d = cur[j - 1] + 1
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1] and prev2[j - 2] + 1 < d:
+                d = prev2[j - 2] + 1
+            cur[j] = d
+        if max_distance is not None and min(cur) > max_distance:
+            return max_distance + 1
+        prev2, prev = prev, cur
+    return prev[-1] if max_distance is None else min(prev[-1], max_distance + 1)
+
+
+def _neighborhood(key: str) -> set[str]:
+    return {key} | {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+@dataclass
+class PolicyMatch:
+    policy_id: str
+    policy_number: str
+    distance: int
+    ocr_distance: int
+
+    def to_dict(self) -> dict:
+        return {"policy_id": self.policy_id, "policy_number": self.policy_number,
+                "distance": self.distance, "ocr_distance": self.ocr_distance}
+
+
+class PolicyIndex:
+    """Build once from {policy_id: policy_number}; lookups never scan all policies."""
+
+    def __init__(self, policies: dict[str, str]):
+        self._ids: list[str] = []
+        self._numbers: list[str] = []
+        self._keys: list[str] = []
+        self._folded: list[str] = []
+        self.exact: dict[str, int] = {}
+        self.by_folded: dict[str, list[int]] = {}
+        hashes: list[int] = []
+        rows: list[int] = []
+        for row, (policy_id, number) in enumerate(policies.items()):
+            key = normalize_policy_number(number)
+            folded = fold_ocr(key)
+            self._ids.append(policy_id)
+            self._numbers.append(number)
+            self._keys.append(key)
+            self._folded.append(folded)
+            self.exact[number.lower()] = row
+            self.exact.setdefault(policy_id.lower(), row)
+            self.by_folded.setdefault(folded, []).append(row)
+            for variant in _neighborhood(folded):
+                hashes.append(hash(variant))
+                rows.append(row)
+        order = np.argsort(np.asarray(hashes, dtype=np.int64), kind="stable")
+        self._hashes = np.asarray(hashes, dtype=np.int64)[order]
+        self._rows = np.asarray(rows, dtype=np.int32)[order]
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def get_exact(self, value: str) -> str | None:
+        """Policy id for an exact (case-insensitive) policy number or id."""
+        row = self.exact.get(value.strip().lower())
+        return self._ids[row] if row is not None else None
+
+    def search(self, value: str, limit: int = 5, max_distance: int = 2) -> list[PolicyMatch]:
+        """Ranked candidates: OCR-folded distance first, then distance on the
+        normalized keys. Folded distance 0 means only formatting/OCR noise."""
+        key = normalize_policy_number(value)
+        if not key:
+            return []
+        folded = fold_ocr(key)
+        candidates = set(self.by_folded.get(folded, ()))
+        probes = np.fromiter((hash(v) for v in _neighborhood(folded)), dtype=np.int64)
+        lo = np.searchsorted(self._hashes, probes, side="left")
+        hi = np.searchsorted(self._hashes, probes, side="right")
+        for start, end in zip(lo.tolist(), hi.tolist()):
+            if start != end:
+                candidates.update(self._rows[start:end].tolist())
+
+        matches = []
+        for row in candidates:
+            ocr = osa_distance(folded, self._folded[row], max_distance)
+            if ocr > max_distance:
+                continue
+            matches.append(PolicyMatch(self._ids[row], self._numbers[row],
+                                       osa_distance(key, self._keys[row]), ocr))
+        matches.sort(key=lambda m: (m.ocr_distance, m.distance, m.policy_number))
+        return matches[:limit]
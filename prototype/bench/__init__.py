@@ -0,0 +1 @@
+# ClaimFlow AI — offline benchmarks
@@ -0,0 +1,170 @@
+"""Benchmark: AMS store lookups against book size.
+
+    python -m bench.ams_store
+    python -m bench.ams_store --policies 10000 100000 1000000 --lookups 2000 --json
+
+For each size, generates a synthetic book (two policies per client, one claim
+per ten policies, 25 carriers), imports it into a SQLite store in a temp
+directory, then times a cold open and the lookups the tools make:
+policy by number (lookup_policy), client plus policy summaries (get_client /
+lookup_client), claims for a client (get_claim_status) and carrier by id.
+Up to --json-max policies the same lookups run against the in-memory JSON
+store and against the previous tools' per-call JSON file load.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from backend.ams.store import JsonAMSStore, SQLiteAMSStore
+
+CARRIERS = 25
+_TYPES = ("personal_auto", "homeowners", "commercial_property", "umbrella")
+
+
+def _carrier(i: int) -> dict:
+    return {"id": f"CARRIER-{i:03d}", "name": f"Carrier {i} Mutual", "lines": list(_TYPES[:2 + i % 3]),
+            "fnol_method": "portal", "fnol_phone": "1-800-555-0100", "claims_email": f"claims{i}@example.com",
+            "required_fnol_fields": ["policy_number", "date_of_loss", "location", "description"],
+            "submission_format": "acord_form", "avg_response_time_hours": 24}
+
+
+def _policy(i: int) -> dict:
+    carrier = i % CARRIERS
+    return {"id": f"POL-{i:07d}", "client_id": f"CLT-{i // 2:07d}", "type": _TYPES[i % len(_TYPES)],
+            "carrier": f"Carrier {carrier} Mutual", "carrier_id": f"CARRIER-{carrier:03d}",
+            "policy_number": f"{'HPAC'[i % 4]}{'OMRS'[i // 4 % 4]}-{'PAHOCU'[i % 6]}A-{i + 1000000:07d}",
+            "effective_date": "2025-01-01", "expiration_date": "2026-01-01", "status": "active",
+            "premium_annual": 900 + i % 4000,
+            "coverage": {"deductible": 500 + 500 * (i % 4), "liability": {"per_occurrence": 1000000}}}
+
+
+def _client(i: int) -> dict:
+    return {"id": f"CLT-{i:07d}", "name": f"Member{i % 9973} Family{i // 9973}", "type": "personal",
+            "address": f"{i % 9000 + 100} Main St, Omaha, NE", "phone": "402-555-0100",
+            "email": f"member{i}@example.com", "policies": [f"POL-{2 * i:07d}", f"POL-{2 * i + 1:07d}"],
+            "agent": "Agent Smith", "since": "2019-05-01"}
+
+
+def _claim(i: int) -> dict:
+    return {"id": f"CLM-{i:07d}", "client_id": f"CLT-{i * 5:07d}", "policy_id": f"POL-{i * 10:07d}",
+            "carrier": "Carrier 0 Mutual", "type": "auto_collision", "peril": "collision",
+            "date_of_loss": "2025-06-01", "status": "open", "description": "Rear-ended at a stoplight.",
+            "timeline": [{"date": "2025-06-01", "event": "FNOL submitted"}]}
+
+
+def _percentiles(samples: list[float]) -> dict:
+    samples.sort()
+    return {"p50_us": round(statistics.median(samples), 1),
+            "p99_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 1)}
+
+
+def _time_lookups(store, policies: int, lookups: int) -> dict:
+    rng = random.Random(7)
+    ops = {
+        "policy_by_number": lambda i: store.find_policy(_policy(i)["policy_number"]),
+        "client_with_policies": lambda i: store.get_policies(store.get_client(f"CLT-{i // 2:07d}")["policies"]),
+        "claims_for_client": lambda i: store.claims_for_client(f"CLT-{i // 10 * 5:07d}"),
+        "carrier": lambda i: store.get_carrier(f"CARRIER-{i % CARRIERS:03d}"),
+    }
+    results = {}
+    for name, op in ops.items():
+        samples = []
+        for _ in range(lookups):
+            i = rng.randrange(policies)
+            start = time.perf_counter()
+            assert op(i)
+            samples.append((time.perf_counter() - start) * 1e6)
+        results[name] = _percentiles(samples)
+    return results
+
+
+def _write_json(directory: Path, policies: int) -> None:
+    docs = {
+        "clients": {c["id"]: c for c in map(_client, range(policies // 2))},
+        "policies": {p["id"]: p for p in map(_policy, range(policies))},
+        "carriers": {c["id"]: c for c in map(_carrier, range(CARRIERS))},
+        "claims": {c["id"]: c for c in map(_claim, range(policies // 10))},
+    }
+    for name, records in docs.items():
+        with open(directory / f"{name}.json", "w") as f:
+            json.dump({name: records}, f)
+
+
+def run(sizes: list[int], lookups: int = 2000, json_max: int = 100000) -> dict:
+    report = {"lookups": lookups, "cases": []}
+    for policies in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Path(tmp) / "ams.sqlite3"
+            start = time.perf_counter()
+            SQLiteAMSStore(db).bulk_load(
+                clients=map(_client, range(policies // 2)), policies=map(_policy, range(policies)),
+                carriers=map(_carrier, range(CARRIERS)), claims=map(_claim, range(policies // 10)))
+            import_s = time.perf_counter() - start
+            gc.collect()
+
+            start = time.perf_counter()
+            store = SQLiteAMSStore(db)
+            store.find_policy(_policy(0)["policy_number"])
+            open_ms = (time.perf_counter() - start) * 1000
+            case = {"policies": policies, "backend": "sqlite", "import_s": round(import_s, 2),
+                    "db_mb": round(sum(p.stat().st_size for p in Path(tmp).glob("ams.sqlite3*")) / 1e6, 1),
+                    "open_ms": round(open_ms, 1), **_time_lookups(store, policies, lookups)}
+            report["cases"].append(case)
+            del store
+
+            if policies > json_max:
+                continue
+            _write_json(Path(tmp), policies)
+            gc.collect()
+            start = time.perf_counter()
+            store = JsonAMSStore(tmp)
+            open_ms = (time.perf_counter() - start) * 1000
+            report["cases"].append({"policies": policies, "backend": "json", "open_ms": round(open_ms, 1),
+                                    **_time_lookups(store, policies, lookups)})
+            del store
+            gc.collect()
+            # What each tool call used to cost: re-reading the JSON files it needs
+            samples = []
+            for _ in range(5):
+                start = time.perf_counter()
+                JsonAMSStore(tmp).find_policy(_policy(policies // 3)["policy_number"])
+                samples.append((time.perf_counter() - start) * 1e6)
+            report["cases"].append({"policies": policies, "backend": "json_per_call",
+                                    "policy_by_number": _percentiles(samples)})
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--policies", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--json-max", type=int, default=100000, help="largest book also run on the JSON store")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args()
+
+    report = run(args.policies, args.lookups, args.json_max)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    for c in report["cases"]:
+        head = f"{c['policies']:>8d} policies  {c['backend']:13s}"
+        if c["backend"] == "json_per_call":
+            p = c["policy_by_number"]
+            print(f"{head} policy_by_number p50={p['p50_us'] / 1000:.1f}ms p99={p['p99_us'] / 1000:.1f}ms")
+            continue
+        setup = f"import={c['import_s']}s db={c['db_mb']}MB " if "import_s" in c else ""
+        print(f"{head} {setup}open={c['open_ms']}ms")
+        for op in ("policy_by_number", "client_with_policies", "claims_for_client", "carrier"):
+            print(f"{'':34s}{op:22s} p50={c[op]['p50_us']:>7.1f}us  p99={c[op]['p99_us']:>7.1f}us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
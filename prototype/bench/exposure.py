@@ -0,0 +1,109 @@
+"""Benchmark: catastrophe exposure queries against book size.
+
+    python -m bench.exposure
+    python -m bench.exposure --policies 100000 1000000 --runs 50 --json
+
+Builds an ExposureTable from a synthetic book (homeowners, autos, farm and
+commercial property spread over 40 Nebraska cities and a year of effective
+dates), then times the queries an agency runs after an event: hail in one
+city on a date, wind over a ZIP prefix, collision statewide for one carrier,
+and everything in force on a date.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+from backend.ams.exposure import ExposureTable
+
+CITIES = [(f"City{i}", 68000 + i * 23) for i in range(39)] + [("Grand Island", 68801)]
+_TYPES = ("homeowners", "personal_auto", "personal_auto", "renters", "farm_ranch", "commercial_property",
+          "commercial_auto", "umbrella")
+QUERIES = {
+    "hail_city": {"peril": "hail", "cities": ["Grand Island"]},
+    "wind_zip_prefix": {"peril": "wind", "zips": ["688", "680"]},
+    "collision_carrier": {"peril": "collision", "states": ["NE"], "carriers": ["CARRIER-003"]},
+    "in_force": {},
+}
+
+
+def _policy(i: int, rng: random.Random) -> dict:
+    kind = _TYPES[i % len(_TYPES)]
+    city, zip_code = CITIES[rng.randrange(len(CITIES))]
+    effective = date(2024, 1, 1) + timedelta(days=rng.randrange(365))
+    pol = {"id": f"POL-{i:07d}", "client_id": f"CLT-{i // 2:07d}", "type": kind,
+           "carrier_id": f"CARRIER-{i % 13:03d}", "carrier": f"Carrier {i % 13}",
+           "policy_number": f"NE-{i:08d}", "status": "active" if rng.random() < 0.93 else "cancelled",
+           "effective_date": effective.isoformat(), "expiration_date": (effective + timedelta(days=365)).isoformat()}
+    if kind in ("homeowners", "farm_ranch", "commercial_property", "renters"):
+        dwelling = rng.randrange(150, 600) * 1000
+        pol["property"] = {"address": f"{i % 9000} Main St, {city}, NE {zip_code:05d}"}
+        pol["coverage"] = {"dwelling": dwelling, "other_structures": dwelling // 10, "deductible": 1000,
+                           "wind_hail_deductible": f"{1 + i % 2}_percent"}
+    elif kind in ("personal_auto", "commercial_auto"):
+        pol["vehicles"] = [{"coverage": {"collision": {"deductible": 500}, "comprehensive": {"deductible": 250}}}]
+    else:
+        pol["coverage"] = {"limit": 1000000}
+    return pol
+
+
+def _client_addresses(policies: int, rng: random.Random) -> dict[str, str]:
+    return {f"CLT-{i:07d}": "{0} Oak Ave, {1}, NE {2:05d}".format(i, *CITIES[rng.randrange(len(CITIES))])
+            for i in range((policies + 1) // 2)}
+
+
+def run(sizes: list[int], runs: int = 50) -> dict:
+    report = {"runs": runs, "cases": []}
+    for policies in sizes:
+        rng = random.Random(policies)
+        addresses = _client_addresses(policies, rng)
+        docs = [_policy(i, rng) for i in range(policies)]
+        gc.collect()
+        start = time.perf_counter()
+        table = ExposureTable(docs, addresses)
+        build_s = time.perf_counter() - start
+        del docs, addresses
+        gc.collect()
+        case = {"policies": policies, "build_s": round(build_s, 2), "queries": {}}
+        for name, filters in QUERIES.items():
+            samples, matched = [], 0
+            for r in range(runs):
+                as_of = (date(2024, 6, 1) + timedelta(days=r * 3)).isoformat()
+                start = time.perf_counter()
+                result = table.query(as_of, limit=100, **filters)
+                samples.append((time.perf_counter() - start) * 1000)
+                matched = result["matched"]
+            samples.sort()
+            case["queries"][name] = {"matched": matched, "p50_ms": round(statistics.median(samples), 2),
+                                     "p99_ms": round(samples[min(runs - 1, int(runs * 0.99))], 2)}
+        report["cases"].append(case)
+        del table
+        gc.collect()
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--policies", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args()
+
+    report = run(args.policies, args.runs)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    for c in report["cases"]:
+        print(f"{c['policies']:>8d} policies  build={c['build_s']}s")
+        for name, q in c["queries"].items():
+            print(f"{'':10s}{name:18s} matched={q['matched']:>7d}  p50={q['p50_ms']:>7.2f}ms  p99={q['p99_ms']:>7.2f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
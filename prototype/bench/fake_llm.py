@@ -0,0 +1,161 @@
+"""Synthetic-latency stand-in for the Anthropic API, for load tests.
+
+Installed with ``model_client.use_backend(FakeModel(...))``. Each call sleeps
+for a lognormal latency drawn per call kind (classification, email
+extraction, specialist step, document generation) and answers with a
+response shaped like the real one: classify/extract tool calls, and for
+specialists a scripted sequence of tool_use steps per agent followed by a
+final text answer.
+"""
+from __future__ import annotations
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+
+from backend.config import DATA_DIR
+
+
+@dataclass
+class LatencyProfile:
+    """Lognormal latency: median_ms with multiplicative spread sigma."""
+    median_ms: float
+    sigma: float = 0.35
+
+    def sample(self, rng: random.Random, scale: float) -> float:
+        return self.median_ms * math.exp(rng.gauss(0, self.sigma)) * scale / 1000
+
+
+DEFAULT_LATENCY = {
+    "classify": LatencyProfile(400),
+    "extract": LatencyProfile(1200),
+    "specialist": LatencyProfile(900),
+    "document": LatencyProfile(1500, 0.25),
+}
+
+DEFAULT_INTENT_MIX = {
+    "claim_status": 0.3,
+    "policy_question": 0.25,
+    "fnol_auto": 0.2,
+    "fnol_property": 0.1,
+    "general": 0.15,
+}
+
+# Tool calls made per step before the final answer, by specialist
+DEFAULT_TOOL_SCRIPTS = {
+    "fnol_specialist": [["lookup_policy"], ["verify_coverage", "get_carrier_requirements"]],
+    "claims_agent": [["get_claim_status"]],
+    "policy_lookup_agent": [["lookup_policy"], ["search_knowledge_base"]],
+    "general_agent": [["search_knowledge_base"]],
+}
+
+# First line of each specialist's system prompt -> agent name
+_AGENT_MARKERS = [
+    ("claims filing specialist", "fnol_specialist"),
+    ("Claims Status Specialist", "claims_agent"),
+    ("policy specialist", "policy_lookup_agent"),
+]
+
+_LOSS_TYPES = ["auto_collision", "auto_comprehensive", "homeowners_property", "farm_ranch", "commercial_auto"]
+
+
+@dataclass
+class FakeModel:
+    latency: dict[str, LatencyProfile] = field(default_factory=lambda: dict(DEFAULT_LATENCY))
+    intent_mix: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_INTENT_MIX))
+    tool_scripts: dict[str, list[list[str]]] = field(default_factory=lambda: dict(DEFAULT_TOOL_SCRIPTS))
+    latency_scale: float = 1.0
+    seed: int | None = None
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self.calls = {kind: 0 for kind in self.latency}
+        with open(DATA_DIR / "policies.json") as f:
+            self._policies = list(json.load(f)["policies"].values())
+        self.messages = SimpleNamespace(create=self.create)
+
+    def create(self, **request) -> SimpleNamespace:
+        kind = self._kind(request)
+        with self._lock:
+            self.calls[kind] += 1
+            delay = self.latency[kind].sample(self._rng, self.latency_scale)
+            content = getattr(self, f"_{kind}")(request)
+        time.sleep(delay)
+        return SimpleNamespace(
+            content=content,
+            stop_reason="tool_use" if any(b.type == "tool_use" for b in content) else "end_turn",
+            usage=SimpleNamespace(input_tokens=len(json.dumps(request["messages"], default=str)) // 4,
+                                  output_tokens=120),
+        )
+
+    def _kind(self, request: dict) -> str:
+        choice = (request.get("tool_choice") or {}).get("name", "")
+        if choice == "classify_intent":
+            return "classify"
+        if choice == "extract_fnol_data":
+            return "extract"
+        return "specialist" if request.get("tools") else "document"
+
+    def _tool_use(self, name: str, tool_input: dict) -> SimpleNamespace:
+        return SimpleNamespace(type="tool_use", id=f"toolu_fake_{next(self._ids)}", name=name, input=tool_input)
+
+    def _classify(self, request: dict) -> list:
+        intent = self._rng.choices(list(self.intent_mix), weights=list(self.intent_mix.values()))[0]
+        return [self._tool_use("classify_intent", {
+            "intent": intent, "priority": "normal", "confidence": 0.9,
+            "reasoning": "synthetic", "sentiment": "neutral",
+        })]
+
+    def _extract(self, request: dict) -> list:
+        policy = self._rng.choice(self._policies)
+        return [self._tool_use("extract_fnol_data", {
+            "reporter_name": "Load Test", "reporter_email": "loadtest@example.com",
+            "policy_number": policy["policy_number"], "date_of_loss": policy["effective_date"],
+            "location": "Omaha, NE", "loss_type": self._rng.choice(_LOSS_TYPES),
+            "description": "Synthetic load-test claim.", "injuries": False,
+            "photos_mentioned": False, "urgency": "normal", "missing_fields": [], "confidence_score": 0.9,
+        })]
+
+    def _specialist(self, request: dict) -> list:
+        system = request.get("system", "")
+        agent = next((name for marker, name in _AGENT_MARKERS if marker in system), "general_agent")
+        script = self.tool_scripts.get(agent, [])
+        step = _tool_steps_taken(request["messages"])
+        if step >= len(script) or (request.get("tool_choice") or {}).get("type") == "none":
+            return [SimpleNamespace(type="text", text=f"Synthetic answer from {agent}.")]
+        available = {t["name"] for t in request["tools"]}
+        return [self._tool_use(name, self._tool_input(name)) for name in script[step] if name in available] or \
+            [SimpleNamespace(type="text", text=f"Synthetic answer from {agent}.")]
+
+    def _document(self, request: dict) -> list:
+        return [SimpleNamespace(type="text", text="Synthetic generated document.\n" * 20)]
+
+    def _tool_input(self, name: str) -> dict:
+        policy = self._rng.choice(self._policies)
+        return {
+            "lookup_policy": {"policy_number": policy["policy_number"]},
+            "lookup_client": {"client_name": "Rezac"},
+            "verify_coverage": {"policy_id": policy["id"], "date_of_loss": policy["effective_date"],
+                                "loss_type": "collision"},
+            "get_carrier_requirements": {"carrier_id": policy["carrier_id"]},
+            "get_claim_status": {"client_id": policy["client_id"]},
+            "search_knowledge_base": {"query": "hail damage reporting procedure"},
+            "escalate_to_human": {"reason": "synthetic", "conversation_summary": "synthetic"},
+        }[name]
+
+
+def _tool_steps_taken(messages: list[dict]) -> int:
+    """Assistant tool-use turns since the last plain user message."""
+    steps = 0
+    for msg in reversed(messages):
+        if msg["role"] == "user" and isinstance(msg["content"], str):
+            break
+        if msg["role"] == "assistant":
+            steps += 1
+    return steps
@@ -0,0 +1,109 @@
+"""Benchmark: claim journal recovery time against journal size.
+
+    python -m bench.journal_recovery
+    python -m bench.journal_recovery --claims 200 1000 5000 --snapshot-every 1000 --json
+
+For each claim count, runs claims through the same transitions the intake and
+review endpoints make (create, parsing, extraction, policy, carrier, ready,
+approve, submit) into a journal in a temp directory, then times a cold
+ClaimPipeline recovering from it. Each size is measured twice: replaying the
+whole journal (snapshots disabled) and from the latest snapshot plus tail.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from backend.state.journal import ClaimJournal
+from backend.state.session import ClaimPipeline
+
+_EMAIL = "Hi, I was rear-ended at a stoplight on 72nd and Dodge this morning. " * 12
+_TRACE = [{"name": f"Step {i}", "step_type": "tool_call", "duration_ms": 40 + i, "status": "success",
+           "details": {"input": {"policy_number": "AO-PA-8847321"}}} for i in range(12)]
+
+
+def _populate(directory: str, claims: int, snapshot_every: int) -> dict:
+    journal = ClaimJournal(directory, flush_interval_ms=5, snapshot_every=snapshot_every)
+    pipeline = ClaimPipeline()
+    pipeline.attach_journal(journal)
+    journal.open()
+    for i in range(claims):
+        cid = pipeline.create_claim(email_raw=_EMAIL, email_from=f"member{i}@example.com",
+                                    email_subject=f"Claim {i}").claim_id
+        pipeline.update_claim(cid, status="parsing")
+        pipeline.update_claim(cid, extraction={"reporter_name": f"Member {i}", "policy_number": "AO-PA-8847321",
+                                               "loss_type": "auto_collision", "description": _EMAIL[:400],
+                                               "confidence_score": 0.92})
+        pipeline.update_claim(cid, policy_data={"carrier": "Acme Mutual", "carrier_id": "CAR-001",
+                                                "coverages": {"collision": 500, "comprehensive": 250}})
+        pipeline.update_claim(cid, carrier_data={"carrier_name": "Acme Mutual", "required_fields": ["vin", "photos"]})
+        pipeline.update_claim(cid, status="needs_review", priority="high" if i % 7 == 0 else "normal",
+                              trace_steps=_TRACE)
+        if i % 2 == 0:
+            pipeline.update_claim(cid, status="approved", carrier_submission=_EMAIL, client_email=_EMAIL[:300])
+            pipeline.update_claim(cid, status="submitted")
+    journal.close()
+    return {**journal.stats, "claims": len(pipeline._order)}
+
+
+def _recover(directory: str, snapshot_every: int) -> tuple[float, dict, ClaimPipeline]:
+    journal = ClaimJournal(directory, snapshot_every=snapshot_every)
+    pipeline = ClaimPipeline()
+    pipeline.attach_journal(journal)
+    gc.collect()
+    start = time.perf_counter()
+    info = journal.open()
+    elapsed = (time.perf_counter() - start) * 1000
+    journal.close()
+    return elapsed, info, pipeline
+
+
+def _journal_bytes(directory: str) -> int:
+    return sum(p.stat().st_size for p in Path(directory).iterdir())
+
+
+def run(claim_counts: list[int], snapshot_every: int = 1000) -> dict:
+    report = {"snapshot_every": snapshot_every, "cases": []}
+    for claims in claim_counts:
+        for mode, every in (("full_replay", 10 ** 12), ("snapshot", snapshot_every)):
+            with tempfile.TemporaryDirectory() as directory:
+                written = _populate(directory, claims, every)
+                elapsed, info, pipeline = _recover(directory, every)
+                assert len(pipeline._order) == claims
+                report["cases"].append({
+                    "claims": claims,
+                    "mode": mode,
+                    "events": written["appended"],
+                    "disk_bytes": _journal_bytes(directory),
+                    "replayed": info["replayed"],
+                    "recovery_ms": round(elapsed, 1),
+                    "recovery_us_per_claim": round(elapsed * 1000 / claims, 1),
+                })
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--claims", type=int, nargs="+", default=[200, 1000, 5000])
+    parser.add_argument("--snapshot-every", type=int, default=1000)
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args()
+
+    report = run(args.claims, args.snapshot_every)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"snapshot every {report['snapshot_every']} events")
+        for c in report["cases"]:
+            print(f"{c['claims']:>6d} claims  {c['mode']:12s} events={c['events']:>6d}  "
+                  f"disk={c['disk_bytes'] / 1e6:>7.1f}MB  replayed={c['replayed']:>6d}  "
+                  f"recovery={c['recovery_ms']:>8.1f}ms  ({c['recovery_us_per_claim']}us/claim)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
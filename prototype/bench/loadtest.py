@@ -0,0 +1,300 @@
+"""End-to-end load test against the FastAPI app with a synthetic model backend.
+
+Boots ``backend.main:app`` under uvicorn in a background thread, swaps the
+model client for bench.fake_llm.FakeModel, and drives a mixed open-loop
+workload (chat sessions, intake bursts, approvals) at a target rate while
+WebSocket subscribers listen on the claims channel.
+
+    python -m bench.loadtest --duration 30 --rate 4 --out results.json
+    python -m bench.loadtest --duration 30 --rate 4 --compare results.json
+
+Reports throughput, p50/p95/p99 per endpoint and per pipeline stage (from
+the trace_steps in each response) and event-loop lag, as JSON.
+
+The claim journal, AMS database and audit log go to a temporary directory
+(removed on exit) unless JOURNAL_DIR, AMS_DB_PATH or AUDIT_DIR are set, so a
+run neither reads nor grows the ones under var/.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import atexit
+import json
+import logging
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+import uvicorn
+import websockets
+
+# Before backend.config is imported: it reads these at import time
+_SCRATCH_DIR = tempfile.mkdtemp(prefix="claimflow-loadtest-")
+atexit.register(shutil.rmtree, _SCRATCH_DIR, ignore_errors=True)
+os.environ.setdefault("JOURNAL_DIR", os.path.join(_SCRATCH_DIR, "journal"))
+os.environ.setdefault("AMS_DB_PATH", os.path.join(_SCRATCH_DIR, "ams.sqlite3"))
+os.environ.setdefault("AUDIT_DIR", os.path.join(_SCRATCH_DIR, "audit"))
+
+from backend.main import app  # noqa: E402
+from backend.llm.client import client as model_client  # noqa: E402
+from backend.tools.email_intake import SAMPLE_EMAILS  # noqa: E402
+from bench.fake_llm import FakeModel  # noqa: E402
+
+CHAT_MESSAGES = [
+    "What's the status of my claim?",
+    "What does my policy cover for hail?",
+    "I was rear-ended this morning, nobody hurt.",
+    "Can I get a certificate of insurance?",
+    "What's my collision deductible?",
+]
+CLIENT_IDS = [f"CLI-{n}" for n in range(1001, 1011)]
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"n": 0}
+    ordered = sorted(values)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 1)
+
+    return {"n": len(ordered), "p50_ms": pct(50), "p95_ms": pct(95), "p99_ms": pct(99),
+            "mean_ms": round(sum(ordered) / len(ordered), 1), "max_ms": round(ordered[-1], 1)}
+
+
+class ServerThread:
+    """uvicorn in its own thread and event loop, with an event-loop lag probe."""
+
+    def __init__(self, probe_interval_s: float = 0.05):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port,
+                                                    log_level="warning"))
+        self.probe_interval_s = probe_interval_s
+        self.lag_ms: list[float] = []
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),), daemon=True)
+
+    async def _probe(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.probe_interval_s)
+            self.lag_ms.append((time.perf_counter() - start - self.probe_interval_s) * 1000)
+
+    async def _serve(self) -> None:
+        probe = asyncio.create_task(self._probe())
+        try:
+            await self.server.serve()
+        finally:
+            probe.cancel()
+
+    def __enter__(self) -> "ServerThread":
+        self._thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+        self.lag_ms.clear()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+class LoadTest:
+    def __init__(self, base_url: str, rate: float, duration: float, mix: dict[str, float],
+                 burst: int, ws_subscribers: int, seed: int | None):
+        self.base_url = base_url
+        self.rate = rate
+        self.duration = duration
+        self.mix = mix
+        self.burst = burst
+        self.ws_subscribers = ws_subscribers
+        self.rng = random.Random(seed)
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.stages: dict[str, list[float]] = defaultdict(list)
+        self.pending_claims: list[str] = []
+        self.ws_messages = 0
+        self.ops = 0
+
+    async def _request(self, http: httpx.AsyncClient, method: str, path: str, label: str, **kwargs) -> dict | None:
+        start = time.perf_counter()
+        try:
+            resp = await http.request(method, path, **kwargs)
+            self.latencies[label].append((time.perf_counter() - start) * 1000)
+            if resp.status_code >= 400:
+                self.errors[label] += 1
+                return None
+            body = resp.json()
+        except Exception:
+            self.errors[label] += 1
+            return None
+        for step in body.get("trace_steps", []) if isinstance(body, dict) else []:
+            if step.get("duration_ms"):
+                self.stages[f"{step['step_type']}:{step['name']}"].append(step["duration_ms"])
+        return body
+
+    async def chat_session(self, http: httpx.AsyncClient) -> None:
+        session = await self._request(http, "POST", f"/api/session/start?client_id={self.rng.choice(CLIENT_IDS)}",
+                                      "POST /api/session/start")
+        if not session:
+            return
+        for _ in range(self.rng.randint(1, 3)):
+            await self._request(http, "POST", "/api/chat", "POST /api/chat",
+                                json={"session_id": session["session_id"], "message": self.rng.choice(CHAT_MESSAGES)})
+
+    async def intake_burst(self, http: httpx.AsyncClient) -> None:
+        emails = [self.rng.choice(list(SAMPLE_EMAILS.values())) for _ in range(self.burst)]
+        results = await asyncio.gather(*[
+            # The sample emails repeat on purpose; measure the full pipeline, not the dedup short-circuit
+            self._request(http, "POST", "/api/claims/intake", "POST /api/claims/intake", json={
+                "email_text": e["body"], "from_address": e["from"], "subject": e["subject"],
+                "allow_duplicate": True})
+            for e in emails
+        ])
+        self.pending_claims.extend(r["claim_id"] for r in results if r)
+
+    async def approval(self, http: httpx.AsyncClient) -> None:
+        if not self.pending_claims:
+            await self._request(http, "GET", "/api/claims", "GET /api/claims")
+            return
+        claim_id = self.pending_claims.pop(self.rng.randrange(len(self.pending_claims)))
+        await self._request(http, "POST", f"/api/claims/{claim_id}/approve", "POST /api/claims/{id}/approve", json={})
+        await self._request(http, "GET", f"/api/claims/{claim_id}", "GET /api/claims/{id}")
+
+    async def subscriber(self, stop: asyncio.Event) -> None:
+        url = self.base_url.replace("http", "ws", 1) + "/ws/claims"
+        async with websockets.connect(url) as ws:
+            while not stop.is_set():
+                try:
+                    await asyncio.wait_for(ws.recv(), timeout=0.5)
+                    self.ws_messages += 1
+                except asyncio.TimeoutError:
+                    continue
+
+    async def run(self) -> float:
+        ops = {"chat": self.chat_session, "intake": self.intake_burst, "approve": self.approval}
+        stop = asyncio.Event()
+        limits = httpx.Limits(max_connections=500, max_keepalive_connections=100)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=120, limits=limits) as http:
+            subscribers = [asyncio.create_task(self.subscriber(stop)) for _ in range(self.ws_subscribers)]
+            await asyncio.sleep(0.2)
+            tasks = []
+            start = time.perf_counter()
+            next_at = start
+            while next_at - start < self.duration:
+                await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+                op = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+                tasks.append(asyncio.create_task(ops[op](http)))
+                self.ops += 1
+                next_at += self.rng.expovariate(self.rate)
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - start
+            stop.set()
+            await asyncio.gather(*subscribers, return_exceptions=True)
+        return elapsed
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return ""
+
+
+def run(args: argparse.Namespace) -> dict:
+    mix = {k: float(v) for k, v in (item.split("=") for item in args.mix.split(","))}
+    fake = FakeModel(latency_scale=args.latency_scale, seed=args.seed)
+    model_client.use_backend(fake)
+
+    with ServerThread() as server:
+        test = LoadTest(f"http://127.0.0.1:{server.port}", args.rate, args.duration, mix,
+                        args.burst, args.ws, args.seed)
+        elapsed = asyncio.run(test.run())
+        lag = list(server.lag_ms)
+
+    requests = sum(len(v) for v in test.latencies.values())
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "duration_s": round(elapsed, 2),
+            "target_rate": args.rate,
+            "mix": mix,
+            "burst": args.burst,
+            "latency_scale": args.latency_scale,
+            "seed": args.seed,
+        },
+        "throughput": {
+            "ops": test.ops,
+            "requests": requests,
+            "requests_per_s": round(requests / elapsed, 2),
+            "errors": sum(test.errors.values()),
+        },
+        "endpoints": {label: {**percentiles(v), "errors": test.errors.get(label, 0)}
+                      for label, v in sorted(test.latencies.items())},
+        "stages": {label: percentiles(v) for label, v in sorted(test.stages.items())},
+        "event_loop_lag_ms": percentiles(lag),
+        "websocket": {"subscribers": args.ws, "messages": test.ws_messages,
+                      "messages_per_s": round(test.ws_messages / elapsed, 2)},
+        "model_calls": fake.calls,
+        "model_client": model_client.stats(),
+    }
+
+
+def compare(report: dict, baseline: dict) -> str:
+    lines = [f"{'endpoint':36s} {'p50':>16s} {'p95':>16s} {'p99':>16s}"]
+    for label, cur in report["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(label)
+        if not base or not cur.get("n") or not base.get("n"):
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            delta = (cur[key] - base[key]) / base[key] * 100 if base[key] else 0.0
+            cells.append(f"{cur[key]:>8.0f} ({delta:+5.1f}%)")
+        lines.append(f"{label:36s} " + " ".join(cells))
+    base_rps = baseline.get("throughput", {}).get("requests_per_s", 0)
+    lines.append(f"requests/s: {report['throughput']['requests_per_s']} (baseline {base_rps}, "
+                 f"commit {baseline.get('meta', {}).get('commit', '?')})")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load")
+    parser.add_argument("--rate", type=float, default=4, help="operations started per second")
+    parser.add_argument("--mix", default="chat=0.5,intake=0.3,approve=0.2", help="operation weights")
+    parser.add_argument("--burst", type=int, default=3, help="emails per intake burst")
+    parser.add_argument("--ws", type=int, default=5, help="WebSocket subscribers on the claims channel")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier on fake model latency")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(report, json.load(f)))
+    elif not args.out:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Benchmark: fuzzy policy-number lookup at portfolio scale.
+
+    python -m bench.policy_index
+    python -m bench.policy_index --policies 300000 --queries 5000 --json
+
+Generates synthetic policy numbers in the demo formats (``AO-PA-8847321``,
+``EMC-CA-BZ-224891``), builds a PolicyIndex and queries it with noisy copies:
+dashes dropped, lowercase, OCR look-alikes (1→l, 0→O, 5→S, 8→B), one
+substitution, one adjacent transposition, one deleted character. Reports
+build time, memory of the candidate arrays, per-query latency percentiles
+and how often the true policy is the top-ranked candidate.
+"""
+from __future__ import annotations
+import argparse
+import json
+import random
+import sys
+import time
+
+from backend.tools.policy_index import PolicyIndex
+
+_PREFIXES = ["AO-PA", "AO-HO", "AO-UMB", "ERIE-HO-Q", "WF-PA", "EMC-CA-BZ", "EMC-MTC", "GM-FR-NE", "GM-PA-NE", "AO-REN"]
+_OCR = {"1": "l", "0": "O", "5": "S", "8": "B", "2": "Z"}
+
+
+def _policies(n: int, rng: random.Random) -> dict[str, str]:
+    numbers: set[str] = set()
+    while len(numbers) < n:
+        numbers.add(f"{rng.choice(_PREFIXES)}-{rng.randrange(10 ** 6, 10 ** 7)}")
+    return {f"POL-{i:07d}": number for i, number in enumerate(sorted(numbers))}
+
+
+def _noisy(number: str, kind: str, rng: random.Random) -> str:
+    digits = [i for i, ch in enumerate(number) if ch.isdigit()]
+    chars = list(number)
+    i = rng.choice(digits[:-1])
+    if kind == "no_dashes":
+        return number.replace("-", "")
+    if kind == "lowercase_spaces":
+        return number.lower().replace("-", " ")
+    if kind == "ocr":
+        swappable = [j for j in digits if number[j] in _OCR] or [i]
+        j = rng.choice(swappable)
+        chars[j] = _OCR.get(chars[j], chars[j])
+    elif kind == "substitution":
+        chars[i] = str((int(chars[i]) + rng.randrange(1, 10)) % 10)
+    elif kind == "transposition":
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    elif kind == "deletion":
+        del chars[i]
+    return "".join(chars)
+
+
+def run(n_policies: int = 300_000, n_queries: int = 2000, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    policies = _policies(n_policies, rng)
+    start = time.perf_counter()
+    index = PolicyIndex(policies)
+    build_s = time.perf_counter() - start
+
+    ids = list(policies)
+    kinds = ["no_dashes", "lowercase_spaces", "ocr", "substitution", "transposition", "deletion"]
+    report = {"policies": n_policies, "queries": n_queries, "build_s": round(build_s, 2),
+              "index_mb": round((index._hashes.nbytes + index._rows.nbytes) / 1e6, 1), "kinds": {}}
+    for kind in kinds:
+        latencies, top1, found = [], 0, 0
+        for _ in range(n_queries):
+            pid = rng.choice(ids)
+            query = _noisy(policies[pid], kind, rng)
+            t = time.perf_counter()
+            matches = index.search(query)
+            latencies.append((time.perf_counter() - t) * 1e6)
+            top1 += bool(matches) and matches[0].policy_id == pid
+            found += any(m.policy_id == pid for m in matches)
+        latencies.sort()
+        report["kinds"][kind] = {
+            "p50_us": round(latencies[len(latencies) // 2], 1),
+            "p99_us": round(latencies[int(len(latencies) * 0.99)], 1),
+            "top1": round(top1 / n_queries, 4),
+            "recall_at_5": round(found / n_queries, 4),
+        }
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--policies", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args()
+
+    report = run(args.policies, args.queries)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['policies']} policies  build={report['build_s']}s  index={report['index_mb']}MB")
+        for kind, k in report["kinds"].items():
+            print(f"{kind:18s} p50={k['p50_us']:>7.1f}us  p99={k['p99_us']:>7.1f}us  "
+                  f"top1={k['top1']:.3f}  recall@5={k['recall_at_5']:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
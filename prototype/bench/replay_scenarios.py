@@ -0,0 +1,96 @@
+"""Run the demo scenarios end to end against a model-call cassette.
+
+Record once with live model access, then replay offline as often as needed:
+
+    LLM_CASSETTE_MODE=record python -m bench.replay_scenarios
+    LLM_CASSETTE_MODE=replay LLM_CASSETTE_LATENCY_SCALE=0 python -m bench.replay_scenarios --json
+
+Drives /api/claims/intake (every SAMPLE_EMAILS scenario, then approve) and
+/api/chat (scripted multi-turn conversations) in-process and prints per-call
+latency, so two commits can be compared on identical model responses.
+"""
+from __future__ import annotations
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+from backend.main import app
+from backend.llm.client import client as model_client
+from backend.tools.email_intake import SAMPLE_EMAILS
+
+CHAT_SCENARIOS = {
+    "claim_status": ("CLI-1008", [
+        "Hi, what's the status of my hail claim?",
+        "When will the adjuster get back to me?",
+    ]),
+    "coverage_question": ("CLI-1001", [
+        "What's my collision deductible on the F-150?",
+        "And does my homeowners policy cover hail?",
+    ]),
+    "auto_fnol": ("CLI-1002", [
+        "I was in a fender bender this morning in Lincoln.",
+        "It was at 27th and O around 8am, nobody was hurt. Policy WF-PA-3391204.",
+    ]),
+}
+
+
+def run(rounds: int = 1) -> dict:
+    timings: dict[str, list[int]] = {}
+
+    def timed(name: str, fn):
+        start = time.perf_counter()
+        resp = fn()
+        timings.setdefault(name, []).append(int((time.perf_counter() - start) * 1000))
+        resp.raise_for_status()
+        return resp.json()
+
+    with TestClient(app) as http:
+        for _ in range(rounds):
+            for name, email in SAMPLE_EMAILS.items():
+                # Replayed every round (and across runs): skip intake dedup like the demo scenarios
+                result = timed(f"intake:{name}", lambda: http.post("/api/claims/intake", json={
+                    "email_text": email["body"], "from_address": email["from"], "subject": email["subject"],
+                    "allow_duplicate": True,
+                }))
+                timed(f"approve:{name}", lambda: http.post(f"/api/claims/{result['claim_id']}/approve", json={}))
+
+            for name, (client_id, turns) in CHAT_SCENARIOS.items():
+                session = http.post(f"/api/session/start?client_id={client_id}").json()
+                for i, message in enumerate(turns):
+                    timed(f"chat:{name}:{i + 1}", lambda: http.post("/api/chat", json={
+                        "session_id": session["session_id"], "message": message,
+                    }))
+
+    return {
+        "calls": {name: {"n": len(v), "median_ms": int(statistics.median(v)), "max_ms": max(v)}
+                  for name, v in timings.items()},
+        "model_client": model_client.stats(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args()
+
+    if model_client.cassette is None:
+        print("Set LLM_CASSETTE_MODE=record or replay", file=sys.stderr)
+        return 2
+
+    report = run(args.rounds)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, t in report["calls"].items():
+            print(f"{name:40s} n={t['n']:<3d} median={t['median_ms']:>6d}ms  max={t['max_ms']:>6d}ms")
+        print(json.dumps(report["model_client"].get("cassette", {})))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
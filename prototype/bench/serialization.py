@@ -0,0 +1,140 @@
+"""Microbenchmark: default vs fast JSON serialization paths.
+
+    python -m bench.serialization
+    python -m bench.serialization --iterations 5000 --json
+
+Payloads are built from the demo data (real policy, client and carrier
+records, RAG chunks from the indexed docs), shaped like a multi-tool chat
+response, an intake response and the tool results sent back to the model.
+Prints microseconds per operation for each path and the per-request saving.
+"""
+from __future__ import annotations
+import argparse
+import json
+import sys
+import timeit
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from backend.main import ChatResponse
+from backend.rag.retriever import retriever
+from backend.serialization import JSON_BACKEND, FastJSONResponse, dumps, dumps_str
+from backend.tools.ams_api import lookup_policy, lookup_client
+from backend.tools.claims_api import get_claim_status
+from backend.tools.carrier_api import get_carrier_requirements
+
+
+def _payloads() -> dict:
+    retriever.initialize()
+    policy = lookup_policy("AO-PA-8847321")
+    client = lookup_client("Tom")
+    claims = get_claim_status(client_id="CLI-1008")
+    carrier = get_carrier_requirements(policy.get("carrier_id", ""))
+    rag = retriever.search("hail damage roof deductible")
+    tool_results = [policy, client, claims, carrier, {"results": rag}]
+
+    trace_steps = [
+        {"name": f"Tool: step {i}", "step_type": "tool_call", "duration_ms": 12 + i, "status": "success",
+         "details": {"input": {"policy_number": "AO-PA-8847321"}, "access": "read", "result_tokens": 412,
+                     "tokens_saved": 388, "deduplicated": False},
+         "span_id": f"{i:016x}", "parent_id": "0" * 16}
+        for i in range(12)
+    ]
+    chat = dict(
+        response="Your hail claim CLM-2024-0142 is with the adjuster; expect an inspection call this week. " * 4,
+        intent="claim_status", agent="claims_agent",
+        tools_called=[{"tool": f"tool_{i}", "input": {"q": "x"}, "output": r, "duration_ms": 14}
+                      for i, r in enumerate(tool_results)],
+        rag_sources=[{"source_doc": r.get("source_doc", ""), "heading": r.get("heading", ""),
+                      "chunk_text": r.get("chunk_text", ""), "relevance_score": r.get("relevance_score", 0)}
+                     for r in rag],
+        trace_steps=trace_steps, escalated=False, confidence=0.92, sentiment="neutral", priority="normal",
+        latency_ms=2412, latency_breakdown={"classification_ms": 610, "tools_ms": 52, "generation_ms": 1750,
+                                            "speculation_saved_ms": 0},
+        guardrail_flags=[], request_id="f" * 32,
+    )
+    intake = {
+        "claim_id": "CLM-20261019-0001", "status": "needs_review",
+        "extraction": {"reporter_name": "Tom Brennan", "policy_number": "AO-PA-8847321",
+                       "description": "Rear-ended at a stoplight on 72nd and Dodge. " * 6,
+                       "missing_fields": [], "confidence_score": 0.93},
+        "policy_data": policy, "carrier_data": carrier, "priority": "normal", "compliance_flags": [],
+        "trace_steps": trace_steps, "latency_ms": 4120, "request_id": "f" * 32,
+    }
+    return {"chat": chat, "intake": intake, "tool_results": tool_results}
+
+
+def _chat_default(fields: dict) -> bytes:
+    # FastAPI's response_model path: validate, dump in JSON mode, stdlib render
+    model = ChatResponse.model_validate(ChatResponse(**fields))
+    return JSONResponse(jsonable_encoder(model.model_dump(mode="json"))).body
+
+
+def _chat_fast(fields: dict) -> bytes:
+    return FastJSONResponse(dict(ChatResponse.model_construct(**fields))).body
+
+
+def _dict_default(payload: dict) -> bytes:
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def _dict_fast(payload: dict) -> bytes:
+    return FastJSONResponse(payload).body
+
+
+def _tools_default(results: list[dict]) -> int:
+    # Previous agent-loop encoding: a baseline dump for savings stats plus the content dump
+    n = 0
+    for r in results:
+        n += len(json.dumps(r, default=str))
+        n += len(json.dumps(r, separators=(",", ":"), ensure_ascii=False, default=str))
+    return n
+
+
+def _tools_fast(results: list[dict]) -> int:
+    return sum(len(dumps_str(r)) * 2 for r in results)
+
+
+def run(iterations: int = 2000) -> dict:
+    p = _payloads()
+    cases = {
+        "chat_response": (p["chat"], _chat_default, _chat_fast),
+        "intake_response": (p["intake"], _dict_default, _dict_fast),
+        "tool_results": (p["tool_results"], _tools_default, _tools_fast),
+    }
+    assert json.loads(_chat_fast(p["chat"])) == json.loads(_chat_default(p["chat"]))
+
+    report = {"backend": JSON_BACKEND, "iterations": iterations, "cases": {}}
+    for name, (payload, default, fast) in cases.items():
+        default_us = min(timeit.repeat(lambda: default(payload), number=iterations, repeat=3)) / iterations * 1e6
+        fast_us = min(timeit.repeat(lambda: fast(payload), number=iterations, repeat=3)) / iterations * 1e6
+        report["cases"][name] = {
+            "bytes": len(dumps(payload)),
+            "default_us": round(default_us, 1),
+            "fast_us": round(fast_us, 1),
+            "saved_us": round(default_us - fast_us, 1),
+            "speedup": round(default_us / fast_us, 2) if fast_us else None,
+        }
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args()
+
+    report = run(args.iterations)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"JSON backend: {report['backend']}")
+        for name, c in report["cases"].items():
+            print(f"{name:18s} {c['bytes']:>7d}B  default={c['default_us']:>8.1f}us  "
+                  f"fast={c['fast_us']:>8.1f}us  saved={c['saved_us']:>8.1f}us  x{c['speedup']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,14 @@ const API_BASE = '';
 let currentClaimId = null;
 let claimsData = [];
 let ws = null;
+// Claims kept in sync over the WebSocket change feed (see applyClaimsSync)
+let claimsById = {};
+let claimsVersion = -1;
+// Server process the version belongs to; versions restart with it
+let claimsEpoch = '';
+let claimsSyncActive = false;
+// Idempotency-Keys of requests still awaiting a response (see actionKey)
+let pendingActions = {};
 
 /* ═══════════════════════════════════════════════════════════════════
    SCREEN NAVIGATION
@@ -22,6 +30,22 @@ function showScreen(screenId) {
     }
 }
 
+/* Idempotency-Key for one user action. Double-clicks and retries of the same
+   request reuse the key until a response arrives (the server runs it once);
+   the next action, or the same one with a different body, gets a fresh key. */
+function actionKey(action, body) {
+    var pending = pendingActions[action];
+    if (!pending || pending.body !== body) {
+        var nonce = Date.now().toString(36) + '-' + Math.random().toString(36).slice(2, 10);
+        pending = pendingActions[action] = { body: body, key: action + '-' + nonce };
+    }
+    return pending.key;
+}
+
+function actionDone(action) {
+    delete pendingActions[action];
+}
+
 function showDashboardView() {
     document.querySelectorAll('.nav-tab').forEach(function (t) { t.classList.remove('nav-active'); });
     document.querySelector('[data-view="dashboard"]').classList.add('nav-active');
@@ -37,8 +61,14 @@ function showClaimsView() {
    ═══════════════════════════════════════════════════════════════════ */
 
 async function loadDashboard() {
+    if (claimsSyncActive) {
+        // The WebSocket feed keeps claimsData current; no need to refetch
+        renderClaimsQueue();
+        updateStats();
+        return;
+    }
     try {
-        var res = await fetch(API_BASE + '/api/claims');
+        var res = await fetch(API_BASE + '/api/claims?fields=claim_id,status,reporter_name,email_from,email_subject,created_at');
         var data = await res.json();
         claimsData = data.claims || [];
     } catch (e) {
@@ -131,9 +161,12 @@ async function runScenario(name) {
         setTimeout(function () { advanceLoadingStep(2); updateLoadingText('AI analyzing email...'); }, 600);
         setTimeout(function () { addActivity('AI parsing and extracting FNOL data', 'amber'); }, 800);
 
-        var res = await fetch(API_BASE + '/api/demo/scenario/' + encodeURIComponent(name), {
-            method: 'POST'
+        var action = 'scenario-' + name;
+        var res = await fetch(API_BASE + '/api/demo/scenario/' + encodeURIComponent(name) + '?trace=none', {
+            method: 'POST',
+            headers: { 'Idempotency-Key': actionKey(action, '') }
         });
+        actionDone(action);
         var data = await res.json();
 
         advanceLoadingStep(3);
@@ -224,6 +257,10 @@ function renderClaimProcessing(claim) {
             escapeHtml(claim.priority || 'normal') + '</span>';
     }
 
+    if (claim.possible_duplicate_of) {
+        showToast('Possible duplicate of ' + claim.possible_duplicate_of + ' (same policy and date of loss)', 'warning');
+    }
+
     // Confidence score
     var confidenceEl = document.getElementById('claim-confidence');
     if (confidenceEl) {
@@ -351,12 +388,15 @@ async function approveClaim() {
     addActivity('Generating carrier submission for ' + currentClaimId, 'blue');
 
     var extraction = collectFormData();
+    var action = 'approve-' + currentClaimId;
+    var body = JSON.stringify({ extraction: extraction });
     try {
         var res = await fetch(API_BASE + '/api/claims/' + encodeURIComponent(currentClaimId) + '/approve', {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ extraction: extraction })
+            headers: { 'Content-Type': 'application/json', 'Idempotency-Key': actionKey(action, body) },
+            body: body
         });
+        actionDone(action);
         var data = await res.json();
         renderSubmissionPreview(data);
         showScreen('submission-preview');
@@ -420,8 +460,10 @@ async function submitToCarrier() {
     if (!currentClaimId) return;
     showLoading('Submitting to carrier...');
     try {
+        // One submission per claim: a repeated click replays the first response
         var res = await fetch(API_BASE + '/api/claims/' + encodeURIComponent(currentClaimId) + '/submit', {
-            method: 'POST'
+            method: 'POST',
+            headers: { 'Idempotency-Key': 'submit-' + currentClaimId }
         });
         var data = await res.json();
         showToast(data.message || 'Claim submitted!', 'success');
@@ -575,7 +617,7 @@ async function sendChatMessage() {
     showTypingIndicator();
 
     try {
-        var res = await fetch(API_BASE + '/api/chat', {
+        var res = await fetch(API_BASE + '/api/chat?trace=none', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({
@@ -672,7 +714,7 @@ function formatStatus(s) {
     var map = {
         new: 'New', processing: 'Processing', needs_review: 'Review',
         approved: 'Approved', submitted: 'Submitted', follow_up: 'Follow Up',
-        draft: 'Draft', escalated: 'Escalated'
+        draft: 'Draft', escalated: 'Escalated', duplicate: 'Duplicate'
     };
     return map[s] || s || 'Unknown';
 }
@@ -810,13 +852,15 @@ function connectWebSocket() {
 
         ws.onopen = function () {
             console.log('WebSocket connected');
+            // Resume the claims feed; the server answers with deltas or a snapshot
+            ws.send(JSON.stringify({ type: 'subscribe', since: claimsVersion, epoch: claimsEpoch }));
         };
 
         ws.onmessage = function (event) {
             try {
                 var data = JSON.parse(event.data);
-                if (data.type === 'ready_for_review' || data.type === 'claim_submitted') {
-                    loadDashboard();
+                if (data.type === 'claims_snapshot' || data.type === 'claims_delta') {
+                    applyClaimsSync(data);
                 }
                 if (data.type === 'processing_update' && data.claim_id === currentClaimId) {
                     if (data.trace_step) {
@@ -833,6 +877,7 @@ function connectWebSocket() {
         };
 
         ws.onclose = function () {
+            claimsSyncActive = false;
             console.log('WebSocket closed — reconnecting in 5s');
             setTimeout(connectWebSocket, 5000);
         };
@@ -841,6 +886,62 @@ function connectWebSocket() {
     }
 }
 
+function applyClaimsSync(data) {
+    if (data.type === 'claims_snapshot') {
+        claimsById = {};
+        data.claims.forEach(function (c) { claimsById[c.claim_id] = c; });
+        claimsVersion = data.version;
+        claimsEpoch = data.epoch;
+    } else {
+        if (data.epoch !== claimsEpoch || data.from !== claimsVersion) {
+            // Missed a delta (or the server restarted) — ask again from what we have
+            ws.send(JSON.stringify({ type: 'subscribe', since: claimsVersion, epoch: claimsEpoch }));
+            return;
+        }
+        data.changes.forEach(applyClaimChange);
+        claimsVersion = data.to;
+    }
+    claimsSyncActive = true;
+    claimsData = Object.keys(claimsById).map(function (id) {
+        var c = claimsById[id];
+        var extraction = c.extraction || {};
+        return {
+            claim_id: c.claim_id,
+            status: c.status,
+            reporter_name: extraction.reporter_name || '',
+            email_from: c.email_from,
+            email_subject: c.email_subject,
+            created_at: c.created_at
+        };
+    }).sort(function (a, b) { return a.created_at < b.created_at ? 1 : a.created_at > b.created_at ? -1 : 0; });
+    renderClaimsQueue();
+    updateStats();
+}
+
+function applyClaimChange(change) {
+    var claim = claimsById[change.claim_id];
+    if (change.op === 'create' || !claim) {
+        claim = claimsById[change.claim_id] = Object.assign({}, change.set);
+        return;
+    }
+    Object.keys(change.set || {}).forEach(function (path) {
+        var dot = path.indexOf('.');
+        if (dot < 0) {
+            claim[path] = change.set[path];
+        } else {
+            var key = path.slice(0, dot);
+            claim[key] = Object.assign({}, claim[key]);
+            claim[key][path.slice(dot + 1)] = change.set[path];
+        }
+    });
+    (change.unset || []).forEach(function (path) {
+        var dot = path.indexOf('.');
+        if (dot >= 0 && claim[path.slice(0, dot)]) {
+            delete claim[path.slice(0, dot)][path.slice(dot + 1)];
+        }
+    });
+}
+
 function appendTraceStep(step) {
     var container = document.getElementById('trace-steps');
     if (!container) return;